@@ -0,0 +1,37 @@
+from memo import LRUCache
+
+DAILY_MEASURES = ("cnt", "casual", "registered")
+
+_daily_cache = LRUCache(maxsize=64)
+
+
+def create_daily_rentals(df, measures=DAILY_MEASURES, key=None):
+    """
+    Create daily rentals for every user type in a single resampling pass.
+
+    Parameters:
+    - df: The input DataFrame containing rental data.
+    - measures: The rental columns to aggregate.
+    - key: Optional hashable description of the filter selection that produced 'df'. When given, the result is memoized on it.
+
+    Returns:
+    - daily_rentals: A DataFrame with one row per day and flat columns: 'dteday', 'instant_nunique', 'count', '<measure>_sum' and '<measure>_diff' (day-over-day change of the sum).
+    """
+    if key is not None:
+        return _daily_cache.get_or_compute(
+            (key, tuple(measures)), lambda: create_daily_rentals(df, measures)
+        )
+
+    resampler = df.resample(rule="D", on="dteday")
+
+    daily_rentals = resampler[list(measures)].sum()
+    daily_rentals.columns = [f"{measure}_sum" for measure in measures]
+    daily_rentals.insert(0, "instant_nunique", resampler["instant"].nunique())
+    # Instants are never missing, so their count is the number of rows. Unlike
+    # size(), it also works on an empty frame.
+    daily_rentals.insert(1, "count", resampler["instant"].count())
+
+    for measure in measures:
+        daily_rentals[f"{measure}_diff"] = daily_rentals[f"{measure}_sum"].diff()
+
+    return daily_rentals.reset_index()
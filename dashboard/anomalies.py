@@ -0,0 +1,379 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from filters import RentalFilter
+from labels import category_codes
+from schema import CODE_RANGES, column_labels
+from stats import group_quantiles
+
+ANOMALY_MEASURES = ("cnt", "casual", "registered")
+
+# Rentals are compared with days of the same year, season, working day flag
+# and weather situation, and hourly rentals with the same hour of those days.
+# The working day flag carries the weekday pattern: the weekdays of each kind
+# rent alike, while one group per weekday would be too small to be robust.
+BASELINE_COLUMNS = ("yr", "season", "workingday", "weathersit")
+
+# Groups with fewer rows fall back to the baseline without the weather.
+MIN_GROUP_ROWS = 8
+
+# Robust z-scores beyond this are flagged, as suggested by Iglewicz and Hoaglin.
+THRESHOLD = 3.5
+
+# The share of new rows after which an update fits the baseline again.
+REFIT_SHARE = 0.25
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def baseline_codes(df, column):
+    """
+    Read the codes of a baseline column.
+
+    Parameters:
+    - df: A DataFrame with the column, categories as codes or labels.
+    - column: The baseline column.
+
+    Returns:
+    - codes: An int64 array of codes.
+    """
+    return category_codes(df[column], column_labels(column, df[column]))
+
+
+def row_digest(df):
+    """
+    Hash the rows of a DataFrame, regardless of their order.
+
+    The digests of two sets of rows add up, modulo 2**64, to the digest of
+    their union, so the digest of a grown dataset is updated from its new
+    rows alone.
+
+    Parameters:
+    - df: A DataFrame.
+
+    Returns:
+    - digest: The digest as an int.
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    return int(np.add.reduce(hashes, dtype=np.uint64))
+
+
+def baseline_ranges(df, columns):
+    """
+    Find the codes every baseline column can take.
+
+    The years are the ones of the data, as the dataset grows a year at a
+    time; the other columns take every code of CODE_RANGES.
+
+    Parameters:
+    - df: A DataFrame with the baseline columns, categories as codes or labels.
+    - columns: The baseline columns.
+
+    Returns:
+    - ranges: A dictionary of the inclusive (low, high) code range of every column.
+    """
+    ranges = {column: CODE_RANGES[column] for column in columns}
+    if "yr" in ranges and len(df):
+        years = baseline_codes(df, "yr")
+        ranges["yr"] = (int(years.min()), int(years.max()))
+
+    return ranges
+
+
+def baseline_groups(df, columns, ranges):
+    """
+    Number the baseline group of every row.
+
+    Parameters:
+    - df: A DataFrame with the baseline columns, categories as codes or labels.
+    - columns: The baseline columns.
+    - ranges: The code ranges returned by baseline_ranges().
+
+    Returns:
+    - groups: An int64 array with the group of every row, -1 for the rows with a code outside the ranges.
+    - n_groups: The number of possible groups.
+    """
+    codes = []
+    shape = []
+    outside = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        low, high = ranges[column]
+        values = baseline_codes(df, column)
+        outside |= (values < low) | (values > high)
+        codes.append(np.clip(values, low, high) - low)
+        shape.append(high - low + 1)
+
+    groups = np.ravel_multi_index(codes, shape)
+
+    return np.where(outside, -1, groups), int(np.prod(shape))
+
+
+def robust_baseline(groups, values, n_groups):
+    """
+    Compute the median and the median absolute deviation of every group.
+
+    Parameters:
+    - groups: An integer array with the group of every value.
+    - values: The values.
+    - n_groups: The number of groups.
+
+    Returns:
+    - median: An array with the median of every group.
+    - mad: An array with the median absolute deviation of every group.
+    - sizes: An array with the number of values of every group.
+    """
+    median = group_quantiles(groups, values, n_groups, np.array([50]))[0]
+    deviation = np.abs(values - median[groups])
+    mad = group_quantiles(groups, deviation, n_groups, np.array([50]))[0]
+
+    return median, mad, np.bincount(groups, minlength=n_groups)
+
+
+class AnomalyDetector:
+    """
+    Robust z-scores of rentals against a seasonal baseline.
+
+    The baseline of every group of BASELINE_COLUMNS is the median of its
+    rentals, and their spread is the median absolute deviation, so the
+    unusual days themselves barely move it. The z-score of a row is
+    0.6745 * (value - median) / MAD, which matches the standard z-score on
+    normal data. Scoring uses the fitted baseline only, so new rows are scored
+    without the history.
+
+    Parameters:
+    - hourly: Compare hourly rows with the same hour of day.
+    - measures: The rental columns to score.
+    """
+
+    def __init__(self, hourly=False, measures=ANOMALY_MEASURES):
+        self.hourly = hourly
+        self.measures = tuple(measures)
+        self.columns = BASELINE_COLUMNS + (("hr",) if hourly else ())
+        self.coarse_columns = tuple(
+            column for column in self.columns if column != "weathersit"
+        )
+        self.ranges = None
+        self.median = None
+        self.mad = None
+        self.rows = 0
+
+    def fit(self, df):
+        """
+        Compute the baseline of every group.
+
+        Parameters:
+        - df: The rental rows, with the baseline columns and the measures.
+
+        Returns:
+        - self: The fitted detector.
+        """
+        self.ranges = baseline_ranges(df, self.columns)
+        groups, n_groups = baseline_groups(df, self.columns, self.ranges)
+        coarse, n_coarse = baseline_groups(df, self.coarse_columns, self.ranges)
+
+        # Every fine group maps to one coarse group, the one of its rows.
+        parent = np.zeros(n_groups, dtype=np.int64)
+        parent[groups] = coarse
+
+        self.median = {}
+        self.mad = {}
+        for measure in self.measures:
+            values = df[measure].to_numpy(dtype=np.float64)
+            median, mad, sizes = robust_baseline(groups, values, n_groups)
+            coarse_median, coarse_mad, _ = robust_baseline(coarse, values, n_coarse)
+
+            small = sizes < MIN_GROUP_ROWS
+            median[small] = coarse_median[parent[small]]
+            mad[small] = coarse_mad[parent[small]]
+
+            self.median[measure] = median
+            # Rentals are counts, so a spread below one rental is noise.
+            self.mad[measure] = np.maximum(mad, 1.0)
+
+        self.rows = len(df)
+
+        return self
+
+    def score(self, df):
+        """
+        Score rental rows against the fitted baseline.
+
+        Parameters:
+        - df: The rental rows, with the baseline columns and the measures.
+
+        Returns:
+        - scores: A DataFrame with the index of df and, per measure, the '<measure>_baseline' median and the '<measure>_z' robust z-score. Rows of groups unseen by fit(), such as the rows of a later year, have NaN scores.
+        """
+        groups, _ = baseline_groups(df, self.columns, self.ranges)
+        seen = groups >= 0
+        groups = np.maximum(groups, 0)
+
+        scores = {}
+        for measure in self.measures:
+            values = df[measure].to_numpy(dtype=np.float64)
+            median = np.where(seen, self.median[measure][groups], np.nan)
+            scores[f"{measure}_baseline"] = median
+            scores[f"{measure}_z"] = (
+                0.6745 * (values - median) / self.mad[measure][groups]
+            )
+
+        return pd.DataFrame(scores, index=df.index)
+
+
+class AnomalyIndex:
+    """
+    The unusual rows of a dataset, indexed by date and category for the charts.
+
+    Only the rows with a z-score beyond the threshold in one of the measures
+    are kept, with their values, baselines and scores, behind a RentalFilter,
+    so the anomalies of any sidebar selection are a slice of a small frame.
+
+    Parameters:
+    - df: The rental rows, with 'instant', 'dteday', 'season', 'weathersit', the baseline columns and the measures.
+    - version: The version of the dataset.
+    - hourly: Compare hourly rows with the same hour of day.
+    - threshold: The absolute z-score above which a row is unusual.
+    - detector: Optional fitted AnomalyDetector to score with. A new one is fitted on df otherwise.
+    """
+
+    def __init__(self, df, version, hourly=False, threshold=THRESHOLD, detector=None):
+        self.version = version
+        self.hourly = hourly
+        self.threshold = threshold
+        self.detector = detector or AnomalyDetector(hourly).fit(df)
+        self.digest = row_digest(df)
+        self.last_instant = df["instant"].max() if len(df) else 0
+        self.anomalies = self.flag(df)
+        self.filter = RentalFilter(self.anomalies)
+
+    def flag(self, df):
+        """
+        Score rental rows and keep the unusual ones.
+
+        Parameters:
+        - df: The rental rows.
+
+        Returns:
+        - anomalies: A DataFrame with the date, category and measure columns of the unusual rows, their '<measure>_baseline' and '<measure>_z' columns, sorted by date.
+        """
+        scores = self.detector.score(df)
+        z = scores[[f"{measure}_z" for measure in self.detector.measures]]
+        unusual = (z.abs() > self.threshold).any(axis=1).to_numpy()
+
+        columns = ["instant", "dteday"]
+        if self.hourly:
+            columns.append("hr")
+        columns += ["season", "weathersit", *self.detector.measures]
+
+        anomalies = pd.concat([df.loc[unusual, columns], scores[unusual]], axis=1)
+
+        return anomalies.sort_values(
+            columns[1:3] if self.hourly else "dteday", ignore_index=True
+        )
+
+    def extend(self, df, version):
+        """
+        Index a newer version of the dataset, scoring only the rows added since.
+
+        The baseline is kept, unless stored rows were replaced or removed,
+        the new rows started a year it has no baseline for or grew the data by
+        more than REFIT_SHARE since it was fitted. Replaced rows are found by
+        comparing the digest of the stored rows, so a replacement arriving
+        together with new rows is found too.
+
+        Parameters:
+        - df: Every row of the newer version.
+        - version: The newer version.
+
+        Returns:
+        - index: A new AnomalyIndex.
+        """
+        added = df["instant"] > self.last_instant
+        new = df[added]
+        if (
+            row_digest(df[~added]) != self.digest
+            or len(df) > self.detector.rows * (1 + REFIT_SHARE)
+            or not len(new)
+            or baseline_codes(new, "yr").max() > self.detector.ranges["yr"][1]
+        ):
+            return AnomalyIndex(df, version, self.hourly, self.threshold)
+
+        index = AnomalyIndex(
+            new, version, self.hourly, self.threshold, detector=self.detector
+        )
+        index.digest = (self.digest + index.digest) % 2**64
+        index.anomalies = pd.concat(
+            [self.anomalies, index.anomalies], ignore_index=True
+        ).sort_values(["dteday", "hr"] if self.hourly else "dteday", ignore_index=True)
+        index.filter = RentalFilter(index.anomalies)
+
+        return index
+
+    def select(self, start=None, end=None, measure=None, **selections):
+        """
+        Select the unusual rows of a period and a category selection.
+
+        Parameters:
+        - start: The first date to keep, or None for the beginning of the data.
+        - end: The last date to keep, or None for the end of the data.
+        - measure: Optional measure; only the rows unusual in it are kept.
+        - selections: Category filters, as accepted by RentalFilter.select().
+
+        Returns:
+        - anomalies: A DataFrame in the layout of flag().
+        """
+        anomalies = self.filter.select(start, end, **selections)
+        if measure is not None:
+            anomalies = anomalies[anomalies[f"{measure}_z"].abs() > self.threshold]
+
+        return anomalies
+
+
+def unusual_days(anomalies, measure):
+    """
+    Summarize the unusual rows of a measure per day.
+
+    Parameters:
+    - anomalies: The rows returned by AnomalyIndex.select() for the measure.
+    - measure: The measure.
+
+    Returns:
+    - days: A DataFrame indexed by 'dteday' with the number of unusual 'rows' of every day and the 'z' score furthest from zero.
+    """
+    z = anomalies[f"{measure}_z"]
+    extreme = anomalies.assign(z=z).iloc[np.argsort(z.abs().to_numpy(), kind="stable")]
+    days = extreme.drop_duplicates("dteday", keep="last").set_index("dteday")
+
+    return pd.DataFrame(
+        {"rows": anomalies.groupby("dteday").size(), "z": days["z"]}
+    ).sort_index()
+
+
+def build_anomaly_index(df, key, name):
+    """
+    Index the anomalies of a dataset, incrementally across its versions.
+
+    The index of a dataset is kept per name. When its version changes and
+    the new version only appends rows, only those rows are scored.
+
+    Parameters:
+    - df: The rental rows.
+    - key: A hashable version of the dataset, such as loader.data_version().
+    - name: The name of the dataset, "day" or "hour".
+
+    Returns:
+    - index: The AnomalyIndex of that version.
+    """
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = AnomalyIndex(df, key, hourly=name == "hour")
+        elif index.version != key:
+            index = index.extend(df, key)
+        _indexes[name] = index
+
+    return index
@@ -0,0 +1,412 @@
+import argparse
+import asyncio
+import json
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+import pyarrow as pa
+
+from filters import ALL
+from memo import LRUCache
+from view import GRANULARITIES, DashboardData, DashboardView
+
+# Encoded responses are bounded by their total size in bytes.
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+
+FORMATS = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+_response_cache = LRUCache(maxsize=1024, maxweight=RESPONSE_CACHE_BYTES)
+
+
+class QueryError(ValueError):
+    """
+    A query that cannot be answered, with the HTTP status to answer it with.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def daily_totals(view):
+    """
+    Answer the daily rental totals of a selection.
+
+    Parameters:
+    - view: The view.DashboardView of the query.
+
+    Returns:
+    - df: The DataFrame returned by aggregations.create_daily_rentals().
+    """
+    return view.daily_rentals
+
+
+def correlations(view):
+    """
+    Answer the correlation matrix of a selection.
+
+    Parameters:
+    - view: The view.DashboardView of the query.
+
+    Returns:
+    - df: The correlation matrix, with the row names in a 'measure' column.
+    """
+    return view.correlation_matrix.rename_axis("measure").reset_index()
+
+
+def monthly_totals(view):
+    """
+    Answer the total rentals per month over the whole dataset.
+
+    Parameters:
+    - view: The view.DashboardView of the query. Only its data is used.
+
+    Returns:
+    - df: A DataFrame with the 'mnth' code and the 'cnt' total of every month.
+    """
+    return view.data.monthly_data.rename("cnt").reset_index()
+
+
+ENDPOINTS = {
+    "/daily": daily_totals,
+    "/correlations": correlations,
+    "/monthly": monthly_totals,
+}
+
+
+def normalize_query(path, query):
+    """
+    Validate a query and put it in a canonical form.
+
+    Equivalent queries, such as ones listing their parameters in another
+    order or leaving out defaults, normalize to the same tuple.
+
+    Parameters:
+    - path: The endpoint, one of ENDPOINTS.
+    - query: A dictionary of the query string parameters.
+
+    Returns:
+    - query: A tuple of the endpoint, granularity, start and end dates, season, weather situation and format.
+
+    Raises:
+    - QueryError: When the endpoint or a parameter is not valid.
+    """
+    if path not in ENDPOINTS:
+        raise QueryError(f"Unknown endpoint: {path}", status=404)
+
+    unknown = set(query) - {
+        "granularity",
+        "start",
+        "end",
+        "season",
+        "weathersit",
+        "format",
+    }
+    if unknown:
+        raise QueryError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+    granularity = query.get("granularity", GRANULARITIES[0]).capitalize()
+    if granularity not in GRANULARITIES:
+        raise QueryError(f"Unknown granularity: {granularity}")
+
+    data = DashboardData(granularity)
+    first, last = data.date_range()
+    try:
+        start = pd.Timestamp(query.get("start", first))
+        end = pd.Timestamp(query.get("end", last))
+    except ValueError as error:
+        raise QueryError(f"Invalid date: {error}") from None
+    # Empty values and strings such as "NaT" parse to NaT instead of failing.
+    if pd.isna(start) or pd.isna(end):
+        raise QueryError("Invalid date: a start or end date is missing")
+    start, end = max(start.normalize(), first), min(end.normalize(), last)
+    if start > end:
+        raise QueryError("The period does not overlap the data")
+
+    selections = {}
+    for column in ("season", "weathersit"):
+        value = query.get(column, ALL)
+        options = {option.lower(): option for option in data.options(column)}
+        if value.lower() not in options:
+            raise QueryError(
+                f"Unknown {column}: {value}. Expected one of {', '.join(options.values())}"
+            )
+        selections[column] = options[value.lower()]
+
+    format = query.get("format", "json")
+    if format not in FORMATS:
+        raise QueryError(f"Unknown format: {format}")
+
+    return (
+        path,
+        granularity,
+        start.date(),
+        end.date(),
+        selections["season"],
+        selections["weathersit"],
+        format,
+    )
+
+
+def encode(df, format):
+    """
+    Encode a DataFrame as a response body.
+
+    Parameters:
+    - df: The DataFrame to encode.
+    - format: "json" for a list of records, or "arrow" for an Arrow IPC stream.
+
+    Returns:
+    - body: The encoded bytes.
+    """
+    if format == "arrow":
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    return df.to_json(orient="records", date_format="iso").encode()
+
+
+def answer(path, params):
+    """
+    Answer a query, computing its response once per data version.
+
+    Parameters:
+    - path: The endpoint.
+    - params: A dictionary of the query string parameters.
+
+    Returns:
+    - format: The format of the response.
+    - body: The encoded response.
+
+    Raises:
+    - QueryError: When the endpoint or a parameter is not valid.
+    """
+    query = normalize_query(path, params)
+    path, granularity, start, end, season, weathersit, format = query
+    data = DashboardData(granularity)
+    view = DashboardView(data, start, end, season, weathersit)
+
+    body = _response_cache.get_or_compute(
+        (query, data.active_version),
+        lambda: encode(ENDPOINTS[path](view), format),
+    )
+
+    return format, body
+
+
+class QueryServer:
+    """
+    An asyncio HTTP/1.1 server answering GET queries over the dashboard datasets.
+
+    The connections are handled on the event loop and the queries on its
+    thread pool, where a cached response is a lookup. Concurrent requests for
+    the same query wait for a single computation. Connections are kept alive
+    between requests unless the client closes them.
+
+    Parameters:
+    - host: The address to listen on.
+    - port: The port to listen on.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8510):
+        self.host = host
+        self.port = port
+        self._pending = {}
+
+    async def compute(self, path, params):
+        """
+        Answer a query on the thread pool, sharing the work between concurrent identical requests.
+
+        Parameters:
+        - path: The endpoint.
+        - params: A dictionary of the query string parameters.
+
+        Returns:
+        - format: The format of the response.
+        - body: The encoded response.
+        """
+        key = (path, tuple(sorted(params.items())))
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(answer, path, params))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def respond(self, target):
+        """
+        Answer one request.
+
+        Parameters:
+        - target: The request target, the path and the query string.
+
+        Returns:
+        - response: A tuple of the status, the content type and the body.
+        """
+        url = urlsplit(target)
+        # Blank values are kept, so "start=" is rejected instead of ignored.
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        try:
+            format, body = await self.compute(url.path, params)
+        except QueryError as error:
+            return error.status, FORMATS["json"], error_body(error)
+        except Exception as error:
+            return 500, FORMATS["json"], error_body(error)
+
+        return 200, FORMATS[format], body
+
+    async def handle(self, reader, writer):
+        """
+        Serve the requests of one connection.
+
+        Requests with a body are answered with a 400 and the connection is
+        closed, as the endpoints take their parameters from the query string
+        and an unread body would be taken for the next request.
+
+        Parameters:
+        - reader: The asyncio StreamReader of the connection.
+        - writer: The asyncio StreamWriter of the connection.
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError as error:
+                    # A connection closed between two requests is not an error.
+                    if error.partial.strip():
+                        await respond_error(writer, QueryError("Incomplete request"))
+                    break
+                except asyncio.LimitOverrunError:
+                    await respond_error(writer, QueryError("Request head too large"))
+                    break
+                except ConnectionError:
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = (lines[0].split(" ") + ["", ""])[:3]
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in lines[1:])
+                    if name
+                }
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    if version == "HTTP/1.1"
+                    else headers.get("connection", "").lower() == "keep-alive"
+                )
+
+                length = headers.get("content-length", "0")
+                if length not in ("", "0") or "transfer-encoding" in headers:
+                    await respond_error(
+                        writer, QueryError("Request bodies are not supported")
+                    )
+                    break
+
+                if method != "GET":
+                    status, content_type, body = (
+                        405,
+                        FORMATS["json"],
+                        error_body(QueryError("Only GET is supported")),
+                    )
+                else:
+                    status, content_type, body = await self.respond(target)
+
+                await write_response(writer, status, content_type, body, keep_alive)
+
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """
+        Listen for connections until the task is cancelled.
+        """
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+
+async def write_response(writer, status, content_type, body, keep_alive=False):
+    """
+    Write one response on a connection.
+
+    Parameters:
+    - writer: The asyncio StreamWriter of the connection.
+    - status: The HTTP status, one of REASONS.
+    - content_type: The content type of the body.
+    - body: The encoded body.
+    - keep_alive: Tell the client the connection stays open for further requests.
+    """
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        ).encode()
+        + body
+    )
+    await writer.drain()
+
+
+async def respond_error(writer, error):
+    """
+    Answer a request that cannot be read with an error, before closing the connection.
+
+    Parameters:
+    - writer: The asyncio StreamWriter of the connection.
+    - error: The QueryError to answer with.
+    """
+    try:
+        await write_response(writer, error.status, FORMATS["json"], error_body(error))
+    except ConnectionError:
+        pass
+
+
+def error_body(error):
+    """
+    Encode an error as a JSON response body.
+
+    Parameters:
+    - error: The exception.
+
+    Returns:
+    - body: The encoded bytes.
+    """
+    return json.dumps({"error": str(error)}).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the dashboard aggregates over HTTP, as JSON or Arrow IPC."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8510)
+    args = parser.parse_args()
+
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(QueryServer(args.host, args.port).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
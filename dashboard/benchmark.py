@@ -0,0 +1,390 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import loader
+from aggregations import create_daily_rentals
+from anomalies import AnomalyIndex
+from charts import draw_seasonal_trends, draw_weather_impact, plotting
+from correlations import CorrelationStats
+from cube import AggregateCube
+from filters import RentalFilter
+from hourly import HourlyCube, create_hourly_heatmap, create_hourly_profile
+from metrics import summarize_measures
+from pipeline import DAY_SOURCE, HOUR_SOURCE, clean_day, clean_hour
+from quality import QualityChecker
+from store import (
+    HOURLY_STORE_SCHEMA,
+    STORE_SCHEMA,
+    read_store,
+    write_partition,
+)
+from timeseries import create_chart_data
+from windows import YEAR, WindowEngine
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(DASHBOARD_DIR, "benchmark_baseline.json")
+
+SCALES = (1, 100, 10_000)
+
+# 10,000x the hourly file is about 170 million rows and needs tens of GB of
+# memory, so it only runs when asked for with --scales.
+DEFAULT_SCALES = {"day": SCALES, "hour": (1, 100)}
+
+# Stages faster than this are run again, up to REPEATS runs in all, and the
+# fastest run is kept, as the time of a short stage is mostly noise.
+SHORT_STAGE_SECONDS = 1.0
+REPEATS = 5
+
+# Slowdowns smaller than this are timing noise, whatever the tolerance.
+NOISE_SECONDS = 0.1
+
+
+def generate_dataset(source, clean, scale, seed=0):
+    """
+    Generate a synthetic rental dataset by replicating a source file.
+
+    Every source row is repeated 'scale' times, as if the same days were
+    recorded by 'scale' stations, and the rentals are perturbed so the copies
+    differ. Dates and categories keep the distribution of the source.
+
+    Parameters:
+    - source: Path to data/day.csv or data/hour.csv.
+    - clean: The pipeline cleaning function of the source.
+    - scale: The number of copies of every source row.
+    - seed: The seed of the random generator.
+
+    Returns:
+    - df: The synthetic DataFrame, with the categories as integer codes.
+    """
+    rng = np.random.default_rng(seed)
+    base = clean(pd.read_csv(source))
+
+    df = base.loc[base.index.repeat(scale)].reset_index(drop=True)
+    df["instant"] = np.arange(1, len(df) + 1)
+
+    factor = rng.uniform(0.8, 1.2, size=len(df))
+    df["casual"] = np.round(df["casual"] * factor).astype(np.int64)
+    df["registered"] = np.round(df["registered"] * factor).astype(np.int64)
+    df["cnt"] = df["casual"] + df["registered"]
+
+    return df
+
+
+def write_dataset(df, path, schema):
+    """
+    Write a synthetic dataset as a monthly partitioned store.
+
+    Parameters:
+    - df: The DataFrame returned by generate_dataset().
+    - path: The directory of the store.
+    - schema: STORE_SCHEMA or HOURLY_STORE_SCHEMA.
+    """
+    months = df["dteday"].dt.year * 100 + df["dteday"].dt.month
+    for month, rows in df.groupby(months):
+        write_partition(rows, path, f"{month // 100}-{month % 100:02d}", schema)
+
+
+def measure(stage, function, results, trace=True, repeat=True):
+    """
+    Run one benchmark stage and record its wall time and peak memory.
+
+    Peak memory is the peak of the allocations traced by tracemalloc while
+    the stage runs, which covers numpy and pandas buffers. Stages shorter
+    than SHORT_STAGE_SECONDS are run up to REPEATS times and the fastest run
+    is recorded, with the highest peak.
+
+    Parameters:
+    - stage: The name of the stage.
+    - function: A function without arguments running the stage.
+    - results: The dictionary receiving the measurement.
+    - trace: Trace memory allocations. Tracing slows allocation-heavy stages down, so setup stages skip it.
+    - repeat: Repeat a short stage. Stages whose later runs are served from a cache must not be repeated.
+
+    Returns:
+    - value: The return value of the last run of the function.
+    """
+    best = np.inf
+    highest = 0
+    for _ in range(REPEATS if repeat else 1):
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            value = function()
+        finally:
+            seconds = time.perf_counter() - started
+            peak = 0
+            if trace:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+        best = min(best, seconds)
+        highest = max(highest, peak)
+        if seconds >= SHORT_STAGE_SECONDS:
+            break
+
+    results[stage] = {"seconds": round(best, 4), "peak_mb": round(highest / 2**20, 2)}
+
+    return value
+
+
+def run_day(path, results):
+    """
+    Drive the daily data path of the dashboard against a store.
+
+    Parameters:
+    - path: The directory of the synthetic daily store.
+    - results: The dictionary receiving the measurements.
+    """
+
+    def load():
+        loader.clear_cache()
+        return loader.load_categorical(path=path)
+
+    df = measure("load", load, results)
+    measure("load_cached", lambda: loader.load_categorical(path=path), results)
+
+    rental_filter = measure("filter_build", lambda: RentalFilter(df), results)
+    first, last = df["dteday"].min(), df["dteday"].max()
+    middle = first + (last - first) / 2
+    main_df = measure(
+        "filter_select",
+        lambda: rental_filter.select(first, middle, season="Summer", weathersit=None),
+        results,
+    )
+    all_df = rental_filter.select()
+
+    measure("daily_rentals", lambda: create_daily_rentals(all_df), results)
+    measure("anomaly_build", lambda: AnomalyIndex(df, None), results)
+    engine = measure("window_build", lambda: WindowEngine(all_df), results)
+    measure(
+        "window_rolling",
+        lambda: (engine.rolling(90), engine.compare(last, 28, YEAR)),
+        results,
+    )
+    measure("metrics", lambda: summarize_measures(main_df), results)
+    measure("chart_data", lambda: create_chart_data(all_df), results)
+
+    stats = measure("correlation_build", lambda: CorrelationStats(df), results)
+    measure(
+        "correlation_matrix",
+        lambda: stats.correlation_matrix(first, middle, season="Summer"),
+        results,
+    )
+
+    # matplotlib is imported once per process, outside the measured stages.
+    plt, _ = plotting()
+
+    numerical_df = read_store(path)
+    cube = measure("aggregate_build", lambda: AggregateCube(numerical_df), results)
+    measure(
+        "aggregate_stats",
+        lambda: (
+            cube.confidence_interval("season"),
+            cube.confidence_interval("mnth"),
+            cube.box_stats("weathersit"),
+        ),
+        results,
+        repeat=False,
+    )
+
+    def build_figures():
+        for draw in (draw_seasonal_trends, draw_weather_impact):
+            fig = draw(cube)
+            fig.savefig(os.devnull, format="png")
+            plt.close(fig)
+
+    measure("figures", build_figures, results)
+
+
+def run_hour(path, results):
+    """
+    Drive the hourly data path of the dashboard against a store.
+
+    Parameters:
+    - path: The directory of the synthetic hourly store.
+    - results: The dictionary receiving the measurements.
+    """
+
+    def load():
+        loader.clear_cache()
+        return loader.load_hourly(path=path)
+
+    df = measure("load", load, results)
+
+    cube = measure("cube_build", lambda: HourlyCube(df), results)
+    daily = measure("rollup_daily", lambda: cube.rollup_daily(season="Summer"), results)
+    engine = measure("window_build", lambda: WindowEngine(daily), results)
+    measure(
+        "window_rolling",
+        lambda: (engine.rolling(90), engine.compare(engine.last_day(), 28, YEAR)),
+        results,
+    )
+
+    rental_filter = measure("filter_build", lambda: RentalFilter(df), results)
+    hourly_df = measure(
+        "filter_select", lambda: rental_filter.select(season="Summer"), results
+    )
+    measure("heatmap", lambda: create_hourly_heatmap(hourly_df), results)
+    measure("anomaly_build", lambda: AnomalyIndex(df, None, hourly=True), results)
+    measure("profile", lambda: create_hourly_profile(hourly_df), results)
+
+    stats = measure("correlation_build", lambda: CorrelationStats(df), results)
+    measure(
+        "correlation_matrix",
+        lambda: stats.correlation_matrix(season="Summer"),
+        results,
+    )
+
+
+DATASETS = {
+    "day": (DAY_SOURCE, clean_day, STORE_SCHEMA, run_day),
+    "hour": (HOUR_SOURCE, clean_hour, HOURLY_STORE_SCHEMA, run_hour),
+}
+
+
+def run_benchmark(dataset, scale):
+    """
+    Generate a synthetic dataset and benchmark every stage of its data path.
+
+    Parameters:
+    - dataset: "day" or "hour".
+    - scale: The size of the synthetic dataset as a multiple of the source file.
+
+    Returns:
+    - results: A dictionary mapping each stage to its wall time in seconds and peak traced memory in MB.
+    """
+    source, clean, schema, run = DATASETS[dataset]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        df = measure(
+            "generate",
+            lambda: generate_dataset(source, clean, scale),
+            results,
+            trace=False,
+        )
+        # The copies share their timestamps, so only the rules are timed and
+        # the rows are not split.
+        measure("quality_check", lambda: QualityChecker().violations(df), results)
+        measure(
+            "write",
+            lambda: write_dataset(df, directory, schema),
+            results,
+            trace=False,
+        )
+        del df
+        run(directory, results)
+    loader.clear_cache()
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Find the stages that got slower than their baseline.
+
+    Parameters:
+    - results: The measurements of the current run, keyed by "<dataset>-<scale>x" and stage.
+    - baseline: The stored measurements, in the same layout.
+    - tolerance: The allowed relative slowdown, such as 0.5 for 50%.
+
+    Returns:
+    - regressions: A list of (run, stage, baseline seconds, current seconds) tuples.
+    """
+    regressions = []
+    for name, stages in results.items():
+        for stage, measurement in stages.items():
+            reference = baseline.get(name, {}).get(stage)
+            if reference is None:
+                continue
+            allowed = max(
+                reference["seconds"] * (1 + tolerance),
+                reference["seconds"] + NOISE_SECONDS,
+            )
+            if measurement["seconds"] > allowed:
+                regressions.append(
+                    (name, stage, reference["seconds"], measurement["seconds"])
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the data path of the dashboard on synthetic data."
+    )
+    parser.add_argument(
+        "--datasets", nargs="+", default=sorted(DATASETS), help="'day' and/or 'hour'."
+    )
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        type=int,
+        help="Sizes of the synthetic datasets as multiples of the source files. Defaults to 1, 100 and 10000 for 'day', and 1 and 100 for 'hour'.",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed relative slowdown before a stage is reported as a regression.",
+    )
+    args = parser.parse_args()
+
+    for dataset in args.datasets:
+        if dataset not in DATASETS:
+            parser.error(f"unknown dataset: {dataset}")
+
+    results = {}
+    for dataset in args.datasets:
+        for scale in args.scales or DEFAULT_SCALES[dataset]:
+            name = f"{dataset}-{scale}x"
+            results[name] = run_benchmark(dataset, scale)
+
+            print(name)
+            for stage, measurement in results[name].items():
+                print(
+                    f"  {stage:<20} {measurement['seconds']:>10.4f} s"
+                    f" {measurement['peak_mb']:>10.2f} MB"
+                )
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        return
+
+    if not os.path.exists(args.baseline):
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, stage, before, after in regressions:
+        print(f"Regression in {name} {stage}: {before:.4f} s -> {after:.4f} s")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
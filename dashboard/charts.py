@@ -0,0 +1,241 @@
+import functools
+import io
+
+from memo import LRUCache
+from store import CODE_LABELS
+
+# Rendered figures are bounded by their total size in bytes, not their number.
+FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+
+_figure_cache = LRUCache(maxsize=256, maxweight=FIGURE_CACHE_BYTES)
+
+
+@functools.cache
+def plotting():
+    """
+    Import matplotlib and seaborn on first use and apply the dashboard style.
+
+    Importing them takes a large part of the cold start, so it is deferred
+    until a chart is actually drawn.
+
+    Returns:
+    - modules: A tuple of the matplotlib.pyplot and seaborn modules.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set(style="dark")
+
+    return plt, sns
+
+
+def render_figure(key, draw, format="png", dpi=200):
+    """
+    Render a matplotlib figure once and serve the encoded image afterwards.
+
+    The figure is closed as soon as it is encoded, so no figure outlives the
+    call. Only the encoded bytes are cached.
+
+    Parameters:
+    - key: A hashable description of every input that affects the chart, such as the data version and the filter selection.
+    - draw: A function without arguments returning the matplotlib Figure to render.
+    - format: The image format, "png" or "svg".
+    - dpi: The resolution of PNG images.
+
+    Returns:
+    - image: The encoded image as bytes.
+    """
+
+    def compute():
+        plt, _ = plotting()
+        fig = draw()
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=format, dpi=dpi, bbox_inches="tight")
+        finally:
+            plt.close(fig)
+        return buffer.getvalue()
+
+    return _figure_cache.get_or_compute((key, format, dpi), compute)
+
+
+def cached_figure(key, format="png", dpi=200):
+    """
+    Look up a rendered figure without drawing it.
+
+    Parameters:
+    - key: The render_figure() key of the figure.
+    - format: The image format.
+    - dpi: The resolution of PNG images.
+
+    Returns:
+    - image: The encoded image as bytes, or None when it has not been rendered.
+    """
+    return _figure_cache.get((key, format, dpi))
+
+
+def store_figure(key, image, format="png", dpi=200):
+    """
+    Store a figure rendered elsewhere, so render_figure() serves it without drawing.
+
+    Parameters:
+    - key: The render_figure() key of the figure.
+    - image: The encoded image as bytes.
+    - format: The image format.
+    - dpi: The resolution of PNG images.
+    """
+    _figure_cache.put((key, format, dpi), image)
+
+
+def create_anomaly_chart(chart_df, unusual_days, measure, x="dteday"):
+    """
+    Create the line chart of a rental measure with its unusual days marked.
+
+    Parameters:
+    - chart_df: The DataFrame returned by timeseries.create_chart_data().
+    - unusual_days: The DataFrame of the measure in view.DashboardView.unusual_days.
+    - measure: The charted column.
+    - x: The column on the horizontal axis.
+
+    Returns:
+    - chart: An Altair chart layering the series and the unusual days.
+    """
+    import altair as alt
+
+    line = alt.Chart(chart_df).mark_line().encode(x=f"{x}:T", y=f"{measure}:Q")
+    points = (
+        alt.Chart(unusual_days.reset_index())
+        .mark_circle(color="#e4572e", size=60, opacity=1)
+        .encode(
+            x=f"{x}:T",
+            y=f"{measure}:Q",
+            tooltip=[
+                alt.Tooltip(f"{x}:T", title="Date"),
+                alt.Tooltip(f"{measure}:Q", title="Rentals", format=","),
+                alt.Tooltip("z:Q", title="Robust z-score", format="+.1f"),
+                alt.Tooltip("rows:Q", title="Unusual rows"),
+            ],
+        )
+    )
+
+    return line + points
+
+
+def draw_hourly_heatmap(heatmap):
+    """
+    Draw the weekday by hour heatmap of the Hourly Patterns section.
+
+    Parameters:
+    - heatmap: The DataFrame returned by hourly.create_hourly_heatmap().
+
+    Returns:
+    - fig: The matplotlib Figure.
+    """
+    plt, sns = plotting()
+    fig, ax = plt.subplots(figsize=(15, 5))
+    sns.heatmap(heatmap, ax=ax, cmap="crest")
+    ax.set_xlabel("Hour of Day")
+    ax.set_ylabel(" ")
+
+    return fig
+
+
+def draw_seasonal_trends(aggregate_cube):
+    """
+    Draw the mean rentals per season and per month of the Seasonal Trends section.
+
+    Parameters:
+    - aggregate_cube: The cube.AggregateCube of the dataset.
+
+    Returns:
+    - fig: The matplotlib Figure.
+    """
+    plt, sns = plotting()
+    cat_col_vis = ["season", "mnth"]
+
+    fig, ax = plt.subplots(ncols=1, nrows=2, figsize=(15, 15))
+    i = 0
+
+    for cols in cat_col_vis:
+        summary = aggregate_cube.summary(cols)
+        low, high = aggregate_cube.confidence_interval(cols)
+
+        sns.barplot(
+            x=[CODE_LABELS[cols][code] for code in summary.index],
+            y=summary["mean"].to_numpy(),
+            ax=ax[i],
+            edgecolor="#c5c6c7",
+            errorbar=None,
+        )
+        ax[i].errorbar(
+            x=range(len(summary)),
+            y=summary["mean"].to_numpy(),
+            yerr=[summary["mean"].to_numpy() - low, high - summary["mean"].to_numpy()],
+            fmt="none",
+            ecolor=".26",
+            elinewidth=2.7,
+        )
+
+        ax[i].set_xlabel(" ")
+        ax[i].set_ylabel(" ")
+        ax[i].xaxis.set_tick_params(labelsize=14)
+        ax[i].tick_params(left=False, labelleft=False)
+        ax[i].set_ylabel(cols, fontsize=16)
+        ax[i].bar_label(ax[i].containers[0], size="12")
+        i = i + 1
+
+    return fig
+
+
+def draw_weather_impact(aggregate_cube):
+    """
+    Draw the rentals per weather situation of the Weather Impact section.
+
+    Parameters:
+    - aggregate_cube: The cube.AggregateCube of the dataset.
+
+    Returns:
+    - fig: The matplotlib Figure.
+    """
+    plt, sns = plotting()
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.bxp(
+        aggregate_cube.box_stats("weathersit"),
+        patch_artist=True,
+        boxprops={"facecolor": sns.color_palette()[0]},
+        medianprops={"color": ".26"},
+    )
+    ax.set_title("Bike Rentals by Weather Situation")
+    ax.set_xlabel("Weather Situation")
+    ax.set_ylabel("Total Rentals")
+
+    return fig
+
+
+def draw_user_impact(intervals):
+    """
+    Draw the share of casual and registered users per month of the User Impact section.
+
+    Parameters:
+    - intervals: The stats.mean_intervals() of 'casual_percentage' and 'registered_percentage' per month.
+
+    Returns:
+    - fig: The matplotlib Figure.
+    """
+    plt, _ = plotting()
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for column, label in (
+        ("casual_percentage", "Casual"),
+        ("registered_percentage", "Registered"),
+    ):
+        stats = intervals[column]
+        (line,) = ax.plot(stats.index, stats["mean"], label=label)
+        ax.fill_between(
+            stats.index, stats["low"], stats["high"], color=line.get_color(), alpha=0.2
+        )
+    ax.set_title("Casual vs Registered Users Over Time")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Percentage of Total Rentals")
+    ax.legend()
+
+    return fig
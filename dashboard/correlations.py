@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from filters import RentalFilter
+from memo import LRUCache
+
+CORRELATION_COLUMNS = (
+    "temp",
+    "atemp",
+    "hum",
+    "windspeed",
+    "casual",
+    "registered",
+    "cnt",
+)
+
+_stats_cache = LRUCache(maxsize=4)
+_matrix_cache = LRUCache(maxsize=256)
+
+
+class CorrelationStats:
+    """
+    Running sufficient statistics for Pearson correlations, kept per day partition.
+
+    Every partition (one day, season and weather situation) holds its row
+    count, the sums of the columns and the sums of their cross products. The
+    correlation matrix of any sidebar selection is then obtained by adding up
+    the statistics of the matching partitions, without touching the rows.
+
+    Parameters:
+    - df: The input DataFrame containing rental data.
+    - columns: The numeric columns to correlate.
+    - dimensions: The categorical columns the partitions are split by, next to 'dteday'.
+    """
+
+    def __init__(
+        self, df, columns=CORRELATION_COLUMNS, dimensions=("season", "weathersit")
+    ):
+        self.columns = list(columns)
+
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        # Centering keeps the sums of squares well conditioned; correlations
+        # do not depend on the shift.
+        self.shift = values.mean(axis=0)
+        values = values - self.shift
+
+        grouped = df.groupby(["dteday", *dimensions], observed=True, sort=False)
+        groups = grouped.ngroup().to_numpy()
+        n_groups = grouped.ngroups
+
+        self.counts = np.bincount(groups, minlength=n_groups).astype(np.float64)
+        self.sums = np.column_stack(
+            [
+                np.bincount(groups, weights=values[:, i], minlength=n_groups)
+                for i in range(len(self.columns))
+            ]
+        )
+        self.products = np.empty((n_groups, len(self.columns), len(self.columns)))
+        for i in range(len(self.columns)):
+            for j in range(i, len(self.columns)):
+                product = np.bincount(
+                    groups, weights=values[:, i] * values[:, j], minlength=n_groups
+                )
+                self.products[:, i, j] = product
+                self.products[:, j, i] = product
+
+        partitions = grouped.size().reset_index()[["dteday", *dimensions]]
+        partitions["partition"] = np.arange(n_groups)
+        self.filter = RentalFilter(partitions, categorical_columns=dimensions)
+
+    def combine(self, partitions):
+        """
+        Add up the statistics of several partitions.
+
+        Parameters:
+        - partitions: An array of partition numbers.
+
+        Returns:
+        - stats: A tuple of the row count, the column sums and the cross product sums.
+        """
+        return (
+            self.counts[partitions].sum(),
+            self.sums[partitions].sum(axis=0),
+            self.products[partitions].sum(axis=0),
+        )
+
+    def correlation_matrix(self, start=None, end=None, **selections):
+        """
+        Compute the Pearson correlation matrix of a sidebar selection.
+
+        Parameters:
+        - start: The first date to keep, or None for the beginning of the data.
+        - end: The last date to keep, or None for the end of the data.
+        - selections: Category filters, as accepted by RentalFilter.select().
+
+        Returns:
+        - matrix: A DataFrame with the correlation of every pair of columns. Pairs involving a constant column are NaN.
+        """
+        partitions = self.filter.select(start, end, **selections)[
+            "partition"
+        ].to_numpy()
+        count, sums, products = self.combine(partitions)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = products - np.outer(sums, sums) / count
+            deviation = np.sqrt(np.diag(covariance))
+            matrix = covariance / np.outer(deviation, deviation)
+
+        matrix = np.clip(matrix, -1.0, 1.0)
+
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+
+
+def build_correlation_stats(df, key):
+    """
+    Build the correlation statistics of a dataset once per data version.
+
+    Parameters:
+    - df: The input DataFrame containing rental data.
+    - key: A hashable version of the dataset, such as loader.data_version().
+
+    Returns:
+    - stats: The shared CorrelationStats for that version.
+    """
+    return _stats_cache.get_or_compute(key, lambda: CorrelationStats(df))
+
+
+def create_correlation_matrix(stats, key, start=None, end=None, **selections):
+    """
+    Compute the correlation matrix of a sidebar selection, memoized per selection.
+
+    Parameters:
+    - stats: The CorrelationStats of the dataset.
+    - key: A hashable description of the data version and the filter selection.
+    - start: The first date to keep, or None for the beginning of the data.
+    - end: The last date to keep, or None for the end of the data.
+    - selections: Category filters, as accepted by RentalFilter.select().
+
+    Returns:
+    - matrix: A DataFrame with the correlation of every pair of columns.
+    """
+    return _matrix_cache.get_or_compute(
+        key, lambda: stats.correlation_matrix(start, end, **selections)
+    )
@@ -0,0 +1,152 @@
+import threading
+
+from memo import LRUCache
+from stats import box_table, interval_table, statistics_pool, submit
+
+CUBE_DIMENSIONS = ("season", "mnth", "weathersit", "yr", "workingday")
+QUANTILES = (0.25, 0.5, 0.75)
+
+_cube_cache = LRUCache(maxsize=4)
+
+
+class AggregateCube:
+    """
+    Materialized rental statistics per season, month, weather, year and working day.
+
+    The cells hold the count, sum, mean and quartiles of the value column.
+    Marginal means are derived from the cell counts and sums, while the
+    bootstrap confidence intervals and box plot statistics, which need the
+    raw values, are computed on first use and kept for the life of the cube.
+    With a statistics pool they are computed in its worker processes, and
+    the *_future methods return without waiting for them.
+
+    Parameters:
+    - df: A DataFrame with the cube dimensions as integer codes and the value column.
+    - value: The column to aggregate.
+    - n_boot: The number of bootstrap resamples used for confidence intervals.
+    - seed: The seed of the bootstrap random generator.
+    - pool: Optional stats.StatisticsPool computing the intervals and box plot statistics.
+    """
+
+    def __init__(self, df, value="cnt", n_boot=1000, seed=0, pool=None):
+        self.value = value
+        self.n_boot = n_boot
+        self.seed = seed
+        self.pool = pool
+
+        grouped = df.groupby(list(CUBE_DIMENSIONS))[value]
+        cells = grouped.agg(["count", "sum", "mean"])
+        quantiles = grouped.quantile(list(QUANTILES)).unstack()
+        quantiles.columns = [f"q{int(q * 100)}" for q in QUANTILES]
+        self.cells = cells.join(quantiles).reset_index()
+
+        self.groups = {
+            dimension: {
+                code: values.to_numpy() for code, values in df.groupby(dimension)[value]
+            }
+            for dimension in CUBE_DIMENSIONS
+        }
+
+        self._intervals = {}
+        self._box_stats = {}
+        self._lock = threading.Lock()
+
+    def summary(self, dimension):
+        """
+        Summarize the value column along one dimension.
+
+        Parameters:
+        - dimension: One of CUBE_DIMENSIONS.
+
+        Returns:
+        - summary: A DataFrame indexed by category code with the 'count', 'sum' and 'mean' of the value column.
+        """
+        summary = self.cells.groupby(dimension)[["count", "sum"]].sum()
+        summary["mean"] = summary["sum"] / summary["count"]
+
+        return summary
+
+    def interval_future(self, dimension, level=95):
+        """
+        Start bootstrapping a confidence interval of the mean for every category of a dimension.
+
+        Parameters:
+        - dimension: One of CUBE_DIMENSIONS.
+        - level: The confidence level in percent.
+
+        Returns:
+        - future: A Future of the tuple of (low, high) arrays in the order of summary(dimension).
+        """
+        return self._submit(
+            self._intervals,
+            (dimension, level),
+            interval_table,
+            self.groups[dimension],
+            self.n_boot,
+            level,
+            self.seed,
+        )
+
+    def confidence_interval(self, dimension, level=95):
+        """
+        Bootstrap a confidence interval of the mean for every category of a dimension.
+
+        Parameters:
+        - dimension: One of CUBE_DIMENSIONS.
+        - level: The confidence level in percent.
+
+        Returns:
+        - interval: A tuple of (low, high) arrays in the order of summary(dimension).
+        """
+        return self.interval_future(dimension, level).result()
+
+    def box_stats_future(self, dimension):
+        """
+        Start computing the box plot statistics of every category of a dimension.
+
+        Parameters:
+        - dimension: One of CUBE_DIMENSIONS.
+
+        Returns:
+        - future: A Future of the list returned by box_stats().
+        """
+        return self._submit(
+            self._box_stats, dimension, box_table, self.groups[dimension]
+        )
+
+    def box_stats(self, dimension):
+        """
+        Compute the box plot statistics of every category of a dimension.
+
+        Parameters:
+        - dimension: One of CUBE_DIMENSIONS.
+
+        Returns:
+        - stats: A list of dictionaries accepted by matplotlib's Axes.bxp, labelled with the category codes.
+        """
+        return self.box_stats_future(dimension).result()
+
+    def _submit(self, futures, key, function, *args):
+        with self._lock:
+            future = futures.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = submit(self.pool, function, *args)
+                futures[key] = future
+
+        return future
+
+
+def build_aggregate_cube(df, key):
+    """
+    Build the aggregate cube of a dataset once per data version.
+
+    Parameters:
+    - df: A DataFrame with the cube dimensions as integer codes and 'cnt'.
+    - key: A hashable version of the dataset, such as loader.data_version().
+
+    Returns:
+    - cube: The shared AggregateCube for that version, computing its statistics in the process statistics pool.
+    """
+    return _cube_cache.get_or_compute(
+        key, lambda: AggregateCube(df, pool=statistics_pool())
+    )
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from memo import LRUCache
+
+ALL = "All"
+
+_filter_cache = LRUCache(maxsize=4)
+
+
+class RentalFilter:
+    """
+    Filter engine over a rental DataFrame for the sidebar selection.
+
+    The frame is sorted by date once so date ranges become binary-search
+    slices, and every categorical column is factorized once so category
+    filters are lookups on small integer codes instead of string comparisons.
+
+    Parameters:
+    - df: The input DataFrame containing rental data.
+    - date_column: The datetime column used for the period selection.
+    - categorical_columns: The columns that can be filtered by category.
+    """
+
+    def __init__(
+        self, df, date_column="dteday", categorical_columns=("season", "weathersit")
+    ):
+        self.date_column = date_column
+        self.df = df.sort_values(date_column, kind="stable", ignore_index=True)
+        self.dates = self.df[date_column].to_numpy(dtype="datetime64[ns]")
+
+        self.codes = {}
+        self.categories = {}
+        for column in categorical_columns:
+            codes, categories = pd.factorize(self.df[column])
+            self.codes[column] = codes
+            self.categories[column] = list(categories)
+
+    def options(self, column):
+        """
+        List the categories of a column in order of first appearance.
+
+        Parameters:
+        - column: The categorical column.
+
+        Returns:
+        - options: A list of category labels.
+        """
+        return list(self.categories[column])
+
+    def date_slice(self, start=None, end=None):
+        """
+        Find the row positions covering an inclusive date range.
+
+        Parameters:
+        - start: The first date to keep, or None for the beginning of the data.
+        - end: The last date to keep, or None for the end of the data.
+
+        Returns:
+        - bounds: A (lo, hi) tuple of positions in the sorted frame.
+        """
+        lo = 0
+        hi = len(self.dates)
+        if start is not None:
+            lo = np.searchsorted(
+                self.dates, np.datetime64(pd.Timestamp(start)), side="left"
+            )
+        if end is not None:
+            hi = np.searchsorted(
+                self.dates, np.datetime64(pd.Timestamp(end)), side="right"
+            )
+
+        return int(lo), int(max(lo, hi))
+
+    def select(self, start=None, end=None, **selections):
+        """
+        Select the rows matching a period and any combination of categories.
+
+        Parameters:
+        - start: The first date to keep, or None for the beginning of the data.
+        - end: The last date to keep, or None for the end of the data.
+        - selections: One keyword per categorical column. A value of None or "All" keeps every category, a single label keeps that category and a list of labels keeps any of them.
+
+        Returns:
+        - df: The matching rows. Without category filters this is a slice of the sorted frame rather than a copy.
+        """
+        lo, hi = self.date_slice(start, end)
+        window = self.df.iloc[lo:hi]
+
+        mask = None
+        for column, selected in selections.items():
+            if selected is None or selected == ALL:
+                continue
+            if isinstance(selected, str):
+                selected = [selected]
+
+            categories = self.categories[column]
+            allowed = np.zeros(len(categories) + 1, dtype=bool)
+            for label in selected:
+                if label in categories:
+                    allowed[categories.index(label)] = True
+
+            # Missing values are factorized to -1, which maps to the trailing False.
+            column_mask = allowed[self.codes[column][lo:hi]]
+            mask = column_mask if mask is None else mask & column_mask
+
+        if mask is None:
+            return window
+
+        return window[mask]
+
+
+def build_filter(df, key):
+    """
+    Build the filter engine of a dataset once per data version.
+
+    Parameters:
+    - df: The input DataFrame containing rental data.
+    - key: A hashable version of the dataset, such as loader.data_version().
+
+    Returns:
+    - rental_filter: The shared RentalFilter for that version.
+    """
+    return _filter_cache.get_or_compute(key, lambda: RentalFilter(df))
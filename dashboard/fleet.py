@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from labels import SEASON_LABELS, category_codes
+from memo import LRUCache
+from stats import group_quantiles
+
+USER_TYPES = ("casual", "registered", "cnt")
+
+# The service levels the demand quantiles are precomputed for, in percent.
+SERVICE_LEVELS = np.arange(50, 100)
+
+_planner_cache = LRUCache(maxsize=4)
+
+
+class FleetPlanner:
+    """
+    Recommends the number of bikes to make available per season, weekday and hour.
+
+    The hourly rentals of every season, weekday and hour of day are reduced
+    once to their quantiles at every service level of SERVICE_LEVELS, for
+    casual users, registered users and both. Serving the demand of a cell at
+    a service level of p% takes as many bikes as the p-th percentile of its
+    hourly rentals, so changing the service level or the budget only reads
+    the precomputed table.
+
+    Parameters:
+    - df: The hourly rental data, with 'season', 'weekday', 'hr' and the USER_TYPES columns.
+    """
+
+    def __init__(self, df):
+        seasons = category_codes(df["season"], SEASON_LABELS)
+        weekdays = df["weekday"].to_numpy(dtype=np.int64)
+        hours = df["hr"].to_numpy(dtype=np.int64)
+        groups = ((seasons - 1) * 7 + weekdays) * 24 + hours
+
+        self.cells = pd.MultiIndex.from_product(
+            [list(SEASON_LABELS), range(7), range(24)],
+            names=["season", "weekday", "hr"],
+        )
+        self.quantiles = {
+            user_type: group_quantiles(
+                groups,
+                df[user_type].to_numpy(),
+                len(self.cells),
+                SERVICE_LEVELS,
+            )
+            for user_type in USER_TYPES
+        }
+
+    def level_index(self, service_level):
+        """
+        Find the precomputed service level serving at least the requested one.
+
+        Parameters:
+        - service_level: The share of hours whose demand is fully served, in percent.
+
+        Returns:
+        - index: The row of the quantile tables.
+        """
+        index = np.searchsorted(SERVICE_LEVELS, service_level)
+
+        return min(index, len(SERVICE_LEVELS) - 1)
+
+    def recommend(self, service_level=95):
+        """
+        Recommend the bikes to make available in every cell.
+
+        Parameters:
+        - service_level: The share of hours whose demand is fully served, in percent.
+
+        Returns:
+        - bikes: A DataFrame indexed by season code, weekday and hour, with the bikes needed for casual users, registered users and both.
+        """
+        index = self.level_index(service_level)
+
+        return pd.DataFrame(
+            {
+                user_type: np.ceil(self.quantiles[user_type][index])
+                for user_type in USER_TYPES
+            },
+            index=self.cells,
+        )
+
+    def fleet_size(self, service_level=95, season=None):
+        """
+        Compute the bikes needed at the busiest hour.
+
+        Parameters:
+        - service_level: The share of hours whose demand is fully served, in percent.
+        - season: Optional season code to restrict the cells to.
+
+        Returns:
+        - bikes: The largest recommendation over the cells.
+        """
+        needed = self.quantiles["cnt"][self.level_index(service_level)]
+        if season is not None:
+            needed = needed.reshape(len(SEASON_LABELS), -1)[season - 1]
+
+        return int(np.ceil(np.nanmax(needed)))
+
+    def service_level(self, budget, season=None):
+        """
+        Find the highest service level a fleet of a given size can offer in every cell.
+
+        Parameters:
+        - budget: The number of bikes available.
+        - season: Optional season code to restrict the cells to.
+
+        Returns:
+        - level: The service level in percent, or None when the budget does not reach the lowest precomputed level.
+        """
+        needed = self.quantiles["cnt"]
+        if season is not None:
+            needed = needed.reshape(len(SERVICE_LEVELS), len(SEASON_LABELS), -1)[
+                :, season - 1
+            ]
+
+        peaks = np.nanmax(np.ceil(needed), axis=1)
+        affordable = np.flatnonzero(peaks <= budget)
+        if len(affordable) == 0:
+            return None
+
+        return int(SERVICE_LEVELS[affordable[-1]])
+
+
+def build_fleet_planner(df, key):
+    """
+    Build the fleet planner of a dataset once per data version.
+
+    Parameters:
+    - df: The hourly rental data.
+    - key: A hashable version of the dataset, such as loader.data_version().
+
+    Returns:
+    - planner: The shared FleetPlanner for that version.
+    """
+    return _planner_cache.get_or_compute(key, lambda: FleetPlanner(df))
@@ -0,0 +1,405 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from labels import category_codes
+from memo import LRUCache
+from schema import column_labels
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(DASHBOARD_DIR, "models")
+
+# Bump when the features change, so stored models are retrained.
+MODEL_VERSION = 1
+
+TARGETS = ("cnt", "casual", "registered")
+ALPHAS = (0.01, 0.1, 1.0, 10.0, 100.0)
+FOLDS = 5
+CHUNK_ROWS = 100_000
+
+# The categorical features, with their codes. The hour of day is crossed with
+# 'workingday', as the commuting peaks only appear on working days.
+CATEGORIES = {
+    "season": range(1, 5),
+    "mnth": range(1, 13),
+    "weekday": range(0, 7),
+    "weathersit": range(1, 5),
+}
+WEATHER_FEATURES = ("temp", "atemp", "hum", "windspeed")
+
+# The ranges used to normalize the weather measures of the dataset.
+WEATHER_SCALES = {
+    "temp": (-8.0, 39.0),
+    "atemp": (-16.0, 50.0),
+    "hum": (0.0, 100.0),
+    "windspeed": (0.0, 67.0),
+}
+
+_model_cache = LRUCache(maxsize=4)
+
+
+def normalize_weather(column, value):
+    """
+    Convert a weather measure to the normalized scale of the dataset.
+
+    Parameters:
+    - column: One of WEATHER_FEATURES.
+    - value: The measure in degrees Celsius, percent or km/h.
+
+    Returns:
+    - value: The normalized measure.
+    """
+    low, high = WEATHER_SCALES[column]
+
+    return (value - low) / (high - low)
+
+
+def feature_names(hourly):
+    """
+    List the columns of the design matrix.
+
+    Parameters:
+    - hourly: Include the hour of day features.
+
+    Returns:
+    - names: A list of column names, the intercept first.
+    """
+    names = ["intercept"]
+    for column, codes in CATEGORIES.items():
+        names += [f"{column}={code}" for code in codes]
+    names.append("workingday")
+    if hourly:
+        names += [f"hr={hour},workingday={day}" for day in (0, 1) for hour in range(24)]
+    names += list(WEATHER_FEATURES) + ["temp^2"]
+
+    return names
+
+
+def design_matrix(df, hourly):
+    """
+    Encode rental rows as the design matrix of the forecasting model.
+
+    Parameters:
+    - df: A DataFrame with the feature columns, categories as codes or labels.
+    - hourly: Include the hour of day features. Requires an 'hr' column.
+
+    Returns:
+    - X: A float64 array with one row per input row and the columns of feature_names().
+    """
+    n = len(df)
+    rows = np.arange(n)
+    X = np.zeros((n, len(feature_names(hourly))))
+    X[:, 0] = 1.0
+
+    offset = 1
+    for column, codes in CATEGORIES.items():
+        X[
+            rows,
+            offset
+            + category_codes(df[column], column_labels(column, df[column]))
+            - codes.start,
+        ] = 1.0
+        offset += len(codes)
+
+    workingday = df["workingday"].to_numpy(dtype=np.int64)
+    X[:, offset] = workingday
+    offset += 1
+
+    if hourly:
+        hours = df["hr"].to_numpy(dtype=np.int64)
+        X[rows, offset + workingday * 24 + hours] = 1.0
+        offset += 48
+
+    weather = df[list(WEATHER_FEATURES)].to_numpy(dtype=np.float64)
+    X[:, offset : offset + len(WEATHER_FEATURES)] = weather
+    X[:, offset + len(WEATHER_FEATURES)] = weather[:, 0] ** 2
+
+    return X
+
+
+def block_statistics(df, hourly, targets):
+    """
+    Compute the sufficient statistics of least squares on a block of rows.
+
+    Parameters:
+    - df: The rows of the block.
+    - hourly: Include the hour of day features.
+    - targets: The target columns.
+
+    Returns:
+    - stats: A tuple of the row count, X'X, X'Y and the sums of squares of Y.
+    """
+    X = design_matrix(df, hourly)
+    Y = df[list(targets)].to_numpy(dtype=np.float64)
+
+    return len(df), X.T @ X, X.T @ Y, (Y**2).sum(axis=0)
+
+
+def solve_ridge(gram, cross, alpha):
+    """
+    Solve the ridge regression normal equations, without penalizing the intercept.
+
+    Parameters:
+    - gram: The X'X matrix.
+    - cross: The X'Y matrix.
+    - alpha: The regularization strength.
+
+    Returns:
+    - weights: An array with one column of weights per target.
+    """
+    penalty = np.full(len(gram), alpha)
+    penalty[0] = 0.0
+
+    return np.linalg.solve(gram + np.diag(penalty), cross)
+
+
+def squared_error(stats, weights):
+    """
+    Compute the sum of squared errors of a model on a block, from its statistics.
+
+    Parameters:
+    - stats: The statistics of the block, as returned by block_statistics().
+    - weights: The weights of the model.
+
+    Returns:
+    - sse: An array with the sum of squared errors of each target.
+    """
+    _, gram, cross, squares = stats
+
+    return (
+        squares
+        - 2 * np.einsum("pk,pk->k", weights, cross)
+        + np.einsum("pk,pq,qk->k", weights, gram, weights)
+    )
+
+
+class DemandForecaster:
+    """
+    Ridge regression of rental demand on calendar and weather features.
+
+    Training never holds the full design matrix: the rows are encoded in
+    chunks, in parallel, and reduced to the sufficient statistics X'X and X'Y.
+    The time-series cross-validation folds are contiguous blocks in date
+    order; each fold trains on every block before its validation block, so
+    its statistics are prefix sums of the block statistics and every fold and
+    regularization strength costs one small linear solve.
+
+    Parameters:
+    - alphas: The regularization strengths to choose from.
+    - folds: The number of validation blocks.
+    - targets: The columns to predict.
+    """
+
+    def __init__(self, alphas=ALPHAS, folds=FOLDS, targets=TARGETS):
+        self.alphas = tuple(alphas)
+        self.folds = folds
+        self.targets = tuple(targets)
+        self.hourly = None
+        self.alpha = None
+        self.weights = None
+        self.scores = None
+
+    def fit(self, df, date_column="dteday", workers=None):
+        """
+        Choose the regularization strength by time-series cross-validation and fit the model.
+
+        Parameters:
+        - df: The rental rows, with the feature and target columns.
+        - date_column: The column giving the order of the rows.
+        - workers: The number of threads encoding the rows. Defaults to the number of CPUs.
+
+        Returns:
+        - self: The fitted forecaster.
+        """
+        self.hourly = "hr" in df
+        order = [date_column, "hr"] if self.hourly else [date_column]
+        df = df.sort_values(order, kind="stable", ignore_index=True)
+
+        # One block to train the first fold on, then one per validation fold.
+        bounds = np.linspace(0, len(df), self.folds + 2).astype(int)
+        chunks = [
+            (block, start, min(start + CHUNK_ROWS, end))
+            for block, (begin, end) in enumerate(zip(bounds[:-1], bounds[1:]))
+            for start in range(begin, end, CHUNK_ROWS)
+        ]
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            results = executor.map(
+                lambda chunk: block_statistics(
+                    df.iloc[chunk[1] : chunk[2]], self.hourly, self.targets
+                ),
+                chunks,
+            )
+            blocks = [None] * (self.folds + 1)
+            for (block, _, _), stats in zip(chunks, results):
+                blocks[block] = (
+                    stats
+                    if blocks[block] is None
+                    else tuple(a + b for a, b in zip(blocks[block], stats))
+                )
+
+        self.scores = {}
+        for alpha in self.alphas:
+            errors = np.zeros(len(self.targets))
+            count = 0
+            train = blocks[0]
+            for block in blocks[1:]:
+                weights = solve_ridge(train[1], train[2], alpha)
+                errors += squared_error(block, weights)
+                count += block[0]
+                train = tuple(a + b for a, b in zip(train, block))
+            rmse = np.sqrt(np.maximum(errors, 0) / count)
+            self.scores[alpha] = dict(zip(self.targets, rmse.tolist()))
+
+        self.alpha = min(self.alphas, key=lambda alpha: self.scores[alpha]["cnt"])
+        self.weights = solve_ridge(train[1], train[2], self.alpha)
+
+        return self
+
+    def predict(self, df):
+        """
+        Predict the rentals of a batch of rows.
+
+        Parameters:
+        - df: A DataFrame with the feature columns.
+
+        Returns:
+        - predictions: A DataFrame with one column per target, clipped at zero.
+        """
+        predictions = np.maximum(design_matrix(df, self.hourly) @ self.weights, 0)
+
+        return pd.DataFrame(predictions, index=df.index, columns=list(self.targets))
+
+    def save(self, path):
+        """
+        Store the fitted model.
+
+        Parameters:
+        - path: Path of the .npz file.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        scores = np.array(
+            [[self.scores[a][t] for t in self.targets] for a in self.alphas]
+        )
+        with open(path + ".tmp", "wb") as file:
+            np.savez(
+                file,
+                alphas=np.array(self.alphas),
+                targets=np.array(self.targets),
+                folds=self.folds,
+                hourly=self.hourly,
+                alpha=self.alpha,
+                weights=self.weights,
+                scores=scores,
+            )
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a model stored by save().
+
+        Parameters:
+        - path: Path of the .npz file.
+
+        Returns:
+        - forecaster: The fitted DemandForecaster.
+        """
+        with np.load(path) as stored:
+            forecaster = cls(
+                alphas=stored["alphas"].tolist(),
+                folds=int(stored["folds"]),
+                targets=stored["targets"].tolist(),
+            )
+            forecaster.hourly = bool(stored["hourly"])
+            forecaster.alpha = float(stored["alpha"])
+            forecaster.weights = stored["weights"]
+            forecaster.scores = {
+                alpha: dict(zip(forecaster.targets, row))
+                for alpha, row in zip(forecaster.alphas, stored["scores"].tolist())
+            }
+
+        return forecaster
+
+
+def scenario_frame(
+    season, mnth, weekday, workingday, weathersit, temperature, humidity, windspeed
+):
+    """
+    Build the 24 hourly rows of a what-if weather scenario.
+
+    Parameters:
+    - season: The season code.
+    - mnth: The month code.
+    - weekday: The weekday code, 0 being Sunday.
+    - workingday: 1 for a working day, 0 otherwise.
+    - weathersit: The weather situation code.
+    - temperature: The temperature in degrees Celsius, also used as the feeling temperature.
+    - humidity: The relative humidity in percent.
+    - windspeed: The wind speed in km/h.
+
+    Returns:
+    - df: A DataFrame with one row per hour of day, indexed by 'hr'.
+    """
+    hours = np.arange(24)
+
+    return pd.DataFrame(
+        {
+            "season": season,
+            "mnth": mnth,
+            "hr": hours,
+            "weekday": weekday,
+            "workingday": workingday,
+            "weathersit": weathersit,
+            "temp": normalize_weather("temp", temperature),
+            "atemp": normalize_weather("atemp", temperature),
+            "hum": normalize_weather("hum", humidity),
+            "windspeed": normalize_weather("windspeed", windspeed),
+        },
+        index=pd.Index(hours, name="hr"),
+    )
+
+
+def model_path(key):
+    """
+    Build the path of the stored model of a data version.
+
+    Parameters:
+    - key: A hashable description of the training data, such as loader.data_version().
+
+    Returns:
+    - path: The path of the .npz file in MODEL_DIR.
+    """
+    digest = hashlib.sha1(repr((key, MODEL_VERSION)).encode()).hexdigest()[:16]
+
+    return os.path.join(MODEL_DIR, f"forecast-{digest}.npz")
+
+
+def load_forecaster(df, key):
+    """
+    Load the forecaster of a data version, training it on first use.
+
+    Fitted models are kept in memory and stored in MODEL_DIR, so a new
+    process reuses the model trained by another one on the same data.
+
+    Parameters:
+    - df: The rental rows to train on.
+    - key: A hashable description of the training data, such as loader.data_version().
+
+    Returns:
+    - forecaster: The fitted DemandForecaster.
+    """
+
+    def compute():
+        path = model_path(key)
+        if os.path.exists(path):
+            return DemandForecaster.load(path)
+
+        forecaster = DemandForecaster().fit(df)
+        forecaster.save(path)
+        return forecaster
+
+    return _model_cache.get_or_compute(key, compute)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from filters import RentalFilter
+from labels import WEEKDAY_LABELS
+from memo import LRUCache
+
+RENTAL_MEASURES = ("cnt", "casual", "registered")
+WEATHER_MEASURES = ("temp", "atemp", "hum", "windspeed")
+
+_cube_cache = LRUCache(maxsize=4)
+
+
+class HourlyCube:
+    """
+    Hourly rentals pre-aggregated per day, season and weather situation.
+
+    The cube is built once from the raw hourly rows. Daily roll-ups for any
+    sidebar selection are then answered from the cube, which holds a few rows
+    per day instead of 24, so switching granularities never re-scans the raw
+    hourly data.
+
+    Parameters:
+    - df: The hourly DataFrame returned by loader.load_hourly().
+    """
+
+    def __init__(self, df):
+        grouped = df.groupby(["dteday", "season", "weathersit"], observed=True)
+
+        cube = grouped[list(RENTAL_MEASURES + WEATHER_MEASURES)].sum()
+        cube["hours"] = grouped.size()
+
+        self.cube = cube.reset_index()
+        self.filter = RentalFilter(self.cube)
+        self.first_date = self.cube["dteday"].min()
+
+    def rollup_daily(self, start=None, end=None, **selections):
+        """
+        Roll the hourly rentals matching a selection up to one row per day.
+
+        Parameters:
+        - start: The first date to keep, or None for the beginning of the data.
+        - end: The last date to keep, or None for the end of the data.
+        - selections: Category filters, as accepted by RentalFilter.select().
+
+        Returns:
+        - daily: A DataFrame with 'instant', 'dteday', the summed rental columns, the hour-weighted mean weather columns and the number of matching 'hours' per day.
+        """
+        cells = self.filter.select(start, end, **selections)
+
+        daily = cells.groupby("dteday", sort=True)[
+            list(RENTAL_MEASURES + WEATHER_MEASURES) + ["hours"]
+        ].sum()
+        for measure in WEATHER_MEASURES:
+            daily[measure] = daily[measure] / daily["hours"]
+
+        daily = daily.reset_index()
+        daily.insert(0, "instant", (daily["dteday"] - self.first_date).dt.days + 1)
+
+        return daily
+
+
+def build_hourly_cube(df, key):
+    """
+    Build the hourly cube of a dataset once per data version.
+
+    Parameters:
+    - df: The hourly DataFrame returned by loader.load_hourly().
+    - key: A hashable version of the dataset, such as loader.data_version(loader.hourly_path()).
+
+    Returns:
+    - cube: The shared HourlyCube for that version.
+    """
+    return _cube_cache.get_or_compute(key, lambda: HourlyCube(df))
+
+
+def create_hourly_heatmap(df, value="cnt"):
+    """
+    Create the mean of a rental column per weekday and hour of day.
+
+    Parameters:
+    - df: The hourly DataFrame containing rental data.
+    - value: The column to average.
+
+    Returns:
+    - heatmap: A DataFrame with one row per weekday (Sunday first) and one column per hour. Cells without data are NaN.
+    """
+    index = df["weekday"].to_numpy(dtype=np.int64) * 24 + df["hr"].to_numpy(
+        dtype=np.int64
+    )
+
+    totals = np.bincount(index, weights=df[value].to_numpy(), minlength=7 * 24)
+    counts = np.bincount(index, minlength=7 * 24)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = totals / counts
+
+    return pd.DataFrame(
+        means.reshape(7, 24),
+        index=[WEEKDAY_LABELS[day] for day in range(7)],
+        columns=range(24),
+    )
+
+
+def create_hourly_profile(df, measures=RENTAL_MEASURES):
+    """
+    Create the mean rentals per hour of day.
+
+    Parameters:
+    - df: The hourly DataFrame containing rental data.
+    - measures: The rental columns to average.
+
+    Returns:
+    - profile: A DataFrame indexed by hour of day with one column per measure.
+    """
+    hours = df["hr"].to_numpy(dtype=np.int64)
+    counts = np.bincount(hours, minlength=24)
+
+    profile = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for measure in measures:
+            totals = np.bincount(hours, weights=df[measure].to_numpy(), minlength=24)
+            profile[measure] = totals / counts
+
+    return pd.DataFrame(profile, index=pd.RangeIndex(24, name="hr"))
@@ -0,0 +1,218 @@
+import io
+import os
+
+import pandas as pd
+
+from pipeline import (
+    CLIP_LIMITS,
+    GRANULARITIES,
+    PIPELINE_VERSION,
+    hash_rows,
+    iter_partitions,
+)
+from quality import (
+    QualityChecker,
+    merge_reports,
+    new_report,
+    read_quarantine,
+    write_quarantine,
+)
+from schema import validate
+from store import (
+    MANIFEST_PATH,
+    list_partitions,
+    load_manifest,
+    read_partition,
+    save_manifest,
+    write_partition,
+)
+from summaries import summarize_partition
+
+
+def normalize_rows(rows, source):
+    """
+    Put new rows in the layout and the types of a source CSV file.
+
+    Parameters:
+    - rows: A DataFrame with the columns of the source file. 'dteday' may be a string or a datetime.
+    - source: Path to the source CSV file.
+
+    Returns:
+    - rows: A DataFrame with the columns in source order, parsed the same way as the pipeline reads the source.
+    """
+    columns = list(pd.read_csv(source, nrows=0).columns)
+    missing = [column for column in columns if column not in rows]
+    if missing:
+        raise ValueError(f"New rows are missing columns: {', '.join(missing)}")
+
+    rows = rows[columns].copy()
+    rows["dteday"] = pd.to_datetime(rows["dteday"]).dt.strftime("%Y-%m-%d")
+
+    # Round-trip through CSV so the rows hash like the chunks of the pipeline.
+    return pd.read_csv(io.StringIO(rows.to_csv(index=False)))
+
+
+def read_last_row(source, block=4096):
+    """
+    Read the last row of a source CSV file from its end, without the rest of the file.
+
+    Parameters:
+    - source: Path to the source CSV file.
+    - block: The number of bytes read from the end at first, doubled until a whole row is read.
+
+    Returns:
+    - row: A DataFrame with the last row, empty when the file has no rows.
+    """
+    columns = list(pd.read_csv(source, nrows=0).columns)
+    with open(source, "rb") as file:
+        end = file.seek(0, os.SEEK_END)
+        while True:
+            start = file.seek(max(end - block, 0))
+            lines = [line for line in file.read().splitlines() if line.strip()]
+            # The first line read may be cut, so it only counts from the start.
+            if len(lines) > 1 or start == 0:
+                break
+            block *= 2
+
+    if start == 0:
+        lines = lines[1:]
+    if not lines:
+        return pd.DataFrame(columns=columns)
+
+    return pd.read_csv(io.BytesIO(lines[-1]), names=columns, header=None)
+
+
+def rewrite_source(source, rows):
+    """
+    Merge rows into a source CSV file, keeping it sorted by date with one row per instant.
+
+    The file is streamed one month at a time into a temporary file that
+    replaces it, so memory use does not grow with the length of the history.
+    Rows with an instant that is already in their month replace it.
+
+    Parameters:
+    - source: Path to the source CSV file, sorted by date.
+    - rows: Rows in the layout of the source, as returned by normalize_rows().
+    """
+    order = [column for column in ("dteday", "hr") if column in rows]
+    new = dict(tuple(rows.groupby(rows["dteday"].str.slice(0, 7))))
+    columns = list(pd.read_csv(source, nrows=0).columns)
+
+    temporary = f"{source}.tmp"
+    with open(temporary, "w", newline="") as file:
+        file.write(",".join(columns) + "\n")
+        for partition, stored in iter_partitions(source):
+            for month in sorted(month for month in new if month < partition):
+                new.pop(month).to_csv(file, header=False, index=False)
+
+            if partition in new:
+                stored = pd.concat([stored, new.pop(partition)], ignore_index=True)
+                stored = stored.drop_duplicates("instant", keep="last")
+                stored = stored.sort_values(order, kind="stable")
+            stored.to_csv(file, header=False, index=False)
+
+        for month in sorted(new):
+            new[month].to_csv(file, header=False, index=False)
+
+    os.replace(temporary, source)
+
+
+def append_rows(rows, granularity="day", update_source=True):
+    """
+    Append new rental rows to the dashboard store.
+
+    Only the monthly partitions receiving new rows are rewritten, and their
+    season/month summaries are recomputed, so the cost of an update is
+    proportional to the new rows and not to the history. A running dashboard
+    sees the new rows on its next rerun, reading only the changed partitions
+    from disk.
+
+    Rows with an 'instant' that already exists replace the stored row, and
+    the row of the source file. Rows breaking a quality invariant are
+    appended to the quarantine of their partition instead, and left out of
+    the source file, so the next pipeline run clears them. Rows after the end of the source file are appended to
+    it; replacements and rows dated earlier rewrite it in date order.
+
+    Parameters:
+    - rows: A DataFrame in the layout of data/day.csv or data/hour.csv.
+    - granularity: "day" or "hour".
+    - update_source: Also append the rows to the source CSV file, so the next pipeline run keeps them.
+
+    Returns:
+    - written: The names of the partitions that were updated.
+    """
+    source, path, schema, clean = GRANULARITIES[granularity]
+
+    raw = normalize_rows(rows, source)
+    # The order checks expect the rows in time order, as in the source file.
+    order = [column for column in ("dteday", "hr") if column in raw]
+    raw = raw.sort_values([*order, "instant"], kind="stable", ignore_index=True)
+    months = raw["dteday"].str.slice(0, 7)
+
+    manifest = load_manifest(MANIFEST_PATH)
+    entry = manifest.get(granularity)
+    if entry is None or entry.get("version") != PIPELINE_VERSION:
+        raise ValueError(
+            f"The {granularity} store is missing or outdated, run pipeline.py first"
+        )
+
+    checker = QualityChecker(CLIP_LIMITS[granularity])
+    reports = entry.setdefault("quality", {})
+    existing = set(list_partitions(path))
+    accepted = []
+    replaced = False
+    written = []
+    for partition, new in raw.groupby(months):
+        report = new_report()
+        new, quarantined = checker.check(new, report)
+        reports[partition] = merge_reports(
+            [reports.get(partition, new_report()), report]
+        )
+        write_quarantine(quarantined, granularity, partition, append=True)
+        if not len(new):
+            continue
+
+        accepted.append(raw.loc[new.index])
+        new = validate(clean(new))
+        if partition in existing:
+            stored = read_partition(path, partition).to_pandas()
+            combined = pd.concat([stored, new], ignore_index=True)
+        else:
+            combined = new
+
+        duplicated = combined.duplicated("instant", keep="last")
+        combined = combined[~duplicated].sort_values("instant", ignore_index=True)
+
+        # Quarantined rows are still in the source file, so fixing one also
+        # replaces a source row.
+        rejected = read_quarantine(granularity, partition)["instant"]
+        replaces = duplicated.any() or new["instant"].isin(rejected).any()
+        replaced |= replaces
+
+        write_partition(combined, path, partition, schema)
+        entry["summaries"][partition] = summarize_partition(combined)
+
+        # Row hashes add up, so the partition hash can be extended without the
+        # history. Replaced rows break that, and the pipeline rebuilds them.
+        if replaces or not update_source:
+            entry["partitions"].pop(partition, None)
+        else:
+            digest = hash_rows(accepted[-1])
+            previous = entry["partitions"].get(partition, 0)
+            entry["partitions"][partition] = (previous + digest) % 2**64
+
+        written.append(partition)
+
+    if update_source and accepted:
+        accepted = pd.concat(accepted)
+        first = min(accepted[order].itertuples(index=False, name=None))
+        last = read_last_row(source)
+        after = last.empty or first > tuple(last[order].iloc[0])
+        if replaced or not after:
+            rewrite_source(source, accepted)
+        else:
+            accepted.to_csv(source, mode="a", header=False, index=False)
+
+    save_manifest(manifest, MANIFEST_PATH)
+
+    return written
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+SEASON_LABELS = {1: "Springer", 2: "Summer", 3: "Fall", 4: "Winter"}
+
+# Years are coded from the first year of the dataset, 0 for 2011. The labels
+# of the codes are the years themselves, so they follow the data.
+FIRST_YEAR = 2011
+
+WEATHERSIT_LABELS = {
+    1: "Clear, Few clouds, Partly cloudy, Partly cloudy",
+    2: "Mist + Cloudy, Mist + Broken clouds, Mist + Few clouds, Mist",
+    3: "Light Snow, Light Rain + Thunderstorm + Scattered clouds, Light Rain + Scattered clouds",
+    4: "Heavy Rain + Ice Pallets + Thunderstorm + Mist, Snow + Fog",
+}
+
+MONTH_LABELS = {
+    1: "January",
+    2: "February",
+    3: "March",
+    4: "April",
+    5: "May",
+    6: "June",
+    7: "July",
+    8: "August",
+    9: "September",
+    10: "October",
+    11: "November",
+    12: "December",
+}
+
+WEEKDAY_LABELS = {
+    0: "Sunday",
+    1: "Monday",
+    2: "Tuesday",
+    3: "Wednesday",
+    4: "Thursday",
+    5: "Friday",
+    6: "Saturday",
+}
+
+USER_LABELS = {"casual": "Casual", "registered": "Registered", "cnt": "All"}
+
+
+def label_codes(codes, labels):
+    """
+    Map integer codes to their labels without a Python-level lookup per row.
+
+    Parameters:
+    - codes: A Series or array of integer codes.
+    - labels: A dictionary from code to label, such as SEASON_LABELS.
+
+    Returns:
+    - categorical: A pandas Categorical whose categories follow the order of the codes. Unknown codes become missing values.
+    """
+    keys = np.array(sorted(labels))
+    codes = np.asarray(codes)
+
+    positions = np.searchsorted(keys, codes)
+    positions = np.clip(positions, 0, len(keys) - 1)
+    positions = np.where(keys[positions] == codes, positions, -1)
+
+    return pd.Categorical.from_codes(
+        positions, categories=[labels[key] for key in keys]
+    )
+
+
+def category_codes(values, labels):
+    """
+    Recover the integer codes of a column holding codes or labels.
+
+    Parameters:
+    - values: A Series of integer codes, or a Categorical of labels in code order as built by label_codes().
+    - labels: The dictionary from code to label of the column, such as SEASON_LABELS.
+
+    Returns:
+    - codes: An int64 array of codes.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        keys = np.array(sorted(labels), dtype=np.int64)
+        return keys[values.cat.codes.to_numpy()]
+
+    return values.to_numpy(dtype=np.int64)
+
+
+def year_labels(values):
+    """
+    Label the year codes of a column with the years of the data.
+
+    Parameters:
+    - values: A Series of year codes, or of years as labels, such as a Categorical built by label_codes().
+
+    Returns:
+    - labels: A dictionary from the code of every year of the column to the year, in code order. Labels that are not years are left out.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.cat.categories.to_series()
+    if pd.api.types.is_numeric_dtype(values):
+        codes = np.unique(values.dropna().to_numpy(dtype=np.int64))
+    else:
+        years = pd.to_numeric(values.astype(str), errors="coerce").dropna()
+        codes = np.unique(years.to_numpy(dtype=np.int64)) - FIRST_YEAR
+
+    return {int(code): str(FIRST_YEAR + code) for code in codes}
@@ -0,0 +1,364 @@
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from labels import SEASON_LABELS, WEATHERSIT_LABELS, label_codes
+from quality import QualityChecker, format_report
+from schema import apply_schema
+from shared import load_shared
+from store import (
+    HOURLY_STORE_PATH,
+    STORE_PATH,
+    categorical_view,
+    list_partitions,
+    numerical_view,
+    read_store,
+)
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(DASHBOARD_DIR), "data")
+CATEGORICAL_PATH = os.path.join(DASHBOARD_DIR, "categorical_df.csv")
+NUMERICAL_PATH = os.path.join(DASHBOARD_DIR, "numerical_df.csv")
+HOURLY_PATH = os.path.join(DATA_DIR, "hour.csv")
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+logger = logging.getLogger("dashboard.quality")
+
+
+def file_fingerprint(path):
+    """
+    Build the cache key of a file or a partitioned store on disk.
+
+    Parameters:
+    - path: Path to the file, or to a directory of partition files.
+
+    Returns:
+    - fingerprint: A tuple of the absolute path, the modification time in nanoseconds and the size in bytes. For a directory, the latest modification time and the total size of its files are used together with the number of files.
+    """
+    if os.path.isdir(path):
+        stats = [entry.stat() for entry in os.scandir(path) if entry.is_file()]
+        return (
+            os.path.abspath(path),
+            max((stat.st_mtime_ns for stat in stats), default=0),
+            sum(stat.st_size for stat in stats),
+            len(stats),
+        )
+
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def read_csv(path, columns=None):
+    """
+    Read a CSV file, optionally only a subset of its columns.
+
+    Parameters:
+    - path: Path to the CSV file.
+    - columns: The columns to read, or None to read every column.
+
+    Returns:
+    - df: A DataFrame with the contents of the file.
+    """
+    if columns is None:
+        return pd.read_csv(path)
+
+    return pd.read_csv(path, usecols=lambda column: column in columns)
+
+
+def load_dataset(path, prepare=None, reader=read_csv, columns=None):
+    """
+    Load a data file once per process and serve it from memory afterwards.
+
+    The parsed frame is cached on the file fingerprint, so regenerating the
+    file invalidates the cached copy on the next call. Callers get a shallow
+    copy: adding or replacing columns does not leak into the cached frame.
+
+    When DASHBOARD_SHARED_DIR is set, the prepared frame is also written there
+    as a memory-mapped Arrow file, so every process on the host maps the same
+    read-only pages instead of parsing its own copy.
+
+    Parameters:
+    - path: Path to the data file.
+    - prepare: Optional function applied to the parsed DataFrame before it is cached.
+    - reader: Function reading the file, called with the path and the 'columns' keyword.
+    - columns: Optional list of columns to read. Each projection is cached separately.
+
+    Returns:
+    - df: A DataFrame with the contents of the file.
+    """
+    fingerprint = file_fingerprint(path)
+    if columns is not None:
+        columns = tuple(columns)
+    key = (fingerprint[0], prepare, reader, columns)
+
+    def compute():
+        df = reader(path, columns=columns)
+        if prepare is not None:
+            df = prepare(df)
+        return df
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is None or cached[0] != fingerprint:
+            parts = (fingerprint[0], qualified_name(prepare), qualified_name(reader))
+            name = ":".join(map(str, parts + (columns,)))
+            df = load_shared(name, repr(fingerprint[1:]), compute)
+            cached = (fingerprint, df)
+            _cache[key] = cached
+
+    return cached[1].copy(deep=False)
+
+
+def qualified_name(function):
+    """
+    Name a function the same way in every process.
+
+    Parameters:
+    - function: A function, or None.
+
+    Returns:
+    - name: The module and qualified name of the function, or None.
+    """
+    if function is None:
+        return None
+
+    return f"{function.__module__}.{function.__qualname__}"
+
+
+def use_store(path=STORE_PATH):
+    """
+    Tell whether the columnar store is available.
+
+    Parameters:
+    - path: The directory of the store.
+
+    Returns:
+    - available: True when the store holds at least one partition.
+    """
+    return bool(list_partitions(path))
+
+
+def data_version(*paths):
+    """
+    Describe the version of the dashboard datasets.
+
+    Parameters:
+    - paths: Paths of the files to include. Defaults to the files read by load_categorical() and load_numerical().
+
+    Returns:
+    - version: A hashable tuple of file fingerprints that changes whenever one of the files changes.
+    """
+    if not paths:
+        paths = (STORE_PATH,) if use_store() else (CATEGORICAL_PATH, NUMERICAL_PATH)
+
+    return tuple(file_fingerprint(path) for path in paths)
+
+
+def clear_cache():
+    """
+    Drop every cached dataset.
+    """
+    with _cache_lock:
+        _cache.clear()
+
+
+def add_user_shares(df):
+    """
+    Derive the share of casual and registered users in the total rentals.
+
+    Parameters:
+    - df: A DataFrame containing rental data.
+
+    Returns:
+    - df: The DataFrame with the 'casual_percentage' and 'registered_percentage' columns, when the rental columns are present.
+    """
+    if "cnt" in df:
+        if "casual" in df:
+            df["casual_percentage"] = df["casual"] / df["cnt"]
+        if "registered" in df:
+            df["registered_percentage"] = df["registered"] / df["cnt"]
+
+    return df
+
+
+def prepare_categorical(df):
+    """
+    Parse dates and derive the user share columns of the categorical dataset.
+
+    Parameters:
+    - df: The raw categorical DataFrame.
+
+    Returns:
+    - df: The DataFrame with 'dteday' as datetime, the 'casual_percentage' and 'registered_percentage' columns and compact dtypes.
+    """
+    if "dteday" in df:
+        df["dteday"] = pd.to_datetime(df["dteday"])
+    # The file holds the years themselves, which are the labels of 'yr'.
+    if "yr" in df:
+        df["yr"] = df["yr"].astype(str)
+
+    return apply_schema(add_user_shares(df))
+
+
+def prepare_numerical(df):
+    """
+    Derive the user share columns of the numerical dataset.
+
+    Parameters:
+    - df: The raw numerical DataFrame.
+
+    Returns:
+    - df: The DataFrame with the 'casual_percentage' and 'registered_percentage' columns and compact dtypes.
+    """
+    return apply_schema(add_user_shares(df))
+
+
+def prepare_store_categorical(df):
+    """
+    Derive the categorical dataset from the columnar store.
+
+    Parameters:
+    - df: A DataFrame read from the store.
+
+    Returns:
+    - df: The categorical view with the user share columns and compact dtypes.
+    """
+    return apply_schema(add_user_shares(categorical_view(df)))
+
+
+def prepare_store_numerical(df):
+    """
+    Derive the numerical dataset from the columnar store.
+
+    Parameters:
+    - df: A DataFrame read from the store.
+
+    Returns:
+    - df: The numerical view with the user share columns and compact dtypes.
+    """
+    return apply_schema(add_user_shares(numerical_view(df)))
+
+
+def label_hourly(df):
+    """
+    Add the timestamp and label the categories of the hourly dataset.
+
+    Parameters:
+    - df: The hourly DataFrame with 'dteday' as datetime.
+
+    Returns:
+    - df: The DataFrame with a 'timestamp' column combining 'dteday' and 'hr', and 'season'/'weathersit' labelled like the categorical dataset.
+    """
+    df["timestamp"] = df["dteday"] + pd.to_timedelta(df["hr"], unit="h")
+    df["season"] = label_codes(df["season"], SEASON_LABELS)
+    df["weathersit"] = label_codes(df["weathersit"], WEATHERSIT_LABELS)
+
+    return df
+
+
+def prepare_hourly(df):
+    """
+    Check, parse dates and label the categories of the raw hourly dataset.
+
+    The raw file has not been through the pipeline, so its rows are checked
+    here; the rows breaking a quality invariant are left out and reported on
+    the "dashboard.quality" logger.
+
+    Parameters:
+    - df: The raw hourly DataFrame read from data/hour.csv.
+
+    Returns:
+    - df: The labelled hourly DataFrame with 'dteday' as datetime and compact dtypes.
+    """
+    checker = QualityChecker()
+    df, _ = checker.check(df)
+    if checker.report["quarantined"]:
+        logger.warning("hour.csv: %s", format_report(checker.report))
+
+    return apply_schema(label_hourly(df))
+
+
+def prepare_store_hourly(df):
+    """
+    Label the categories of the hourly dataset read from the columnar store.
+
+    Parameters:
+    - df: A DataFrame read from the hourly store.
+
+    Returns:
+    - df: The labelled hourly DataFrame with compact dtypes.
+    """
+    return apply_schema(label_hourly(df))
+
+
+def load_categorical(path=None, columns=None):
+    """
+    Load the categorical dataset used by the dashboard.
+
+    Parameters:
+    - path: Path to the columnar store or the categorical CSV file. Defaults to the store when it exists.
+    - columns: Optional list of columns to read.
+
+    Returns:
+    - df: The cached categorical DataFrame.
+    """
+    if path is None:
+        path = STORE_PATH if use_store() else CATEGORICAL_PATH
+
+    if os.path.isdir(path):
+        return load_dataset(path, prepare_store_categorical, read_store, columns)
+
+    return load_dataset(path, prepare_categorical, read_csv, columns)
+
+
+def load_numerical(path=None, columns=None):
+    """
+    Load the numerical dataset used by the dashboard.
+
+    Parameters:
+    - path: Path to the columnar store or the numerical CSV file. Defaults to the store when it exists.
+    - columns: Optional list of columns to read.
+
+    Returns:
+    - df: The cached numerical DataFrame.
+    """
+    if path is None:
+        path = STORE_PATH if use_store() else NUMERICAL_PATH
+
+    if os.path.isdir(path):
+        return load_dataset(path, prepare_store_numerical, read_store, columns)
+
+    return load_dataset(path, prepare_numerical, read_csv, columns)
+
+
+def load_hourly(path=None):
+    """
+    Load the hourly dataset used by the hourly mode of the dashboard.
+
+    Parameters:
+    - path: Path to the hourly store or the hourly CSV file. Defaults to the store when it exists.
+
+    Returns:
+    - df: The cached hourly DataFrame.
+    """
+    if path is None:
+        path = hourly_path()
+
+    if os.path.isdir(path):
+        return load_dataset(path, prepare_store_hourly, read_store)
+
+    return load_dataset(path, prepare_hourly)
+
+
+def hourly_path():
+    """
+    Find the file or store that load_hourly() reads by default.
+
+    Returns:
+    - path: The hourly store when it exists, otherwise the hourly CSV file.
+    """
+    return HOURLY_STORE_PATH if use_store(HOURLY_STORE_PATH) else HOURLY_PATH
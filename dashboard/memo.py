@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache shared by every session of the process.
+
+    Parameters:
+    - maxsize: The maximum number of entries kept before the oldest one is evicted.
+    - maxweight: Optional limit on the total weight of the entries, such as a number of bytes.
+    - weigh: The function giving the weight of a value when maxweight is set. Defaults to len().
+    """
+
+    def __init__(self, maxsize=128, maxweight=None, weigh=len):
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weigh = weigh
+        self.weight = 0
+        self._data = OrderedDict()
+        self._weights = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for a key, computing and storing it on a miss.
+
+        Parameters:
+        - key: A hashable key describing every input of the computation.
+        - compute: A function without arguments returning the value.
+
+        Returns:
+        - value: The cached or freshly computed value.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+
+        value = compute()
+
+        with self._lock:
+            if key in self._data:
+                self.weight -= self._weights.pop(key)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxweight is not None:
+                self._weights[key] = self.weigh(value)
+                self.weight += self._weights[key]
+
+            while len(self._data) > self.maxsize or (
+                self.maxweight is not None
+                and self.weight > self.maxweight
+                and len(self._data) > 1
+            ):
+                oldest, _ = self._data.popitem(last=False)
+                self.weight -= self._weights.pop(oldest, 0)
+
+        return value
+
+    def put(self, key, value):
+        """
+        Store a value computed elsewhere, such as one read from disk.
+
+        Parameters:
+        - key: A hashable key describing every input of the computation.
+        - value: The value.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self.weight -= self._weights.pop(key, 0)
+
+        self.get_or_compute(key, lambda: value)
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for a key without computing it on a miss.
+
+        Parameters:
+        - key: A hashable key.
+        - default: The value returned on a miss.
+
+        Returns:
+        - value: The cached value, or the default.
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def clear(self):
+        """
+        Drop every cached entry.
+        """
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def __len__(self):
+        return len(self._data)
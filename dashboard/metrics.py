@@ -0,0 +1,78 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from memo import LRUCache
+
+MEASURE_COLUMNS = ("cnt", "casual", "registered", "temp", "hum", "windspeed")
+
+_metrics_cache = LRUCache(maxsize=64)
+
+
+class ColumnStats(NamedTuple):
+    """
+    Summary statistics of one measure column.
+
+    Integer columns keep integer min, max and sum. The dates are those of the
+    first row holding the minimum and the maximum, or None for an empty frame.
+    """
+
+    min: object
+    max: object
+    mean: float
+    sum: object
+    min_date: object
+    max_date: object
+
+
+def summarize_measures(df, columns=MEASURE_COLUMNS, date_column="dteday", key=None):
+    """
+    Compute the summary statistics of every measure column in one vectorized pass.
+
+    Parameters:
+    - df: The input DataFrame containing rental data.
+    - columns: The measure columns to summarize.
+    - date_column: The column giving the date of the minimum and maximum rows.
+    - key: Optional hashable description of the filter selection that produced 'df'. When given, the result is memoized on it.
+
+    Returns:
+    - stats: A dictionary mapping each column to its ColumnStats.
+    """
+    if key is not None:
+        return _metrics_cache.get_or_compute(
+            (key, tuple(columns), date_column),
+            lambda: summarize_measures(df, columns, date_column),
+        )
+
+    if len(df) == 0:
+        return {
+            column: ColumnStats(np.nan, np.nan, np.nan, 0, None, None)
+            for column in columns
+        }
+
+    values = df[list(columns)].to_numpy(dtype=np.float64)
+    dates = df[date_column].to_numpy()
+
+    min_positions = np.nanargmin(values, axis=0)
+    max_positions = np.nanargmax(values, axis=0)
+    sums = np.nansum(values, axis=0)
+    counts = np.count_nonzero(~np.isnan(values), axis=0)
+
+    rows = np.arange(len(columns))
+    mins = values[min_positions, rows]
+    maxs = values[max_positions, rows]
+
+    stats = {}
+    for i, column in enumerate(columns):
+        cast = int if np.issubdtype(df[column].dtype, np.integer) else float
+        stats[column] = ColumnStats(
+            min=cast(mins[i]),
+            max=cast(maxs[i]),
+            mean=float(sums[i] / counts[i]),
+            sum=cast(sums[i]),
+            min_date=pd.Timestamp(dates[min_positions[i]]),
+            max_date=pd.Timestamp(dates[max_positions[i]]),
+        )
+
+    return stats
@@ -0,0 +1,261 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from store import (
+    HOURLY_STORE_PATH,
+    HOURLY_STORE_SCHEMA,
+    MANIFEST_PATH,
+    STORE_PATH,
+    STORE_SCHEMA,
+    categorical_view,
+    list_partitions,
+    load_manifest,
+    numerical_view,
+    read_store,
+    remove_partition,
+    save_manifest,
+    write_partition,
+)
+from quality import (
+    QualityChecker,
+    format_report,
+    merge_reports,
+    new_report,
+    remove_quarantine,
+    write_quarantine,
+)
+from schema import validate
+from summaries import summarize_partition
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(DASHBOARD_DIR), "data")
+DAY_SOURCE = os.path.join(DATA_DIR, "day.csv")
+HOUR_SOURCE = os.path.join(DATA_DIR, "hour.csv")
+
+# Bump when the cleaning steps change, so every partition is rebuilt.
+PIPELINE_VERSION = 3
+
+MAX_TEMP = 0.41
+CHUNKSIZE = 100_000
+
+
+def clean_day(df):
+    """
+    Clean the daily rental data the same way as the notebook.
+
+    Parameters:
+    - df: Raw rows of data/day.csv.
+
+    Returns:
+    - df: The rows with 'dteday' as datetime and 'temp' clipped to MAX_TEMP.
+    """
+    df["dteday"] = pd.to_datetime(df["dteday"])
+    df["temp"] = df["temp"].clip(upper=MAX_TEMP)
+
+    return df
+
+
+def clean_hour(df):
+    """
+    Clean the hourly rental data.
+
+    Parameters:
+    - df: Raw rows of data/hour.csv.
+
+    Returns:
+    - df: The rows with 'dteday' as datetime.
+    """
+    df["dteday"] = pd.to_datetime(df["dteday"])
+
+    return df
+
+
+GRANULARITIES = {
+    "day": (DAY_SOURCE, STORE_PATH, STORE_SCHEMA, clean_day),
+    "hour": (HOUR_SOURCE, HOURLY_STORE_PATH, HOURLY_STORE_SCHEMA, clean_hour),
+}
+
+# The bounds the cleaning clips each column to, recorded in the quality report.
+CLIP_LIMITS = {
+    "day": {"temp": MAX_TEMP},
+    "hour": {},
+}
+
+
+def hash_rows(df):
+    """
+    Hash a block of source rows.
+
+    Parameters:
+    - df: The rows to hash.
+
+    Returns:
+    - digest: An unsigned 64-bit integer that changes when any value of the rows changes.
+    """
+    return int(
+        pd.util.hash_pandas_object(df, index=False).to_numpy().sum(dtype=np.uint64)
+    )
+
+
+def iter_partitions(source, chunksize=CHUNKSIZE):
+    """
+    Stream a source CSV file in chunks and yield its rows one month at a time.
+
+    Only the rows of the current month are buffered, so memory use does not
+    grow with the length of the history. The source must be sorted by date.
+
+    Parameters:
+    - source: Path to the source CSV file.
+    - chunksize: The number of rows read at once.
+
+    Returns:
+    - partitions: A generator of (partition, rows) tuples, where partition is the "YYYY-MM" month of the rows.
+    """
+    seen = set()
+    current = None
+    buffered = []
+
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        # Dates are ISO formatted, so the month is the first seven characters.
+        months = chunk["dteday"].str.slice(0, 7)
+
+        for partition, rows in chunk.groupby(months, sort=False):
+            if partition != current:
+                if partition in seen:
+                    raise ValueError(f"{source} is not sorted by date at {partition}")
+                if buffered:
+                    yield current, pd.concat(buffered, ignore_index=True)
+                seen.add(partition)
+                current = partition
+                buffered = []
+            buffered.append(rows)
+
+    if buffered:
+        yield current, pd.concat(buffered, ignore_index=True)
+
+
+def run_pipeline(granularity="day", chunksize=CHUNKSIZE, full=False):
+    """
+    Rebuild the partitions of the dashboard store whose source rows changed.
+
+    Every partition goes through the quality checks, so the checks that span
+    partitions see the whole source. The rows breaking an invariant are
+    quarantined next to the store instead of failing the run, and the
+    quality report of every partition is kept in the manifest. The
+    quarantine of every partition is rewritten, unchanged ones included,
+    so it always holds the rows its report counts.
+
+    Parameters:
+    - granularity: "day" to process data/day.csv or "hour" to process data/hour.csv.
+    - chunksize: The number of source rows read at once.
+    - full: Rebuild every partition, even the unchanged ones.
+
+    Returns:
+    - written: The names of the partitions that were written or removed.
+    """
+    source, path, schema, clean = GRANULARITIES[granularity]
+
+    manifest = load_manifest(MANIFEST_PATH)
+    previous = manifest.get(granularity, {})
+    if full or previous.get("version") != PIPELINE_VERSION:
+        previous = {}
+    previous_hashes = previous.get("partitions", {})
+    previous_summaries = previous.get("summaries", {})
+    existing = set(list_partitions(path))
+
+    checker = QualityChecker(CLIP_LIMITS[granularity])
+    hashes = {}
+    summaries = {}
+    reports = {}
+    written = []
+    for partition, rows in iter_partitions(source, chunksize):
+        digest = hash_rows(rows)
+        hashes[partition] = digest
+        reports[partition] = new_report()
+        rows, quarantined = checker.check(rows, reports[partition])
+        # The checks spanning partitions can quarantine other rows of an
+        # unchanged partition, so its quarantine follows its new report.
+        write_quarantine(quarantined, granularity, partition)
+
+        if (
+            previous_hashes.get(partition) == digest
+            and partition in existing
+            and partition in previous_summaries
+        ):
+            summaries[partition] = previous_summaries[partition]
+            continue
+
+        rows = validate(clean(rows))
+        write_partition(rows, path, partition, schema)
+        summaries[partition] = summarize_partition(rows)
+        written.append(partition)
+
+    for partition in sorted(existing - set(hashes)):
+        remove_partition(path, partition)
+        remove_quarantine(granularity, partition)
+        written.append(partition)
+
+    manifest[granularity] = {
+        "version": PIPELINE_VERSION,
+        "partitions": hashes,
+        "summaries": summaries,
+        "quality": reports,
+    }
+    save_manifest(manifest, MANIFEST_PATH)
+
+    return written
+
+
+def write_csv_artifacts():
+    """
+    Write categorical_df.csv and numerical_df.csv from the daily store.
+
+    These files are the inputs of the notebook and the fallback of the
+    dashboard when the store is missing. They are rewritten in full.
+    """
+    categorical_df = categorical_view(read_store(STORE_PATH))
+    categorical_df.to_csv(
+        os.path.join(DASHBOARD_DIR, "categorical_df.csv"), index=False
+    )
+
+    numerical_df = numerical_view(read_store(STORE_PATH))
+    numerical_df.to_csv(os.path.join(DASHBOARD_DIR, "numerical_df.csv"), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Preprocess the bike rental data for the dashboard."
+    )
+    parser.add_argument(
+        "granularity",
+        nargs="*",
+        help="The datasets to process, 'day' and/or 'hour'. Defaults to both.",
+    )
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--full", action="store_true", help="Rebuild every partition.")
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="Also rewrite categorical_df.csv and numerical_df.csv.",
+    )
+    args = parser.parse_args()
+
+    for granularity in args.granularity:
+        if granularity not in GRANULARITIES:
+            parser.error(f"unknown granularity: {granularity}")
+
+    for granularity in args.granularity or sorted(GRANULARITIES):
+        written = run_pipeline(granularity, args.chunksize, args.full)
+        print(f"{granularity}: {len(written)} partition(s) updated")
+        reports = load_manifest(MANIFEST_PATH)[granularity]["quality"].values()
+        print(f"{granularity}: {format_report(merge_reports(reports))}")
+
+    if args.csv:
+        write_csv_artifacts()
+
+
+if __name__ == "__main__":
+    main()
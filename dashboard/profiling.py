@@ -0,0 +1,158 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+# Profiling is off unless DASHBOARD_PROFILE=1. DASHBOARD_PROMETHEUS_FILE names
+# a file rewritten after every rerun in the Prometheus text format, for the
+# node_exporter textfile collector.
+PROFILE_ENABLED = os.environ.get("DASHBOARD_PROFILE") == "1"
+PROMETHEUS_FILE = os.environ.get("DASHBOARD_PROMETHEUS_FILE")
+
+logger = logging.getLogger("dashboard.profile")
+
+_totals = {}
+_totals_lock = threading.Lock()
+
+_disabled_section = contextlib.nullcontext()
+
+
+def resident_memory():
+    """
+    Read the resident memory of the process.
+
+    Returns:
+    - rss: The resident set size in bytes, or None where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class Profiler:
+    """
+    Times the sections of one dashboard rerun.
+
+    When disabled, section() returns a shared no-op context manager, so the
+    instrumentation costs a function call per section.
+
+    Parameters:
+    - enabled: Record timings. Defaults to the DASHBOARD_PROFILE environment variable.
+    """
+
+    def __init__(self, enabled=None):
+        self.enabled = PROFILE_ENABLED if enabled is None else enabled
+        self.records = []
+        self.started = time.perf_counter()
+        self.total = None
+
+    def section(self, name, rows=None):
+        """
+        Time a section of the dashboard.
+
+        Parameters:
+        - name: The name of the section.
+        - rows: Optional number of rows the section works on, or a function returning it. Functions are only called when profiling is enabled.
+
+        Returns:
+        - context: A context manager wrapping the section.
+        """
+        if not self.enabled:
+            return _disabled_section
+
+        return self._timed(name, rows)
+
+    @contextlib.contextmanager
+    def _timed(self, name, rows):
+        memory = resident_memory()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            after = resident_memory()
+            if callable(rows):
+                rows = rows()
+            self.records.append(
+                {
+                    "section": name,
+                    "seconds": round(seconds, 6),
+                    "rows": rows,
+                    "memory_delta_mb": (
+                        None
+                        if memory is None or after is None
+                        else round((after - memory) / 2**20, 2)
+                    ),
+                }
+            )
+
+    def finish(self):
+        """
+        Publish the timings of the rerun.
+
+        Every section is logged as one JSON line on the "dashboard.profile"
+        logger and added to the process-wide totals exported by
+        prometheus_text().
+
+        Returns:
+        - records: The list of section records of the rerun.
+        """
+        if not self.enabled:
+            return self.records
+
+        self.total = time.perf_counter() - self.started
+        rerun = {"section": "rerun", "seconds": round(self.total, 6), "rows": None}
+        for record in self.records + [rerun]:
+            logger.info(json.dumps(record))
+
+        with _totals_lock:
+            for record in self.records + [rerun]:
+                count, seconds = _totals.get(record["section"], (0, 0.0))
+                _totals[record["section"]] = (count + 1, seconds + record["seconds"])
+
+        if PROMETHEUS_FILE:
+            write_prometheus_file(PROMETHEUS_FILE)
+
+        return self.records
+
+
+def prometheus_text():
+    """
+    Export the section timings of the process in the Prometheus text format.
+
+    Returns:
+    - text: The dashboard_section_seconds summary, with one count and sum per section.
+    """
+    lines = [
+        "# HELP dashboard_section_seconds Time spent rendering dashboard sections.",
+        "# TYPE dashboard_section_seconds summary",
+    ]
+    with _totals_lock:
+        for section, (count, seconds) in sorted(_totals.items()):
+            label = section.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(
+                f'dashboard_section_seconds_count{{section="{label}"}} {count}'
+            )
+            lines.append(
+                f'dashboard_section_seconds_sum{{section="{label}"}} {seconds:.6f}'
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_file(path):
+    """
+    Write the section timings to a file atomically.
+
+    Parameters:
+    - path: The path of the file.
+    """
+    with open(path + ".tmp", "w") as file:
+        file.write(prometheus_text())
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,456 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from labels import FIRST_YEAR
+from schema import CODE_RANGES, WEATHER_COLUMNS
+from store import STORE_DIR
+
+QUARANTINE_DIR = os.path.join(STORE_DIR, "quarantine")
+
+COUNT_COLUMNS = ("casual", "registered", "cnt")
+
+# The rules a row can break, in report order. A row breaking any of them is
+# quarantined instead of stored.
+RULES = (
+    "missing",
+    "codes",
+    "weather",
+    "counts",
+    "total",
+    "calendar",
+    "instant",
+    "order",
+)
+
+# The number of offending instants kept per rule in a report.
+EXAMPLES = 5
+
+DAY = np.timedelta64(1, "D").astype("timedelta64[ns]").astype(np.int64)
+HOUR = DAY // 24
+
+
+def new_report():
+    """
+    Build an empty quality report.
+
+    Returns:
+    - report: A JSON-serializable dictionary with the number of 'rows' checked, 'kept' and 'quarantined', the number of 'violations' and a few 'examples' of every broken rule, the number of 'missing_periods' between the kept rows and the number of 'clipped' values per column. Rules without violations are left out, so the report of clean data stays small.
+    """
+    return {
+        "rows": 0,
+        "kept": 0,
+        "quarantined": 0,
+        "violations": {},
+        "examples": {},
+        "missing_periods": 0,
+        "clipped": {},
+    }
+
+
+def merge_reports(reports):
+    """
+    Add up quality reports, such as the reports of several partitions.
+
+    Parameters:
+    - reports: An iterable of dictionaries returned by new_report() and filled by QualityChecker.
+
+    Returns:
+    - report: The combined report.
+    """
+    total = new_report()
+    for report in reports:
+        for key in ("rows", "kept", "quarantined", "missing_periods"):
+            total[key] += report[key]
+        for rule, count in report["violations"].items():
+            total["violations"][rule] = total["violations"].get(rule, 0) + count
+            examples = total["examples"].get(rule, []) + report["examples"][rule]
+            total["examples"][rule] = examples[:EXAMPLES]
+        for column, count in report["clipped"].items():
+            total["clipped"][column] = total["clipped"].get(column, 0) + count
+
+    return total
+
+
+def out_of_range(values, low, high, integer=False):
+    """
+    Flag the values outside an inclusive range, or not integers when asked.
+
+    Missing values are not flagged; the 'missing' rule covers them.
+
+    Parameters:
+    - values: A numeric array. Integer arrays have no missing or fractional values to flag.
+    - low: The lowest valid value.
+    - high: The highest valid value.
+    - integer: Also flag the values with a fractional part.
+
+    Returns:
+    - flags: A boolean array.
+    """
+    flags = (values < low) | (values > high)
+    if values.dtype.kind != "f":
+        return flags
+    if integer:
+        flags |= values != np.floor(values)
+
+    return flags & ~np.isnan(values)
+
+
+class QualityChecker:
+    """
+    Vectorized invariants of rental rows, checked chunk by chunk.
+
+    Every rule is evaluated on whole columns, so a chunk costs a few passes
+    over its arrays whatever its size. The checker carries the instants and
+    the last timestamp it has seen from one chunk to the next, so duplicate
+    instants and rows out of order are also caught across the chunks of a
+    stream, and the report adds up over the whole stream.
+
+    Rows are checked for missing values, category codes within CODE_RANGES,
+    weather measures within [0, 1], non-negative integer counts with
+    casual + registered == cnt, 'yr', 'mnth', 'weekday' and 'workingday'
+    consistent with 'dteday' and 'holiday', unique positive instants, and
+    timestamps increasing from one row to the next. Missing days or hours
+    between the kept rows are counted, not quarantined, as the source files
+    have hours without rentals.
+
+    Parameters:
+    - limits: Optional dictionary of the upper bound the cleaning clips each column to. Kept values above it are counted in the report, so the clipping is on record.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = dict(limits or {})
+        self.report = new_report()
+        self._seen = np.zeros(0, dtype=np.int32)
+        self._count = 0
+        self._last_time = None
+        self._last_kept = None
+
+    def violations(self, df):
+        """
+        Evaluate every rule on a chunk of rows.
+
+        The instants and timestamps of the chunk are remembered, so the next
+        chunk is checked against them.
+
+        Parameters:
+        - df: Rows in the layout of data/day.csv or data/hour.csv. 'dteday' may be a string or a datetime.
+
+        Returns:
+        - dates: The 'dteday' column parsed as datetime, NaT where it cannot be parsed.
+        - flags: A DataFrame with the index of df and a boolean column per rule of RULES.
+        """
+        # Integer columns, the common case, are checked as they are read;
+        # anything else is coerced to floats, unparseable values to NaN.
+        numbers = {}
+        for column in df.columns:
+            values = df[column]
+            if column == "dteday":
+                continue
+            if pd.api.types.is_integer_dtype(values.dtype):
+                numbers[column] = values.to_numpy()
+            else:
+                numbers[column] = pd.to_numeric(values, errors="coerce").to_numpy(
+                    np.float64
+                )
+        dates = df["dteday"]
+        if not pd.api.types.is_datetime64_dtype(dates.dtype):
+            dates = pd.to_datetime(dates, errors="coerce")
+        days = dates.to_numpy("datetime64[D]")
+        size = len(df)
+        flags = {}
+
+        missing = dates.isna().to_numpy().copy()
+        for values in numbers.values():
+            if values.dtype.kind == "f":
+                missing |= np.isnan(values)
+        flags["missing"] = missing
+
+        codes = np.zeros(size, dtype=bool)
+        for column, (low, high) in CODE_RANGES.items():
+            if column in numbers:
+                codes |= out_of_range(numbers[column], low, high, integer=True)
+        flags["codes"] = codes
+
+        weather = np.zeros(size, dtype=bool)
+        for column in WEATHER_COLUMNS:
+            if column in numbers:
+                weather |= out_of_range(numbers[column], 0.0, 1.0)
+        flags["weather"] = weather
+
+        counts = np.zeros(size, dtype=bool)
+        for column in COUNT_COLUMNS:
+            counts |= out_of_range(numbers[column], 0, np.inf, integer=True)
+        flags["counts"] = counts
+        flags["total"] = (
+            numbers["casual"] + numbers["registered"] != numbers["cnt"]
+        ) & ~missing
+
+        # The year, month and weekday are computed once per calendar day of
+        # the chunk and looked up per row, which is much cheaper than
+        # converting every row. 1970-01-01 was a Thursday, weekday 4 counting
+        # from Sunday.
+        elapsed = np.where(missing, 0, days.astype(np.int64))
+        first = elapsed[~missing].min() if not missing.all() else 0
+        calendar_days = np.arange(first, elapsed.max(initial=first) + 1)
+        months = calendar_days.astype("datetime64[D]").astype("datetime64[M]")
+        months = months.astype(np.int64)
+        positions = np.maximum(elapsed - first, 0)
+        weekend = (numbers["weekday"] == 0) | (numbers["weekday"] == 6)
+        calendar = (
+            (numbers["yr"] != (months // 12 + 1970 - FIRST_YEAR)[positions])
+            | (numbers["mnth"] != (months % 12 + 1)[positions])
+            | (numbers["weekday"] != ((calendar_days + 4) % 7)[positions])
+            | (numbers["workingday"] != (~weekend & (numbers["holiday"] == 0)))
+        )
+        flags["calendar"] = calendar & ~missing
+
+        flags["instant"] = self._check_instants(numbers["instant"], missing)
+
+        times = elapsed * DAY
+        if "hr" in numbers:
+            times = times + np.nan_to_num(numbers["hr"]).astype(np.int64) * HOUR
+        flags["order"] = self._check_order(times, missing)
+
+        return dates, pd.DataFrame(flags, index=df.index)
+
+    def _check_instants(self, instants, missing):
+        """
+        Flag the instants that are not positive integers or were seen before.
+
+        The instants seen so far are kept in a sorted array and looked up by
+        binary search. Its size grows with the number of rows checked, not
+        with the values of the instants, and as instants mostly increase, a
+        chunk is usually appended to it without merging.
+
+        Parameters:
+        - instants: The instants of a chunk, as floats.
+        - missing: The rows with a missing value.
+
+        Returns:
+        - flags: A boolean array.
+        """
+        flags = out_of_range(instants, 1, np.iinfo(np.int32).max, integer=True)
+        valid = ~(flags | missing)
+        ids = instants[valid].astype(np.int32)
+        if not len(ids):
+            return flags
+
+        seen = self._seen[: self._count]
+        repeated = np.zeros(len(ids), dtype=bool)
+        if len(seen):
+            positions = np.minimum(np.searchsorted(seen, ids), len(seen) - 1)
+            repeated = seen[positions] == ids
+        increasing = (np.diff(ids) > 0).all()
+        if not increasing:
+            repeated |= pd.Series(ids).duplicated().to_numpy()
+        flags[valid] = repeated
+
+        new = ids if increasing else np.unique(ids)
+        if len(seen) and new[0] <= seen[-1]:
+            self._seen = np.union1d(seen, new)
+            self._count = len(self._seen)
+            return flags
+
+        needed = self._count + len(new)
+        if needed > len(self._seen):
+            grown = np.empty(max(needed, 2 * len(self._seen)), dtype=np.int32)
+            grown[: self._count] = seen
+            self._seen = grown
+        self._seen[self._count : needed] = new
+        self._count = needed
+
+        return flags
+
+    def _check_order(self, times, missing):
+        """
+        Flag the rows whose timestamp is not after every earlier timestamp.
+
+        Parameters:
+        - times: The timestamps of a chunk, as nanoseconds since 1970.
+        - missing: The rows with a missing value, which are left out.
+
+        Returns:
+        - flags: A boolean array.
+        """
+        flags = np.zeros(len(times), dtype=bool)
+        valid = times[~missing]
+        if not len(valid):
+            return flags
+
+        latest = np.maximum.accumulate(valid)
+        earlier = np.concatenate([[np.iinfo(np.int64).min], latest[:-1]])
+        if self._last_time is not None:
+            earlier = np.maximum(earlier, self._last_time)
+        flags[~missing] = valid <= earlier
+        self._last_time = max(int(latest[-1]), self._last_time or latest[-1])
+
+        return flags
+
+    def check(self, df, report=None):
+        """
+        Split a chunk of rows into the rows to keep and the rows to quarantine.
+
+        Parameters:
+        - df: Rows in the layout of data/day.csv or data/hour.csv.
+        - report: Optional report from new_report() to count the chunk in, such as the report of its partition. Defaults to the report of the checker.
+
+        Returns:
+        - kept: The valid rows, with 'dteday' parsed as datetime.
+        - quarantined: The invalid rows as given, with a 'violations' column naming the broken rules.
+        """
+        dates, flags = self.violations(df)
+        bad = flags.any(axis=1).to_numpy()
+
+        if report is None:
+            report = self.report
+        report["rows"] += len(df)
+        report["kept"] += int((~bad).sum())
+        report["quarantined"] += int(bad.sum())
+        for rule in RULES:
+            broken = flags[rule].to_numpy()
+            count = int(broken.sum())
+            if not count:
+                continue
+            report["violations"][rule] = report["violations"].get(rule, 0) + count
+            examples = report["examples"].setdefault(rule, [])
+            instants = pd.to_numeric(
+                df["instant"][broken][: EXAMPLES - len(examples)], errors="coerce"
+            )
+            examples += [
+                None if pd.isna(instant) else int(instant) for instant in instants
+            ]
+
+        kept = df[~bad].assign(dteday=dates[~bad])
+
+        step = DAY
+        times = kept["dteday"].to_numpy("datetime64[ns]").astype(np.int64)
+        if "hr" in kept:
+            step = HOUR
+            times = times + kept["hr"].to_numpy(np.int64) * HOUR
+        if len(times):
+            if self._last_kept is not None:
+                times = np.concatenate([[self._last_kept], times])
+            report["missing_periods"] += int((np.diff(times) // step - 1).sum())
+            self._last_kept = int(times[-1])
+
+        for column, limit in self.limits.items():
+            clipped = int((kept[column] > limit).sum())
+            report["clipped"][column] = report["clipped"].get(column, 0) + clipped
+
+        # Every combination of broken rules is named once, not once per row.
+        combinations = flags[bad].to_numpy() @ (1 << np.arange(len(RULES)))
+        names = {
+            combination: ",".join(
+                rule for bit, rule in enumerate(RULES) if combination >> bit & 1
+            )
+            for combination in np.unique(combinations)
+        }
+        quarantined = df[bad].assign(
+            violations=pd.Series(combinations, index=df.index[bad]).map(names)
+        )
+
+        return kept, quarantined
+
+
+def quarantine_path(granularity, partition):
+    """
+    Build the path of the quarantined rows of one partition.
+
+    Parameters:
+    - granularity: "day" or "hour".
+    - partition: The partition name, such as "2011-01".
+
+    Returns:
+    - path: The path of the CSV file.
+    """
+    return os.path.join(QUARANTINE_DIR, granularity, f"{partition}.csv")
+
+
+def read_quarantine(granularity, partition):
+    """
+    Read the quarantined rows of one partition.
+
+    Parameters:
+    - granularity: "day" or "hour".
+    - partition: The partition name.
+
+    Returns:
+    - rows: The rows as they were written, with numeric 'instant' values, NaN where they cannot be parsed. Empty when nothing is quarantined.
+    """
+    path = quarantine_path(granularity, partition)
+    if not os.path.exists(path):
+        return pd.DataFrame({"instant": pd.Series(dtype=np.float64)})
+
+    rows = pd.read_csv(path, dtype=str)
+    rows["instant"] = pd.to_numeric(rows["instant"], errors="coerce")
+
+    return rows
+
+
+def write_quarantine(rows, granularity, partition, append=False):
+    """
+    Write the quarantined rows of one partition next to the store.
+
+    The rows are kept as they were read, with the rules they broke, so they
+    can be fixed and appended again. Without rows, the file is removed.
+
+    Parameters:
+    - rows: The quarantined rows returned by QualityChecker.check().
+    - granularity: "day" or "hour".
+    - partition: The partition name.
+    - append: Add the rows to the file instead of replacing it.
+    """
+    if not len(rows):
+        if not append:
+            remove_quarantine(granularity, partition)
+        return
+
+    path = quarantine_path(granularity, partition)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    exists = append and os.path.exists(path)
+    rows.to_csv(path, mode="a" if exists else "w", header=not exists, index=False)
+
+
+def remove_quarantine(granularity, partition):
+    """
+    Remove the quarantined rows of one partition, if any.
+
+    Parameters:
+    - granularity: "day" or "hour".
+    - partition: The partition name.
+    """
+    path = quarantine_path(granularity, partition)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def format_report(report):
+    """
+    Summarize a quality report in one line.
+
+    Parameters:
+    - report: A dictionary returned by new_report() and filled by QualityChecker.
+
+    Returns:
+    - summary: A line with the checked, kept and quarantined rows, the broken rules, the missing periods and the clipped values.
+    """
+    parts = [
+        f"{report['rows']} row(s) checked",
+        f"{report['kept']} kept",
+        f"{report['quarantined']} quarantined",
+    ]
+    broken = [
+        f"{rule}: {count} (e.g. instant {', '.join(map(str, report['examples'][rule]))})"
+        for rule, count in report["violations"].items()
+    ]
+    if broken:
+        parts[-1] += f" ({'; '.join(broken)})"
+    parts.append(f"{report['missing_periods']} missing period(s)")
+    parts += [
+        f"{count} '{column}' value(s) clipped"
+        for column, count in report["clipped"].items()
+    ]
+
+    return ", ".join(parts)
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from labels import MONTH_LABELS, SEASON_LABELS, WEATHERSIT_LABELS, year_labels
+
+# The compact dtypes of the rental frames. Flags, codes and hours fit in
+# int8, counts in int32, and the normalized weather measures keep about seven
+# significant digits in float32, more than the source files hold.
+COLUMN_DTYPES = {
+    "instant": np.int32,
+    "dteday": np.dtype("datetime64[ns]"),
+    "timestamp": np.dtype("datetime64[ns]"),
+    "season": np.int8,
+    "yr": np.int8,
+    "mnth": np.int8,
+    "hr": np.int8,
+    "holiday": np.int8,
+    "weekday": np.int8,
+    "workingday": np.int8,
+    "weathersit": np.int8,
+    "temp": np.float32,
+    "atemp": np.float32,
+    "hum": np.float32,
+    "windspeed": np.float32,
+    "casual": np.int32,
+    "registered": np.int32,
+    "cnt": np.int32,
+    "casual_percentage": np.float32,
+    "registered_percentage": np.float32,
+}
+
+# Columns that are labelled in the categorical views, with their codes. The
+# labels of 'yr' are the years of the data, see column_labels().
+LABELLED_COLUMNS = {
+    "season": SEASON_LABELS,
+    "yr": None,
+    "mnth": MONTH_LABELS,
+    "weathersit": WEATHERSIT_LABELS,
+}
+
+# The valid values of the code columns, as inclusive ranges. Year codes are
+# checked against 'dteday' instead, and only bounded by their dtype here.
+CODE_RANGES = {
+    "season": (1, 4),
+    "yr": (0, np.iinfo(COLUMN_DTYPES["yr"]).max),
+    "mnth": (1, 12),
+    "hr": (0, 23),
+    "holiday": (0, 1),
+    "weekday": (0, 6),
+    "workingday": (0, 1),
+    "weathersit": (1, 4),
+}
+
+WEATHER_COLUMNS = ("temp", "atemp", "hum", "windspeed")
+
+
+def column_labels(column, values):
+    """
+    Find the labels of the codes of a column.
+
+    Parameters:
+    - column: A column name.
+    - values: The values of the column, as codes or labels. The labels of 'yr' are the years among them.
+
+    Returns:
+    - labels: A dictionary from code to label, or None when the column is not labelled.
+    """
+    if column == "yr":
+        return year_labels(values)
+
+    return LABELLED_COLUMNS.get(column)
+
+
+def label_dtype(column, values):
+    """
+    Build the categorical dtype of a labelled column.
+
+    Parameters:
+    - column: One of LABELLED_COLUMNS.
+    - values: The values of the column, as codes or labels.
+
+    Returns:
+    - dtype: A pandas CategoricalDtype with the labels in code order.
+    """
+    return pd.CategoricalDtype(list(column_labels(column, values).values()))
+
+
+def apply_schema(df):
+    """
+    Cast the columns of a rental frame to their compact dtypes.
+
+    Columns holding labels become pandas Categoricals with the labels of the
+    column, in code order, so every loader of the same data produces the
+    same categories.
+    Columns missing from COLUMN_DTYPES are left untouched.
+
+    Parameters:
+    - df: A DataFrame containing rental data, with categories as codes or labels.
+
+    Returns:
+    - df: The DataFrame with compact dtypes.
+    """
+    for column in df.columns:
+        values = df[column]
+
+        if column in LABELLED_COLUMNS and not pd.api.types.is_numeric_dtype(values):
+            dtype = label_dtype(column, values)
+            if values.dtype == dtype:
+                continue
+            labelled = values.astype(str).astype(dtype)
+            unknown = labelled.isna() & values.notna()
+            if unknown.any():
+                raise ValueError(
+                    f"Unknown labels in {column}: {sorted(set(values[unknown]))}"
+                )
+            df[column] = labelled
+        elif column in COLUMN_DTYPES and values.dtype != COLUMN_DTYPES[column]:
+            df[column] = values.astype(COLUMN_DTYPES[column])
+
+    return df
+
+
+def validate(df):
+    """
+    Check new rental rows before they are cast and stored.
+
+    Parameters:
+    - df: A DataFrame in the layout of data/day.csv or data/hour.csv, with categories as codes.
+
+    Returns:
+    - df: The DataFrame with compact dtypes.
+
+    Raises:
+    - ValueError: When a value is missing, out of range or does not fit its dtype.
+    """
+    problems = []
+    for column in df.columns:
+        if column not in COLUMN_DTYPES:
+            continue
+
+        values = df[column]
+        if values.isna().any():
+            problems.append(f"{column} has missing values")
+            continue
+
+        dtype = np.dtype(COLUMN_DTYPES[column])
+        if column in CODE_RANGES:
+            low, high = CODE_RANGES[column]
+        elif column in WEATHER_COLUMNS:
+            low, high = 0.0, 1.0
+        elif dtype.kind == "i":
+            low, high = 0, np.iinfo(dtype).max
+        else:
+            continue
+
+        if not pd.api.types.is_numeric_dtype(values):
+            problems.append(f"{column} is not numeric")
+        elif ((values < low) | (values > high)).any():
+            problems.append(f"{column} has values outside [{low}, {high}]")
+        elif dtype.kind == "i" and (values != np.floor(values)).any():
+            problems.append(f"{column} has non-integer values")
+
+    if problems:
+        raise ValueError(f"Invalid rental rows: {'; '.join(problems)}")
+
+    return apply_schema(df)
@@ -0,0 +1,1125 @@
+import contextlib
+import threading
+from concurrent.futures import wait
+
+import pandas as pd
+import streamlit as st
+
+from charts import (
+    cached_figure,
+    create_anomaly_chart,
+    draw_hourly_heatmap,
+    draw_seasonal_trends,
+    draw_user_impact,
+    draw_weather_impact,
+    render_figure,
+)
+from fleet import SERVICE_LEVELS, USER_TYPES
+from forecast import scenario_frame
+from labels import (
+    MONTH_LABELS,
+    SEASON_LABELS,
+    USER_LABELS,
+    WEATHERSIT_LABELS,
+    WEEKDAY_LABELS,
+)
+from stats import user_share_intervals
+from windows import WEEK, WINDOW_MEASURES, WINDOWS, YEAR
+
+# The charts of the current script run waiting for their statistics. Every
+# session runs its script in a thread of its own.
+_pending = threading.local()
+
+
+class PendingCharts:
+    """
+    Charts shown as placeholders until the statistics behind them are computed.
+    """
+
+    def __init__(self):
+        self.charts = []
+
+    def add(self, placeholder, futures, key, draw):
+        self.charts.append((placeholder, futures, key, draw))
+
+    def render(self):
+        """
+        Wait for the statistics of every pending chart and draw it into its placeholder.
+        """
+        charts, self.charts = self.charts, []
+        for placeholder, futures, key, draw in charts:
+            wait(futures)
+            placeholder.image(render_figure(key, draw), width="stretch")
+
+
+@contextlib.contextmanager
+def pending_charts():
+    """
+    Collect the charts whose statistics are not ready while sections render.
+
+    Returns:
+    - pending: The PendingCharts of the block. Call its render() method once the sections are rendered.
+    """
+    _pending.charts = PendingCharts()
+    try:
+        yield _pending.charts
+    finally:
+        _pending.charts = None
+
+
+def unusual_label(view):
+    """
+    Name the count of unusual days of the granularity of a view.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+
+    Returns:
+    - label: The metric label.
+    """
+    return "Days with Unusual Hours" if view.data.hourly else "Unusual Days"
+
+
+def format_count(value, sign=False):
+    """
+    Format a rental count for a metric.
+
+    Parameters:
+    - value: The count, or NaN when it is not available.
+    - sign: Always show the sign, as for a delta.
+
+    Returns:
+    - text: The formatted count, or None when it is not available.
+    """
+    if pd.isna(value):
+        return None
+
+    return f"{value:+,.0f}" if sign else f"{value:,.0f}"
+
+
+def format_change(value):
+    """
+    Format a relative change for a metric.
+
+    Parameters:
+    - value: The change as a fraction, or NaN when it is not available.
+
+    Returns:
+    - text: The formatted percentage, or "n/a".
+    """
+    if pd.isna(value):
+        return "n/a"
+
+    return f"{value:+.1%}"
+
+
+def format_date(date):
+    """
+    Format the date of a measure statistic for a caption.
+
+    Parameters:
+    - date: The date, or None for an empty selection.
+
+    Returns:
+    - text: The date as "01 January 2011", or "n/a".
+    """
+    if date is None:
+        return "n/a"
+
+    return f"{date:%d %B %Y}"
+
+
+def render_when_ready(futures, key, draw):
+    """
+    Render a chart whose statistics are computed in the statistics pool.
+
+    When the statistics are not ready inside a pending_charts() block, a
+    placeholder is shown and the rest of the page renders without waiting.
+    A chart already rendered, or served from a snapshot, is shown without
+    asking for its statistics.
+
+    Parameters:
+    - futures: A function without arguments returning the Futures of the statistics the chart needs.
+    - key: The render_figure() key of the chart.
+    - draw: A function without arguments returning the matplotlib Figure, called once the statistics are ready.
+    """
+    image = cached_figure(key)
+    if image is not None:
+        st.image(image, width="stretch")
+        return
+
+    futures = futures()
+    pending = getattr(_pending, "charts", None)
+    if pending is None or all(future.done() for future in futures):
+        wait(futures)
+        st.image(render_figure(key, draw), width="stretch")
+        return
+
+    placeholder = st.empty()
+    placeholder.info("Computing the statistics of this chart...")
+    pending.add(placeholder, futures, key, draw)
+
+
+def render_introduction(view):
+    """
+    Render the "Introduction" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    with st.container():
+        st.header("Introduction")
+        st.markdown(
+            """
+            The data set in question provides comprehensive information about bike rentals over the course of two years (2011 and 2012). The data is categorized by various factors such as time (year, month, hour), weather conditions (temperature, humidity, wind speed), and user type (casual or registered). This report aims to analyze this data, focusing specifically on the daily data, to identify patterns and correlations that could provide valuable insights for business development.
+            """
+        )
+
+        st.divider()
+
+        st.header("Categorization")
+
+        st.markdown(
+            """
+            - Time-related: This includes the year, month, and whether the day is a holiday or working day.
+            - Weather-related: This includes the weather situation, temperature, humidity, and wind speed.
+            - Season-related: This includes the season situation.
+            - User-related: This includes the count of casual users, registered users, and total rental bikes.
+            """
+        )
+
+        st.divider()
+
+        st.header("Business Questions")
+
+        st.markdown(
+            """
+            Based on the data, we can formulate business questions:
+
+            - How do bike rentals vary across different seasons and months?
+            - How does weather affect bike rentals?
+            - What are the differences between casual and registered users in terms of rental patterns?
+            - Is there a correlation between weather conditions and bike rentals?
+            - How does the time of year affect the behavior of casual versus registered users?
+            - How can we optimize bike availability according to seasonal trends?
+            - Can we predict bike rental demand based on weather conditions?
+            """
+        )
+
+
+def render_daily_rentals(view):
+    """
+    Render the "Daily Bike Rentals" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    start_date = view.start
+    end_date = view.end
+    daily_rentals = view.daily_rentals
+    # The day-over-day changes of the last day, none for an empty selection.
+    deltas = daily_rentals.iloc[-1] if len(daily_rentals) else {}
+
+    with st.container():
+        st.header("Daily Bike Rentals")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            sum_total_rentals = daily_rentals["cnt_sum"].sum()
+            st.metric(
+                label="Total Rentals",
+                value=sum_total_rentals,
+                delta=deltas.get("cnt_diff"),
+            )
+
+        with col2:
+            sum_casual_rentals = daily_rentals["casual_sum"].sum()
+            st.metric(
+                label="Total Casual Users Rental",
+                value=sum_casual_rentals,
+                delta=deltas.get("casual_diff"),
+            )
+
+        with col3:
+            sum_register_rentals = daily_rentals["registered_sum"].sum()
+            st.metric(
+                label="Total Registered Users Rental",
+                value=sum_register_rentals,
+                delta=deltas.get("registered_diff"),
+            )
+
+        st.caption(
+            f"""
+            The metrics displayed above offer valuable insights into daily bike rentals spanning from {start_date} to {end_date}, while considering influential factors such as weather and season. 'Total Rentals' provides a comprehensive overview, aggregating the cumulative count of all bike rentals ('cnt') to present a holistic perspective on overall bike usage. Additionally, 'Total Casual Users Rental' and 'Total Registered Users Rental' offer a detailed segmentation, shedding light on rental preferences among user types ('casual' and 'registered').
+
+            Furthermore, the 'Delta' values accompanying these metrics represent day-to-day rental fluctuations. These variations encapsulate not only daily rental patterns but also account for the dynamic influence of external factors such as weather conditions ('Clear, Few clouds, Partly cloudy, Partly cloudy', 'Mist + Cloudy, Mist + Broken clouds, Mist + Few clouds, Mist', 'Light Snow, Light Rain + Thunderstorm + Scattered clouds, Light Rain + Scattered clouds') and seasonal transitions ('Springer', 'Summer', 'Fall', 'Winter'). By continuously tracking these multifaceted trends over time, we gain profound insights into the intricate dynamics of bike rentals, enabling data-driven decisions related to resource allocation and service enhancements.
+            """
+        )
+
+
+def render_rolling_trends(view):
+    """
+    Render the "Rolling Trends" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    engine = view.window_engine
+
+    with st.container():
+        st.subheader("Rolling Trends")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            window = st.selectbox(
+                label="Window",
+                options=list(WINDOWS),
+                format_func=lambda days: f"{days} days",
+                key="window_days",
+            )
+
+        with col2:
+            measure = st.selectbox(
+                label="Users",
+                options=list(WINDOW_MEASURES),
+                format_func=USER_LABELS.get,
+                key="window_users",
+            )
+
+        # The windows end on the last selected day with rentals, so a season
+        # or weather selection still compares its latest days.
+        last_day = engine.last_day(view.end) or pd.Timestamp(view.end)
+        weekly = engine.compare(last_day, window, WEEK).loc[measure]
+        yearly = engine.compare(last_day, window, YEAR).loc[measure]
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label=f"Rentals in the Last {window} Days",
+                value=format_count(weekly["current"]),
+            )
+
+        with col2:
+            st.metric(
+                label="Week over Week",
+                value=format_change(weekly["change"]),
+                delta=format_count(weekly["delta"], sign=True),
+            )
+
+        with col3:
+            st.metric(
+                label="Year over Year",
+                value=format_change(yearly["change"]),
+                delta=format_count(yearly["delta"], sign=True),
+            )
+
+        comparison = pd.DataFrame(
+            {
+                "Selected Period": engine.rolling(window, view.start, view.end)[
+                    measure
+                ],
+                "Year Earlier": engine.rolling(window, view.start, view.end, lag=YEAR)[
+                    measure
+                ].to_numpy(),
+            }
+        )
+        st.line_chart(data=comparison)
+
+        st.caption(
+            f"""
+            The metrics compare the {USER_LABELS[measure].lower()} rentals of the {window} days ending on {last_day:%Y-%m-%d}, the last selected day with rentals, with the same window one week earlier and 52 weeks earlier, so both windows cover the same weekdays. The chart shows the {window}-day rolling mean of daily rentals over the selected period next to the same days one year earlier. Season and weather selections apply to both windows, and days they leave out are not counted in the means.
+            """
+        )
+
+
+def render_correlations(view):
+    """
+    Render the "Correlations Between Variables" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    correlation_matrix = view.correlation_matrix
+
+    with st.container():
+        st.header("Correlations Between Variables")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            correlation_temp_hum = correlation_matrix.loc["temp", "hum"]
+            st.metric(
+                label="Correlation between Temperature and Humidity",
+                value=f"{correlation_temp_hum * 100:.2f}%",
+            )
+        with col2:
+            correlation = correlation_matrix.loc["temp", "cnt"]
+            st.metric(
+                label="Correlation between Temperature and Total Rentals",
+                value=f"{correlation * 100:.2f}%",
+            )
+
+        st.dataframe(
+            correlation_matrix.style.format("{:.2f}").background_gradient(
+                cmap="RdBu_r", vmin=-1, vmax=1
+            )
+        )
+
+        st.caption(
+            f"""
+            The analysis reveals insightful correlations between various factors impacting bike rentals. First, the 'Correlation between Temperature and Humidity' stands at {correlation_temp_hum * 100:.2f}%. This suggests a relatively weak relationship between temperature and humidity, implying that changes in one variable do not significantly affect the other.
+            
+            On the other hand, the 'Correlation between Temperature and Total Rentals' is notably stronger at {correlation * 100:.2f}%. This indicates a substantial connection between temperature and bike rentals, with higher temperatures generally associated with increased rental activity. As temperature rises, more people are inclined to rent bikes, likely due to favorable weather conditions. Understanding these correlations can help us make informed decisions and predict rental patterns based on temperature changes.
+            """
+        )
+
+
+def render_hourly_patterns(view):
+    """
+    Render the "Hourly Patterns" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    with st.container():
+        st.header("Hourly Patterns")
+
+        st.line_chart(data=view.hourly_profile)
+
+        st.image(
+            render_figure(
+                view.figure_key("hourly_heatmap"),
+                lambda: draw_hourly_heatmap(view.hourly_heatmap),
+            ),
+            width="stretch",
+        )
+
+        st.caption(
+            """
+            The line chart shows the average number of casual, registered and total rentals for each hour of the day within the selected period, season and weather. The heatmap breaks the average total rentals down by weekday and hour, which makes the commuting peaks of working days stand out against the midday peak of weekends.
+            """
+        )
+
+
+def render_total_rentals(view):
+    """
+    Render the "Total Rentals" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    chart_df = view.chart_df
+    measure_stats = view.measure_stats
+
+    with st.container():
+        st.header("Total Rentals")
+
+        unusual_days = view.unusual_days["cnt"]
+        st.altair_chart(
+            create_anomaly_chart(chart_df, unusual_days, "cnt"), width="stretch"
+        )
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label="Max Rentals",
+                value=measure_stats["cnt"].max,
+            )
+        with col2:
+            st.metric(
+                label="Min Rentals",
+                value=measure_stats["cnt"].min,
+            )
+
+        with col3:
+            st.metric(
+                label=unusual_label(view),
+                value=len(unusual_days),
+            )
+
+        st.caption(
+            f"""
+            Analyzing the bike rental data, we observe intriguing statistics regarding the total rental counts ('cnt'). At its peak, we witnessed a remarkable day with a staggering 'Max Rentals' of {measure_stats['cnt'].max} on {format_date(measure_stats['cnt'].max_date)}. On this particular day, bike usage reached its zenith, reflecting exceptional demand, possibly driven by ideal weather conditions or special events.
+
+            Conversely, the dataset also reveals a contrasting scenario. On the other end of the spectrum, we encountered a day with 'Min Rentals' as low as {measure_stats['cnt'].min} on {format_date(measure_stats['cnt'].min_date)}. This represents a day of minimal bike rental activity, which could be attributed to adverse weather, holidays, or other factors influencing reduced bike usage.
+
+            These extreme values in rental counts provide valuable insights into the dynamics of bike rentals, helping us identify both peak performance and potential areas for improvement in the bike rental service.
+            """
+        )
+
+
+def render_casual_rentals(view):
+    """
+    Render the "Total Casual Users Rentals" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    chart_df = view.chart_df
+    measure_stats = view.measure_stats
+
+    with st.container():
+        st.header("Total Casual Users Rentals")
+
+        unusual_days = view.unusual_days["casual"]
+        st.altair_chart(
+            create_anomaly_chart(chart_df, unusual_days, "casual"), width="stretch"
+        )
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label="Max Rentals",
+                value=measure_stats["casual"].max,
+            )
+        with col2:
+            st.metric(
+                label="Min Rentals",
+                value=measure_stats["casual"].min,
+            )
+
+        with col3:
+            st.metric(
+                label=unusual_label(view),
+                value=len(unusual_days),
+            )
+
+        st.caption(
+            f"""
+            Exploring the data, we uncover intriguing statistics regarding casual bike rentals. At its peak, we observed an exceptional day with 'Max Rentals' reaching {measure_stats['casual'].max} casual users on {format_date(measure_stats['casual'].max_date)}. On this remarkable day, the demand for casual bike rentals surged to its highest point, signifying strong interest and potentially favorable weather conditions or special events that attracted users.
+
+            Conversely, our analysis also unveils a contrasting scenario. On the other end of the spectrum, we encountered a day with 'Min Rentals' as low as {measure_stats['casual'].min} casual rentals on {format_date(measure_stats['casual'].min_date)}. On this particular day, rental activity among casual users was minimal, which could be attributed to factors like inclement weather or other external influences.
+
+            These extreme values in casual bike rentals offer valuable insights into the dynamics of casual user preferences and the potential impact of external factors on their rental behavior. Understanding these variations can aid in optimizing service strategies to cater more effectively to casual users.
+            """
+        )
+
+
+def render_registered_rentals(view):
+    """
+    Render the "Total Registered Users Rentals" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    chart_df = view.chart_df
+    measure_stats = view.measure_stats
+
+    with st.container():
+        st.subheader("Total Registered Users Rentals")
+        unusual_days = view.unusual_days["registered"]
+        st.altair_chart(
+            create_anomaly_chart(chart_df, unusual_days, "registered"), width="stretch"
+        )
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label="Max Rentals",
+                value=measure_stats["registered"].max,
+            )
+
+        with col2:
+            st.metric(
+                label="Min Rentals",
+                value=measure_stats["registered"].min,
+            )
+
+        with col3:
+            st.metric(
+                label=unusual_label(view),
+                value=len(unusual_days),
+            )
+
+        st.caption(
+            f"""
+            Delving into the dataset, we uncover noteworthy statistics pertaining to registered bike rentals. At its zenith, we observed an exceptional day with 'Max Rentals' peaking at {measure_stats['registered'].max} registered users on {format_date(measure_stats['registered'].max_date)}. On this remarkable day, registered bike rentals surged to their highest point, reflecting a robust demand and possibly ideal weather conditions or special events that enticed users to explore casual bike usage extensively.
+
+            Conversely, our analysis also reveals a contrasting scenario. At the other end of the spectrum, we encountered a day with 'Min Rentals' dwindling to as low as {measure_stats['registered'].min} registered rentals on {format_date(measure_stats['registered'].min_date)}. On this particular day, rental activity among casual users reached its nadir, possibly influenced by adverse weather conditions or other external factors.
+
+            These extreme values in registered bike rentals provide valuable insights into the dynamic preferences of registered users and underscore the potential impact of external variables on their rental behavior. Understanding these fluctuations can guide strategic decisions aimed at enhancing the service experience for registered riders.
+            """
+        )
+
+
+def render_seasonal_trends(view):
+    """
+    Render the "Seasonal Trends" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    monthly_data = view.data.monthly_data
+
+    with st.container():
+        st.subheader("Seasonal Trends")
+        st.line_chart(data=monthly_data)
+
+        render_when_ready(
+            lambda: [
+                view.data.aggregate_cube.interval_future("season"),
+                view.data.aggregate_cube.interval_future("mnth"),
+            ],
+            view.figure_key("seasonal_trends"),
+            lambda: draw_seasonal_trends(view.data.aggregate_cube),
+        )
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.metric(
+                label="Max Rentals",
+                value=monthly_data.max(),
+            )
+
+        with col2:
+            st.metric(
+                label="Min Rentals",
+                value=monthly_data.min(),
+            )
+
+        st.caption(
+            """
+            here’s a more specific interpretation of the data:
+
+            Seasonal Trends:
+
+            - Spring: The average number of bike rentals is 2,604.13. This is the lowest among all seasons, possibly due to the transition from colder to warmer weather.
+            - Summer: The average number of bike rentals increases significantly to 4,992.33, likely due to warmer and more favorable weather for outdoor activities like biking.
+            - Fall: The average number of bike rentals is at its peak at 5,644.3. The mild weather during this season might be ideal for biking.
+            - Winter: The average number of bike rentals decreases to 4,728.16, likely due to colder weather.
+
+            Monthly Trends:
+
+            - The year starts with a moderate number of rentals in January (2,176.34), which increases slightly in February (2,655.3).
+            - In March, there’s a significant spike to 3,692.26 rentals. This could be due to warmer weather or other seasonal factors that make biking more popular.
+            - From April to September, the numbers remain relatively high, ranging from 4,484.9 (April) to 5,766.52 (September). This period likely represents the peak biking season.
+            - Starting in October, there’s a noticeable decrease in bike rentals, with numbers dropping to 3,403.81 by December. This could be due to colder weather or other factors that make biking less popular.
+
+            This pattern suggests a strong seasonal trend in bike rentals, with demand peaking in the warmer months and decreasing in the colder months. It also shows that within each season, certain months (like March in Spring, September in Fall) might have higher bike rentals due to specific weather conditions or events.
+            """
+        )
+
+
+def render_temperature_trends(view):
+    """
+    Render the "Temperature Trends" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    chart_df = view.chart_df
+    measure_stats = view.measure_stats
+
+    with st.container():
+        st.subheader("Temperature Trends")
+        st.line_chart(data=chart_df, x="dteday", y="temp")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label="Max Temperature",
+                value=f"{(measure_stats['temp'].max * 100):.2f}°C",
+            )
+
+        with col2:
+            st.metric(
+                label="Mean Temperature",
+                value=f"{(measure_stats['temp'].mean * 100):.2f}°C",
+            )
+
+        with col3:
+            st.metric(
+                label="Min Temperature",
+                value=f"{(measure_stats['temp'].min * 100):.2f}°C",
+            )
+
+        st.caption(
+            f"""
+            Our analysis of temperature data reveals key insights into the weather conditions during the period under examination.
+
+            At its highest point, we observed a 'Max Temperature' of {(measure_stats['temp'].max * 100):.2f}°C, signifying the peak temperature experienced during this timeframe. This maximum temperature value serves as an indicator of the hottest days, where individuals might be more inclined to engage in outdoor activities, including bike rentals.
+
+            On average, the 'Mean Temperature' stands at {(measure_stats['temp'].mean * 100):.2f}°C, providing an understanding of the typical temperature conditions throughout the dataset. This mean temperature serves as a central reference point, helping us gauge how the temperature typically behaves during the observed period.
+
+            Conversely, we also encountered instances where the temperature reached 'Min Temperature' values as low as {(measure_stats['temp'].min * 100):.2f}. These minimum temperature values represent the coldest days within the dataset, potentially influencing user behavior and outdoor activities.
+
+            By examining these temperature metrics, we gain valuable insights into the range of temperature conditions experienced, allowing us to correlate weather patterns with bike rental trends and make data-informed decisions regarding resource allocation and service adjustments.
+            """
+        )
+
+
+def render_humidity_trends(view):
+    """
+    Render the "Humidity Trends" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    chart_df = view.chart_df
+    measure_stats = view.measure_stats
+
+    with st.container():
+        st.subheader("Humidity Trends")
+        st.line_chart(data=chart_df, x="dteday", y="hum")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label="Max Humidity", value=f"{(measure_stats['hum'].max * 100):.2f}%"
+            )
+
+        with col2:
+            st.metric(
+                label="Mean Humidity", value=f"{(measure_stats['hum'].mean * 100):.2f}%"
+            )
+
+        with col3:
+            st.metric(
+                label="Min Humidity", value=f"{(measure_stats['hum'].min * 100):.2f}%"
+            )
+
+        st.caption(
+            f"""
+            The humidity data you provided can be particularly insightful for your bike rental data analysis. Here's a more contextual explanation:
+
+            - Maximum Humidity: The peak recorded relative humidity was {(measure_stats['hum'].max * 100):.2f}%. Such high humidity levels could potentially deter bike rentals due to the discomfort associated with heavy moisture in the air, often leading to heavy rainfall or dense fog conditions.
+
+            - Mean Humidity: The average relative humidity was {(measure_stats['hum'].mean * 100):.2f}%. This moderate level of humidity suggests a balanced weather condition which might not significantly impact the decision to rent bikes.
+
+            - Minimum Humidity: The lowest recorded relative humidity was {(measure_stats['hum'].min * 100):.2f}%, indicating extremely dry conditions. While low humidity might make the weather seem more pleasant for outdoor activities like biking, extremely dry conditions can also cause discomfort and could potentially impact bike rental numbers.
+
+            Understanding these humidity levels can help predict bike rental patterns and make informed decisions about resource allocation and marketing strategies. For instance, additional promotions could be planned for times when the weather is expected to have moderate humidity, which might boost rentals.
+            """
+        )
+
+
+def render_wind_speed_trends(view):
+    """
+    Render the "Wind Speed Trends" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    start_date = view.start
+    end_date = view.end
+    chart_df = view.chart_df
+    measure_stats = view.measure_stats
+
+    with st.container():
+        st.subheader("Wind Speed Trends")
+        st.line_chart(data=chart_df, x="dteday", y="windspeed")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label="Max Windspeed",
+                value=f"{(measure_stats['windspeed'].max * 100):.2f} km/h",
+            )
+
+        with col2:
+            st.metric(
+                label="Mean Windspeed",
+                value=f"{(measure_stats['windspeed'].mean * 100):.2f} km/h",
+            )
+
+        with col3:
+            st.metric(
+                label="Min Windspeed",
+                value=f"{(measure_stats['windspeed'].min * 100):.2f} km/h",
+            )
+
+        st.caption(
+            f"""
+            The graph shows the variation of wind speed over time from {start_date} to {end_date}. The wind speed is measured in kilometers per hour (km/h) and the time is measured in months. The graph has a lot of ups and downs, which means that the wind speed changes frequently and unpredictably. The highest wind speed recorded was 50.75 km/h, which is very fast and could cause damage to buildings and trees. The lowest wind speed recorded was 2.24 km/h, which is very slow and could make the air feel stagnant. The average wind speed was 19.05 km/h, which is moderate and comfortable for most people. The graph can help us understand the patterns and trends of wind speed over time and how they affect our environment and activities.
+            """
+        )
+
+
+def render_weather_impact(view):
+    """
+    Render the "Weather Impact" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    with st.container():
+        st.subheader("Weather Impact")
+
+        render_when_ready(
+            lambda: [view.data.aggregate_cube.box_stats_future("weathersit")],
+            view.figure_key("weather_impact"),
+            lambda: draw_weather_impact(view.data.aggregate_cube),
+        )
+
+        st.caption(
+            """
+            This graph is titled “Bike Rentals by Weather Situation”. The x-axis represents the “Weather Situation” with three categories: 1, 2, and 3. The y-axis represents the “Total Rentals” ranging from 0 to 8000. Weather significantly affects bike rentals in the following ways:
+
+            - Clear, Few clouds, Partly cloudy, Partly cloudy (Weather Situation 1):
+                
+                This is the most favorable weather for bike rentals with approximately 7500 rentals. Clear or partly cloudy weather is ideal for outdoor activities like biking.
+
+            - Mist + Cloudy, Mist + Broken clouds, Mist + Few clouds, Mist (Weather Situation 2):
+            
+                This weather situation results in a decrease in bike rentals to approximately 5000. The presence of mist or broken clouds might make biking less appealing.
+
+            - Light Snow, Light Rain + Thunderstorm + Scattered clouds, Light Rain + Scattered clouds (Weather Situation 3):
+            
+                This weather situation has the least favorable conditions for biking with approximately 2500 rentals. Inclement weather like rain, snow, or thunderstorms can discourage people from outdoor activities like biking due to safety concerns and discomfort.
+
+            These trends suggest that favorable weather conditions (clear or partly cloudy) result in higher bike rentals while unfavorable conditions (rain, snow, thunderstorms) result in fewer rentals.
+            """
+        )
+
+
+def render_user_impact(view):
+    """
+    Render the "User Impact" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    with st.container():
+        st.subheader("User Impact")
+
+        def intervals():
+            return user_share_intervals(view.data.numerical_df, view.data.version)
+
+        render_when_ready(
+            lambda: [intervals()],
+            view.figure_key("user_impact"),
+            lambda: draw_user_impact(intervals().result()),
+        )
+
+        st.caption(
+            """
+            Based on the line graph titled “Casual vs Registered Users Over Time”, we can observe the following rental patterns:
+
+            - Casual Users (Orange Line):
+                
+                The percentage of total rentals by casual users is higher than that of registered users for all months. There is a slight dip around the 6th month, after which it increases again. This suggests that casual users might be more influenced by factors such as weather, holidays, or events that occur around this time.
+
+            - Registered Users (Blue Line):
+            
+                The percentage of total rentals by registered users is lower than that of casual users. There is a slight increase around the 6th month, after which it decreases again. This could indicate that registered users have more consistent usage patterns throughout the year, but there might be certain times (like the 6th month) when their usage increases.
+
+            In summary, casual users tend to make up a higher percentage of total rentals and their usage appears to be more variable. On the other hand, registered users have a lower but more consistent percentage of total rentals.
+            """
+        )
+
+
+def render_conclusion(view):
+    """
+    Render the "Conclusion" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    with st.container():
+        st.subheader("Conclusion")
+
+        with st.expander(
+            "How do bike rentals vary across different seasons and months?"
+        ):
+            st.caption(
+                """
+                These trends suggest that weather and temperature play a significant role in influencing bike rental patterns. Warmer months and seasons tend to see higher demand for bike rentals, while colder periods see a decrease in demand.
+                """
+            )
+
+        with st.expander("How does weather affect bike rentals?"):
+            st.caption(
+                """
+                - Clear, Few clouds, Partly cloudy, Partly cloudy (Weather Situation 1): This is the most favorable weather for bike rentals with approximately 7500 rentals. Clear or partly cloudy weather is ideal for outdoor activities like biking.
+
+                - Mist + Cloudy, Mist + Broken clouds, Mist + Few clouds, Mist (Weather Situation 2): This weather situation results in a decrease in bike rentals to approximately 5000. The presence of mist or broken clouds might make biking less appealing.
+
+                - Light Snow, Light Rain + Thunderstorm + Scattered clouds, Light Rain + Scattered clouds (Weather Situation 3): This weather situation has the least favorable conditions for biking with approximately 2500 rentals. Inclement weather like rain, snow, or thunderstorms can discourage people from outdoor activities like biking due to safety concerns and discomfort.
+                """
+            )
+
+        with st.expander(
+            "What are the differences between casual and registered users in terms of rental patterns?"
+        ):
+            st.caption(
+                """
+                - Casual Users: 
+                    
+                    The percentage of total rentals by casual users is higher than that of registered users for all months. There is a slight dip around the 6th month, after which it increases again. This suggests that casual users might be more influenced by factors such as weather, holidays, or events that occur around this time.
+
+                - Registered Users:
+                
+                    The percentage of total rentals by registered users is lower than that of casual users. There is a slight increase around the 6th month, after which it decreases again. This could indicate that registered users have more consistent usage patterns throughout the year, but there might be certain times (like the 6th month) when their usage increases.
+                """
+            )
+
+        with st.expander(
+            "Is there a correlation between weather conditions and bike rentals?"
+        ):
+            st.caption(
+                """
+                there seems to be a strong correlation between weather conditions and bike rentals, with clear or partly cloudy weather being the most favorable for bike rentals, and adverse weather conditions like light snow or rain being the least favorable.
+                """
+            )
+
+        with st.expander(
+            "How does the time of year affect the behavior of casual versus registered users?"
+        ):
+            st.caption(
+                """
+                It appears that both registered and casual users prefer to rent bikes under clear or partly cloudy weather conditions across all seasons. However, registered users seem to be more tolerant of adverse weather conditions compared to casual users. This information could be valuable for predicting bike rental patterns and informing marketing strategies. For instance, additional promotions could be planned for times when the weather is expected to be clear or partly cloudy, which might boost rentals among casual users. Conversely, strategies could be developed to encourage bike rentals among casual users during adverse weather conditions.
+                """
+            )
+
+        with st.expander(
+            "How can we optimize bike availability according to seasonal trends?"
+        ):
+            st.caption(
+                """
+                - Increase Availability During Peak Seasons:
+                
+                    The data shows that bike rentals peak during the summer and fall seasons. Therefore, it would be beneficial to increase bike availability during these months to meet the high demand.
+                
+                - Maintenance and Repair During Off-Peak Seasons:
+                    
+                    The winter and spring seasons show a lower demand for bike rentals. This would be a good time to schedule regular maintenance and repairs to ensure that the bikes are in optimal condition for the peak season.
+
+                - Promotional Activities:
+                    
+                    To encourage bike rentals during off-peak seasons or months with lower demand, promotional activities such as discounts or loyalty programs could be introduced.
+
+                - Alternative Usage:
+                    
+                    During colder months when demand is low, consider alternative uses for the bikes. For example, they could be rented out for longer periods or used in partnership with local tour operators for guided tours.
+
+                - Dynamic Pricing:
+                    
+                    Implement a dynamic pricing model where prices are lower during off-peak seasons to encourage usage, and higher during peak seasons when demand is high.
+
+                - Weather-Proof Bikes:
+                    
+                    Consider investing in weather-proof bikes or providing additional equipment like rain covers or warmer gear during colder months to attract customers.
+                """
+            )
+
+        with st.expander(
+            "Can we predict bike rental demand based on weather conditions?"
+        ):
+            st.caption(
+                """
+                Yes, it is possible to predict bike rental demand based on weather conditions using machine learning models. Weather conditions such as temperature, humidity, wind speed, and weather situation (clear, cloudy, rainy, etc.) can significantly influence the demand for bike rentals.
+
+                Based on the graph you provided, we can see clear trends in bike rentals across different weather situations. For instance, Weather Situation 1 (Clear, Few clouds, Partly cloudy) has the highest number of rentals, followed by Weather Situation 2 (Mist + Cloudy, Mist + Broken clouds, Mist + Few clouds), and then Weather Situation 3 (Light Snow, Light Rain + Thunderstorm + Scattered clouds). This suggests that clear or partly cloudy weather is most favorable for bike rentals, while inclement weather like rain or snow reduces the demand.
+
+                These trends can be used to train a machine learning model to predict bike rental demand based on weather conditions. The model could take in weather data as input and output the predicted number of bike rentals. This could be particularly useful for planning and resource allocation in bike rental services.
+                """
+            )
+
+
+def render_forecast(view):
+    """
+    Render the "Rental Demand Forecast" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    forecaster = view.data.forecaster
+
+    with st.container():
+        st.subheader("Rental Demand Forecast")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            season = st.selectbox(
+                label="Season",
+                options=list(SEASON_LABELS),
+                format_func=SEASON_LABELS.get,
+                key="forecast_season",
+            )
+            mnth = st.selectbox(
+                label="Month",
+                options=list(MONTH_LABELS),
+                format_func=MONTH_LABELS.get,
+                key="forecast_month",
+            )
+
+        with col2:
+            weekday = st.selectbox(
+                label="Weekday",
+                options=list(WEEKDAY_LABELS),
+                index=1,
+                format_func=WEEKDAY_LABELS.get,
+                key="forecast_weekday",
+            )
+            weathersit = st.selectbox(
+                label="Weather",
+                options=list(WEATHERSIT_LABELS),
+                format_func=WEATHERSIT_LABELS.get,
+                key="forecast_weather",
+            )
+            holiday = st.checkbox(label="Holiday", key="forecast_holiday")
+
+        with col3:
+            temperature = st.slider("Temperature (°C)", -8, 39, 20)
+            humidity = st.slider("Humidity (%)", 0, 100, 60)
+            windspeed = st.slider("Wind Speed (km/h)", 0, 67, 13)
+
+        predictions = forecaster.predict(
+            scenario_frame(
+                season,
+                mnth,
+                weekday,
+                int(weekday not in (0, 6) and not holiday),
+                weathersit,
+                temperature,
+                humidity,
+                windspeed,
+            )
+        )
+
+        st.line_chart(data=predictions[["cnt", "casual", "registered"]])
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label="Predicted Daily Rentals",
+                value=f"{predictions['cnt'].sum():,.0f}",
+            )
+
+        with col2:
+            st.metric(
+                label="Predicted Peak Hour",
+                value=f"{predictions['cnt'].idxmax():02d}:00",
+            )
+
+        with col3:
+            st.metric(
+                label="Hourly Forecast Error (RMSE)",
+                value=f"{forecaster.scores[forecaster.alpha]['cnt']:.0f}",
+            )
+
+        st.caption(
+            f"""
+            The chart shows the rentals predicted for every hour of a day with the chosen calendar and weather, for all users and split into casual and registered users. The predictions come from a ridge regression on the hourly data (season, month, hour of day by working day, weekday, weather situation, temperature, feeling temperature, humidity and wind speed), whose regularization strength was chosen by time-series cross-validation: the model is always validated on days that come after the ones it was trained on. On those held-out days, the hourly predictions of total rentals are off by {forecaster.scores[forecaster.alpha]['cnt']:.0f} rentals on average (root mean squared error).
+            """
+        )
+
+
+def render_fleet(view):
+    """
+    Render the "Fleet Availability" section.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    """
+    planner = view.data.fleet_planner
+
+    with st.container():
+        st.subheader("Fleet Availability")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            season = st.selectbox(
+                label="Season",
+                options=list(SEASON_LABELS),
+                format_func=SEASON_LABELS.get,
+                key="fleet_season",
+            )
+
+        with col2:
+            service_level = st.slider(
+                "Service Level (%)",
+                int(SERVICE_LEVELS[0]),
+                int(SERVICE_LEVELS[-1]),
+                95,
+                key="fleet_service_level",
+            )
+
+        with col3:
+            user_type = st.selectbox(
+                label="Users",
+                options=list(USER_TYPES),
+                index=2,
+                format_func=USER_LABELS.get,
+                key="fleet_users",
+            )
+
+        bikes = (
+            planner.recommend(service_level).loc[season, user_type].unstack("weekday")
+        )
+        bikes.columns = [WEEKDAY_LABELS[weekday] for weekday in bikes.columns]
+
+        st.line_chart(data=bikes)
+
+        fleet_size = planner.fleet_size(service_level, season)
+        busiest = bikes.max(axis=1).idxmax()
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(label="Fleet Size Needed (All Users)", value=f"{fleet_size:,}")
+
+        with col2:
+            st.metric(label="Busiest Hour", value=f"{busiest:02d}:00")
+
+        with col3:
+            budget = st.number_input(
+                label="Available Bikes",
+                min_value=0,
+                value=1000,
+                step=50,
+                key="fleet_budget",
+            )
+            reachable = planner.service_level(budget, season)
+            st.metric(
+                label="Service Level with Available Bikes",
+                value="Below 50%" if reachable is None else f"{reachable}%",
+            )
+
+        st.caption(
+            f"""
+            The chart shows how many bikes should be available at every hour of each weekday in {SEASON_LABELS[season]} so that the rentals of {service_level}% of those hours in the data are fully served: it is the {service_level}th percentile of the hourly rentals of each hour, weekday and season, counting every rental as a bike in use for that hour. Covering the busiest hour of the season takes {fleet_size:,} bikes, and the service level a given number of available bikes can guarantee at every hour of the season is shown next to it.
+            """
+        )
+
+
+# The tabs of the dashboard and their sections. Only the open tab is
+# rendered, and the data behind a section is computed when it renders.
+TABS = {
+    "Overview": [
+        ("Introduction", render_introduction),
+        ("Daily Bike Rentals", render_daily_rentals),
+        ("Rolling Trends", render_rolling_trends),
+        ("Correlations", render_correlations),
+    ],
+    "Hourly Patterns": [("Hourly Patterns", render_hourly_patterns)],
+    "Rentals": [
+        ("Total Rentals", render_total_rentals),
+        ("Casual Rentals", render_casual_rentals),
+        ("Registered Rentals", render_registered_rentals),
+    ],
+    "Seasonal Trends": [("Seasonal Trends", render_seasonal_trends)],
+    "Weather": [
+        ("Temperature Trends", render_temperature_trends),
+        ("Humidity Trends", render_humidity_trends),
+        ("Wind Speed Trends", render_wind_speed_trends),
+        ("Weather Impact", render_weather_impact),
+    ],
+    "Users": [("User Impact", render_user_impact)],
+    "Forecast": [("Forecast", render_forecast)],
+    "Fleet": [("Fleet Availability", render_fleet)],
+    "Conclusion": [("Conclusion", render_conclusion)],
+}
@@ -0,0 +1,108 @@
+import glob
+import hashlib
+import os
+
+import pyarrow as pa
+
+# Directory of the memory-mapped datasets shared by every process on the
+# host, such as /dev/shm/bike-rentals. Sharing is off when it is not set.
+SHARED_DIR = os.environ.get("DASHBOARD_SHARED_DIR") or None
+
+
+def shared_path(name, version, directory):
+    """
+    Build the path of the shared file of one dataset version.
+
+    Parameters:
+    - name: A string identifying the dataset, stable across processes.
+    - version: A string identifying the version of the dataset.
+    - directory: The directory of the shared files.
+
+    Returns:
+    - path: The path of the Arrow IPC file.
+    """
+    stem = hashlib.sha1(name.encode()).hexdigest()[:16]
+    digest = hashlib.sha1(version.encode()).hexdigest()[:16]
+
+    return os.path.join(directory, f"{stem}-{digest}.arrow")
+
+
+def write_shared(df, path):
+    """
+    Write a DataFrame as an uncompressed Arrow IPC file, atomically.
+
+    Older versions of the same dataset are removed. Processes still mapping
+    them keep their pages until they map the new version.
+
+    Parameters:
+    - df: The DataFrame to share.
+    - path: The path returned by shared_path().
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(temporary, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporary, path)
+
+    stem = os.path.basename(path).split("-")[0]
+    for stale in glob.glob(os.path.join(directory, f"{stem}-*.arrow")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def map_shared(path):
+    """
+    Map a shared Arrow IPC file into memory as a read-only DataFrame.
+
+    The columns point into the mapped file, so every process mapping it
+    shares the same physical pages. Writing into the arrays raises an error.
+
+    Parameters:
+    - path: The path returned by shared_path().
+
+    Returns:
+    - df: The DataFrame backed by the mapped file.
+    """
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+
+    return table.to_pandas(split_blocks=True)
+
+
+def load_shared(name, version, compute, directory=None):
+    """
+    Load a dataset once per host and map it in every process.
+
+    The first process computes the frame and writes it to the shared
+    directory; every other process, and every later version check, maps the
+    file instead of computing the frame again.
+
+    Parameters:
+    - name: A string identifying the dataset, stable across processes.
+    - version: A string identifying the version of the dataset, such as the fingerprint of its source.
+    - compute: A function without arguments returning the DataFrame.
+    - directory: The directory of the shared files. Defaults to SHARED_DIR; when neither is set, the frame is computed and returned as is.
+
+    Returns:
+    - df: The DataFrame, read-only when it is shared.
+    """
+    directory = directory or SHARED_DIR
+    if directory is None:
+        return compute()
+
+    path = shared_path(name, version, directory)
+    if not os.path.exists(path):
+        write_shared(compute(), path)
+
+    try:
+        return map_shared(path)
+    except FileNotFoundError:
+        # A newer version replaced the file in the meantime.
+        return compute()
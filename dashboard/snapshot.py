@@ -0,0 +1,653 @@
+import argparse
+import datetime
+import html
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from charts import (
+    create_anomaly_chart,
+    draw_hourly_heatmap,
+    draw_seasonal_trends,
+    draw_user_impact,
+    draw_weather_impact,
+    render_figure,
+    store_figure,
+)
+from filters import ALL
+from loader import file_fingerprint
+from memo import LRUCache
+from metrics import ColumnStats
+from stats import user_share_intervals
+from view import GRANULARITIES, DashboardData, DashboardView
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Directory of the pre-rendered snapshots, shared by the export job and the
+# dashboard. Point it at a directory served by a web server to publish the
+# static pages as well.
+SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR") or os.path.join(
+    DASHBOARD_DIR, "snapshots"
+)
+
+# Bump when the content of a snapshot changes, so older ones are not served.
+SNAPSHOT_VERSION = 2
+
+# The view attributes stored in a snapshot, which the fast path serves
+# instead of computing them. Frames are stored as Parquet and the measure
+# statistics as JSON, so reading a snapshot never runs code from it.
+VIEW_ATTRIBUTES = (
+    "daily_rentals",
+    "chart_df",
+    "measure_stats",
+    "correlation_matrix",
+    "unusual_days",
+)
+HOURLY_VIEW_ATTRIBUTES = ("hourly_profile", "hourly_heatmap")
+
+# The figures of a snapshot, drawn the same way as by the sections.
+FIGURES = {
+    "seasonal_trends": lambda view: draw_seasonal_trends(view.data.aggregate_cube),
+    "weather_impact": lambda view: draw_weather_impact(view.data.aggregate_cube),
+    "user_impact": lambda view: draw_user_impact(
+        user_share_intervals(view.data.numerical_df, view.data.version).result()
+    ),
+}
+HOURLY_FIGURES = {
+    "hourly_heatmap": lambda view: draw_hourly_heatmap(view.hourly_heatmap),
+}
+
+_snapshot_cache = LRUCache(maxsize=32)
+
+
+def selection_path(granularity, start, end, season, weathersit, directory=None):
+    """
+    Build the directory of the snapshot of a sidebar selection.
+
+    Parameters:
+    - granularity: "Daily" or "Hourly".
+    - start: The first date of the selection.
+    - end: The last date of the selection.
+    - season: The selected season label, or "All".
+    - weathersit: The selected weather label, or "All".
+    - directory: The snapshot directory. Defaults to SNAPSHOT_DIR.
+
+    Returns:
+    - path: The directory of the snapshot, named after the selection.
+    """
+    name = f"{start:%Y-%m-%d}_{end:%Y-%m-%d}_{season}_{weathersit}"
+    name = re.sub(r"[^0-9a-z_]+", "-", name.lower()).strip("-")
+
+    return os.path.join(directory or SNAPSHOT_DIR, granularity.lower(), name)
+
+
+def snapshot_selections(granularity, seasons=True, weather=True, years=True):
+    """
+    List the common sidebar selections worth pre-rendering.
+
+    Parameters:
+    - granularity: "Daily" or "Hourly".
+    - seasons: Include every season over the whole period.
+    - weather: Include every weather situation over the whole period.
+    - years: Include every year with all seasons and weather.
+
+    Returns:
+    - selections: A list of (start, end, season, weathersit) tuples, the default view first.
+    """
+    data = DashboardData(granularity)
+    first, last = (date.date() for date in data.date_range())
+
+    selections = [(first, last, ALL, ALL)]
+    if seasons:
+        selections += [
+            (first, last, season, ALL) for season in data.options("season")[1:]
+        ]
+    if weather:
+        selections += [
+            (first, last, ALL, weathersit)
+            for weathersit in data.options("weathersit")[1:]
+        ]
+    if years:
+        selections += [
+            (
+                max(first, datetime.date(year, 1, 1)),
+                min(last, datetime.date(year, 12, 31)),
+                ALL,
+                ALL,
+            )
+            for year in range(first.year, last.year + 1)
+        ]
+
+    return list(dict.fromkeys(selections))
+
+
+def format_number(value, format="{:,.0f}"):
+    """
+    Format a metric of a static page.
+
+    Parameters:
+    - value: The number, or NaN.
+    - format: The format string.
+
+    Returns:
+    - text: The formatted number, or "n/a".
+    """
+    return "n/a" if pd.isna(value) else format.format(value)
+
+
+def render_page(view, frames, figures):
+    """
+    Render the static HTML page of a snapshot.
+
+    The page holds the sections that only depend on the sidebar selection.
+    The charts of the dashboard are embedded as Vega-Lite specifications and
+    the figures as the PNG files next to the page. The sections driven by
+    their own widgets, such as the forecast, are left to the live dashboard.
+
+    Parameters:
+    - view: The view.DashboardView of the selection.
+    - frames: A dictionary of the view attributes in the snapshot.
+    - figures: A dictionary mapping each figure name to its PNG file name.
+
+    Returns:
+    - page: The HTML document.
+    """
+    import altair as alt
+
+    charts = []
+
+    def chart(chart):
+        charts.append(chart.to_json(indent=None))
+        return f'<div id="chart-{len(charts)}" class="chart"></div>'
+
+    def metrics(*items):
+        cells = "".join(
+            f'<div class="metric"><div>{html.escape(label)}</div>'
+            f"<strong>{html.escape(value)}</strong></div>"
+            for label, value in items
+        )
+        return f'<div class="metrics">{cells}</div>'
+
+    def figure(name):
+        return f'<img src="{figures[name]}" alt="{name}">'
+
+    daily = frames["daily_rentals"]
+    stats = frames["measure_stats"]
+    correlations = frames["correlation_matrix"]
+    unusual = "Days with Unusual Hours" if view.data.hourly else "Unusual Days"
+
+    body = [
+        "<h2>Daily Bike Rentals</h2>",
+        metrics(
+            ("Total Rentals", format_number(daily["cnt_sum"].sum())),
+            ("Total Casual Users Rental", format_number(daily["casual_sum"].sum())),
+            (
+                "Total Registered Users Rental",
+                format_number(daily["registered_sum"].sum()),
+            ),
+        ),
+        "<h2>Correlations Between Variables</h2>",
+        metrics(
+            (
+                "Correlation between Temperature and Humidity",
+                format_number(correlations.loc["temp", "hum"] * 100, "{:.2f}%"),
+            ),
+            (
+                "Correlation between Temperature and Total Rentals",
+                format_number(correlations.loc["temp", "cnt"] * 100, "{:.2f}%"),
+            ),
+        ),
+        correlations.to_html(float_format="{:.2f}".format),
+    ]
+
+    if view.data.hourly:
+        profile = frames["hourly_profile"].reset_index().melt("hr")
+        body += [
+            "<h2>Hourly Patterns</h2>",
+            chart(
+                alt.Chart(profile)
+                .mark_line()
+                .encode(x="hr:O", y="value:Q", color="variable:N")
+            ),
+            figure("hourly_heatmap"),
+        ]
+
+    for measure, title in (
+        ("cnt", "Total Rentals"),
+        ("casual", "Total Casual Users Rentals"),
+        ("registered", "Total Registered Users Rentals"),
+    ):
+        days = frames["unusual_days"][measure]
+        body += [
+            f"<h2>{title}</h2>",
+            chart(create_anomaly_chart(frames["chart_df"], days, measure)),
+            metrics(
+                ("Max Rentals", format_number(stats[measure].max)),
+                ("Min Rentals", format_number(stats[measure].min)),
+                (unusual, format_number(len(days))),
+            ),
+        ]
+
+    body += ["<h2>Seasonal Trends</h2>", figure("seasonal_trends")]
+
+    for column, title, unit in (
+        ("temp", "Temperature", "{:.2f}°C"),
+        ("hum", "Humidity", "{:.2f}%"),
+        ("windspeed", "Windspeed", "{:.2f} km/h"),
+    ):
+        body += [
+            f"<h2>{title} Trends</h2>",
+            chart(
+                alt.Chart(frames["chart_df"])
+                .mark_line()
+                .encode(x="dteday:T", y=f"{column}:Q")
+            ),
+            metrics(
+                *(
+                    (f"{name} {title}", format_number(value * 100, unit))
+                    for name, value in (
+                        ("Max", stats[column].max),
+                        ("Mean", stats[column].mean),
+                        ("Min", stats[column].min),
+                    )
+                )
+            ),
+        ]
+
+    body += [
+        "<h2>Weather Impact</h2>",
+        figure("weather_impact"),
+        "<h2>User Impact</h2>",
+        figure("user_impact"),
+    ]
+
+    scripts = "".join(
+        f'<script src="https://cdn.jsdelivr.net/npm/{package}@{version}"></script>'
+        for package, version in (
+            ("vega", alt.VEGA_VERSION),
+            ("vega-lite", alt.VEGALITE_VERSION),
+            ("vega-embed", alt.VEGAEMBED_VERSION),
+        )
+    )
+    embeds = "".join(
+        f'vegaEmbed("#chart-{i}", {spec}, {{actions: false}});'
+        for i, spec in enumerate(charts, start=1)
+    )
+    title = (
+        f"{view.data.granularity} rentals from {view.start:%Y-%m-%d} to "
+        f"{view.end:%Y-%m-%d}, season: {view.season}, weather: {view.weathersit}"
+    )
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Bike Rentals Dashboard</title>
+{scripts}
+<style>
+body {{ font-family: sans-serif; max-width: 1100px; margin: auto; padding: 1em; }}
+img, .chart {{ width: 100%; }}
+.metrics {{ display: flex; gap: 2em; margin: 1em 0; }}
+.metric strong {{ font-size: 1.8em; }}
+table {{ border-collapse: collapse; }}
+td, th {{ padding: 0.2em 0.6em; text-align: right; }}
+</style>
+</head>
+<body>
+<h1>Bike Rentals Dashboard</h1>
+<p>{html.escape(title)}</p>
+{"".join(body)}
+<p>The rolling trends, the forecast and the fleet planner are interactive and only available in the live dashboard.</p>
+<script>{embeds}</script>
+</body>
+</html>
+"""
+
+
+def write_frame(frame, path, name):
+    """
+    Write a DataFrame of a snapshot as Parquet, with its index and column labels.
+
+    Parameters:
+    - frame: The DataFrame.
+    - path: The directory of the snapshot.
+    - name: The name of the file, without extension.
+
+    Returns:
+    - file_name: The name of the written file.
+    """
+    file_name = f"{name}.parquet"
+    pq.write_table(pa.Table.from_pandas(frame), os.path.join(path, file_name))
+
+    return file_name
+
+
+def read_frame(path, file_name):
+    """
+    Read a DataFrame written by write_frame().
+
+    Parameters:
+    - path: The directory of the snapshot.
+    - file_name: The name of the file in the directory.
+
+    Returns:
+    - frame: The DataFrame.
+    """
+    return pq.read_table(os.path.join(path, os.path.basename(file_name))).to_pandas()
+
+
+def encode_stats(stats):
+    """
+    Put the measure statistics of a view in a JSON-serializable form.
+
+    Parameters:
+    - stats: The dictionary of metrics.ColumnStats returned by metrics.summarize_measures().
+
+    Returns:
+    - values: A dictionary of the statistics of every measure, with the dates in ISO format.
+    """
+    return {
+        column: {
+            **column_stats._asdict(),
+            "min_date": encode_date(column_stats.min_date),
+            "max_date": encode_date(column_stats.max_date),
+        }
+        for column, column_stats in stats.items()
+    }
+
+
+def encode_date(date):
+    """
+    Format an optional date in ISO format.
+
+    Parameters:
+    - date: A date, or None.
+
+    Returns:
+    - date: The ISO string, or None.
+    """
+    return None if date is None else pd.Timestamp(date).isoformat()
+
+
+def decode_stats(values):
+    """
+    Rebuild the measure statistics stored by encode_stats().
+
+    Parameters:
+    - values: The dictionary returned by encode_stats().
+
+    Returns:
+    - stats: A dictionary mapping each measure to its metrics.ColumnStats.
+    """
+    stats = {}
+    for column, fields in values.items():
+        dates = {
+            field: None if fields[field] is None else pd.Timestamp(fields[field])
+            for field in ("min_date", "max_date")
+        }
+        stats[column] = ColumnStats(**{**fields, **dates})
+
+    return stats
+
+
+def export_snapshot(granularity, start, end, season, weathersit, directory=None):
+    """
+    Pre-render the dashboard of one sidebar selection.
+
+    The snapshot holds the frames the sections read as Parquet files, the
+    figures as PNG files and a static HTML page of the selection. Its
+    'snapshot.json', with the measure statistics, is written last, so a
+    snapshot is only served once it is complete.
+
+    Parameters:
+    - granularity: "Daily" or "Hourly".
+    - start: The first date of the selection.
+    - end: The last date of the selection.
+    - season: The selected season label, or "All".
+    - weathersit: The selected weather label, or "All".
+    - directory: The snapshot directory. Defaults to SNAPSHOT_DIR.
+
+    Returns:
+    - path: The directory of the snapshot.
+    """
+    view = DashboardView(DashboardData(granularity), start, end, season, weathersit)
+    path = selection_path(granularity, start, end, season, weathersit, directory)
+    os.makedirs(path, exist_ok=True)
+
+    attributes = VIEW_ATTRIBUTES
+    figures = dict(FIGURES)
+    if view.data.hourly:
+        attributes += HOURLY_VIEW_ATTRIBUTES
+        figures.update(HOURLY_FIGURES)
+
+    frames = {name: getattr(view, name) for name in attributes}
+    stored = {}
+    for name, value in frames.items():
+        if name == "measure_stats":
+            continue
+        if isinstance(value, dict):
+            stored[name] = {
+                key: write_frame(frame, path, f"{name}.{key}")
+                for key, frame in value.items()
+            }
+        else:
+            stored[name] = write_frame(value, path, name)
+
+    files = {}
+    for name, draw in figures.items():
+        image = render_figure(view.figure_key(name), lambda: draw(view))
+        files[name] = f"{name}.png"
+        with open(os.path.join(path, files[name]), "wb") as file:
+            file.write(image)
+
+    with open(os.path.join(path, "index.html"), "w", encoding="utf-8") as file:
+        file.write(render_page(view, frames, files))
+
+    manifest = {
+        "snapshot_version": SNAPSHOT_VERSION,
+        "version": snapshot_version(view),
+        "granularity": granularity,
+        "start": f"{start:%Y-%m-%d}",
+        "end": f"{end:%Y-%m-%d}",
+        "season": season,
+        "weathersit": weathersit,
+        "frames": stored,
+        "measure_stats": encode_stats(frames["measure_stats"]),
+        "figures": files,
+    }
+    temporary = os.path.join(path, "snapshot.json.tmp")
+    with open(temporary, "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(temporary, os.path.join(path, "snapshot.json"))
+
+    return path
+
+
+def export_snapshots(jobs, workers=None, directory=None):
+    """
+    Pre-render many selections in parallel worker processes.
+
+    Every worker loads the datasets once and renders the selections it
+    receives. A page listing every snapshot is written to the directory.
+
+    Parameters:
+    - jobs: A list of (granularity, start, end, season, weathersit) tuples.
+    - workers: The number of worker processes. Defaults to the number of CPUs.
+    - directory: The snapshot directory. Defaults to SNAPSHOT_DIR.
+
+    Returns:
+    - paths: The directory of every snapshot, in the order of the jobs.
+    """
+    directory = directory or SNAPSHOT_DIR
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(export_snapshot, *job, directory=directory) for job in jobs
+        ]
+        paths = [future.result() for future in futures]
+
+    links = "".join(
+        f'<li><a href="{os.path.relpath(path, directory)}/index.html">'
+        f"{html.escape(granularity)}: {start:%Y-%m-%d} to {end:%Y-%m-%d}, "
+        f"season: {html.escape(season)}, weather: {html.escape(weathersit)}</a></li>"
+        for (granularity, start, end, season, weathersit), path in zip(jobs, paths)
+    )
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as file:
+        file.write(
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            "<title>Bike Rentals Snapshots</title></head><body>"
+            f"<h1>Bike Rentals Snapshots</h1><ul>{links}</ul></body></html>\n"
+        )
+
+    return paths
+
+
+def snapshot_version(view):
+    """
+    Describe the data a snapshot of a view is drawn from.
+
+    Parameters:
+    - view: The view.DashboardView.
+
+    Returns:
+    - version: The repr() of the versions of the daily and the selected dataset, as the figures of the whole dataset are always daily.
+    """
+    return repr((view.data.version, view.data.active_version))
+
+
+def read_snapshot(path, version):
+    """
+    Read a snapshot once per process and serve it from memory afterwards.
+
+    Parameters:
+    - path: The directory of the snapshot.
+    - version: The snapshot_version() the snapshot must match.
+
+    Returns:
+    - snapshot: A tuple of the view attributes and a dictionary of the PNG bytes of every figure, or None when the snapshot is missing, incomplete or outdated.
+    """
+    manifest_path = os.path.join(path, "snapshot.json")
+    if not os.path.exists(manifest_path):
+        return None
+
+    def compute():
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+        if (
+            manifest.get("snapshot_version") != SNAPSHOT_VERSION
+            or manifest.get("version") != version
+        ):
+            return None
+
+        frames = {"measure_stats": decode_stats(manifest["measure_stats"])}
+        for name, stored in manifest["frames"].items():
+            if isinstance(stored, dict):
+                frames[name] = {
+                    key: read_frame(path, file_name)
+                    for key, file_name in stored.items()
+                }
+            else:
+                frames[name] = read_frame(path, stored)
+        figures = {}
+        for name, file_name in manifest["figures"].items():
+            with open(os.path.join(path, os.path.basename(file_name)), "rb") as file:
+                figures[name] = file.read()
+
+        return frames, figures
+
+    return _snapshot_cache.get_or_compute(
+        (file_fingerprint(manifest_path), version), compute
+    )
+
+
+def load_snapshot(view, directory=None):
+    """
+    Serve a view from its snapshot when one matches the selection.
+
+    The stored attributes are set on the view, so the sections read them
+    instead of computing them, and the figures are handed to the figure
+    cache, so they are not drawn. Attributes the view already computed are
+    kept.
+
+    Parameters:
+    - view: The view.DashboardView of the sidebar selection.
+    - directory: The snapshot directory. Defaults to SNAPSHOT_DIR.
+
+    Returns:
+    - served: True when a snapshot of the current data matched the selection.
+    """
+    path = selection_path(
+        view.data.granularity,
+        view.start,
+        view.end,
+        view.season,
+        view.weathersit,
+        directory,
+    )
+    snapshot = read_snapshot(path, snapshot_version(view))
+    if snapshot is None:
+        return False
+
+    frames, figures = snapshot
+    for name, value in frames.items():
+        view.__dict__.setdefault(name, value)
+    for name, image in figures.items():
+        store_figure(view.figure_key(name), image)
+
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-render the dashboard of common selections as static snapshots."
+    )
+    parser.add_argument(
+        "granularity",
+        nargs="*",
+        help="The granularities to render, 'Daily' and/or 'Hourly'. Defaults to both.",
+    )
+    parser.add_argument("--no-seasons", action="store_true")
+    parser.add_argument("--no-weather", action="store_true")
+    parser.add_argument("--no-years", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    granularities = [granularity.capitalize() for granularity in args.granularity]
+    for granularity in granularities:
+        if granularity not in GRANULARITIES:
+            parser.error(f"unknown granularity: {granularity}")
+
+    jobs = [
+        (granularity, *selection)
+        for granularity in granularities or GRANULARITIES
+        for selection in snapshot_selections(
+            granularity,
+            seasons=not args.no_seasons,
+            weather=not args.no_weather,
+            years=not args.no_years,
+        )
+    ]
+
+    # The export already runs one process per CPU, so the workers compute
+    # their statistics themselves instead of starting pools of their own.
+    os.environ.setdefault("DASHBOARD_STATS_WORKERS", "0")
+
+    started = time.perf_counter()
+    paths = export_snapshots(jobs, args.workers, args.output)
+    print(
+        f"{len(paths)} snapshot(s) written to {args.output} "
+        f"in {time.perf_counter() - started:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from memo import LRUCache
+
+# Number of worker processes computing the chart statistics. Defaults to the
+# number of CPUs; 0 computes them in the calling thread instead.
+STATS_WORKERS = os.environ.get("DASHBOARD_STATS_WORKERS")
+
+_interval_cache = LRUCache(maxsize=4)
+_interval_lock = threading.Lock()
+
+
+def bootstrap_means(values, n_boot, rng, block=100):
+    """
+    Compute the means of bootstrap resamples of an array.
+
+    Resamples are drawn in blocks, so memory use stays bounded for large arrays.
+
+    Parameters:
+    - values: The array to resample.
+    - n_boot: The number of resamples.
+    - rng: A numpy random Generator.
+    - block: The number of resamples drawn at once.
+
+    Returns:
+    - means: An array with the mean of every resample.
+    """
+    means = np.empty(n_boot)
+    for start in range(0, n_boot, block):
+        size = min(block, n_boot - start)
+        indices = rng.integers(0, len(values), size=(size, len(values)))
+        means[start : start + size] = values[indices].mean(axis=1)
+
+    return means
+
+
+def group_quantiles(groups, values, n_groups, levels):
+    """
+    Compute quantiles of the values of every group at once.
+
+    The values are sorted within their groups once; every quantile of every
+    group is then read by linear interpolation between two sorted positions.
+
+    Parameters:
+    - groups: An integer array with the group of every value.
+    - values: The values.
+    - n_groups: The number of groups.
+    - levels: The integer quantile levels, in percent.
+
+    Returns:
+    - quantiles: An array with one row per level and one column per group. Empty groups are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    sizes = np.bincount(groups, minlength=n_groups)
+
+    # Offsetting every group by more than the range of the values sorts by
+    # group and value in one plain sort, which is much faster than lexsort.
+    # The offsets are only exact for counts and half counts, such as the
+    # deviations of counts from their medians.
+    low_value = values.min(initial=0.0)
+    span = np.floor(values.max(initial=0.0) - low_value) + 1
+    halves = values * 2
+    if span * n_groups < 2**50 and np.array_equal(halves, np.floor(halves)):
+        offsets = np.repeat(np.arange(n_groups) * span, sizes)
+        ordered = np.sort(groups * span + (values - low_value)) - offsets + low_value
+    else:
+        ordered = values[np.lexsort((values, groups))]
+
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    last = starts + np.maximum(sizes - 1, 0)
+
+    # Integer arithmetic keeps exact positions exact, so their quantile is a
+    # rental count and not a count plus rounding noise.
+    steps = np.outer(levels, np.maximum(sizes - 1, 0))
+    low = np.minimum(starts + steps // 100, last)
+    high = np.minimum(low + 1, last)
+    weight = (steps % 100) / 100
+
+    ordered = np.append(ordered, np.nan)
+    quantiles = ordered[low] * (1 - weight) + ordered[high] * weight
+
+    return np.where(sizes > 0, quantiles, np.nan)
+
+
+def interval_table(groups, n_boot, level, seed):
+    """
+    Bootstrap a confidence interval of the mean of every group.
+
+    Parameters:
+    - groups: A dictionary of arrays keyed by category code.
+    - n_boot: The number of bootstrap resamples.
+    - level: The confidence level in percent.
+    - seed: The seed of the bootstrap random generator.
+
+    Returns:
+    - interval: A tuple of (low, high) arrays in the order of the sorted codes.
+    """
+    rng = np.random.default_rng(seed)
+    tail = (100 - level) / 2
+
+    low = []
+    high = []
+    for code in sorted(groups):
+        means = bootstrap_means(groups[code], n_boot, rng)
+        low.append(np.percentile(means, tail))
+        high.append(np.percentile(means, 100 - tail))
+
+    return np.array(low), np.array(high)
+
+
+def box_table(groups):
+    """
+    Compute the box plot statistics of every group.
+
+    Parameters:
+    - groups: A dictionary of arrays keyed by category code.
+
+    Returns:
+    - stats: A list of dictionaries accepted by matplotlib's Axes.bxp, labelled with the category codes.
+    """
+    from matplotlib.cbook import boxplot_stats
+
+    stats = []
+    for code in sorted(groups):
+        (box,) = boxplot_stats(groups[code], labels=[code])
+        stats.append(box)
+
+    return stats
+
+
+def mean_intervals(df, x, columns, n_boot=1000, level=95, seed=0):
+    """
+    Compute the mean and its bootstrap confidence interval of columns per value of x.
+
+    Parameters:
+    - df: A DataFrame with the x column and the columns.
+    - x: The column to group by.
+    - columns: The columns to summarize.
+    - n_boot: The number of bootstrap resamples.
+    - level: The confidence level in percent.
+    - seed: The seed of the bootstrap random generator.
+
+    Returns:
+    - intervals: A DataFrame indexed by the values of x, with a 'mean', 'low' and 'high' column per summarized column.
+    """
+    grouped = df.groupby(x)
+    intervals = {}
+    for column in columns:
+        groups = {code: values.to_numpy() for code, values in grouped[column]}
+        low, high = interval_table(groups, n_boot, level, seed)
+        intervals[(column, "mean")] = grouped[column].mean().to_numpy()
+        intervals[(column, "low")] = low
+        intervals[(column, "high")] = high
+
+    return pd.DataFrame(intervals, index=pd.Index(sorted(grouped.groups), name=x))
+
+
+class StatisticsPool:
+    """
+    Worker processes computing chart statistics off the Streamlit thread.
+
+    The processes are started on the first submission and shared by every
+    session. Workers are spawned rather than forked, as the dashboard process
+    runs other threads.
+
+    Parameters:
+    - workers: The number of worker processes. Defaults to the number of CPUs.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args):
+        """
+        Schedule a function call in a worker process.
+
+        A pool whose workers died is replaced on the next submission.
+
+        Parameters:
+        - function: A module-level function, so the workers can import it.
+        - args: The arguments of the call. They are pickled to the worker.
+
+        Returns:
+        - future: A concurrent.futures.Future of the result.
+        """
+        with self._lock:
+            for attempt in range(2):
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                try:
+                    return self._executor.submit(function, *args)
+                except BrokenProcessPool:
+                    if attempt:
+                        raise
+                    self._executor = None
+
+    def shutdown(self):
+        """
+        Stop the worker processes.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+@functools.cache
+def statistics_pool():
+    """
+    Build the statistics pool of the process, sized by DASHBOARD_STATS_WORKERS.
+
+    Returns:
+    - pool: The shared StatisticsPool, or None when DASHBOARD_STATS_WORKERS is 0.
+    """
+    if STATS_WORKERS == "0":
+        return None
+
+    return StatisticsPool(int(STATS_WORKERS) if STATS_WORKERS else None)
+
+
+def submit(pool, function, *args):
+    """
+    Compute a statistic in a pool, or in the calling thread without one.
+
+    Parameters:
+    - pool: A StatisticsPool, or None.
+    - function: A module-level function.
+    - args: The arguments of the call.
+
+    Returns:
+    - future: A concurrent.futures.Future of the result, already resolved without a pool.
+    """
+    if pool is not None:
+        return pool.submit(function, *args)
+
+    future = Future()
+    try:
+        future.set_result(function(*args))
+    except Exception as error:
+        future.set_exception(error)
+
+    return future
+
+
+def user_share_intervals(df, key):
+    """
+    Start computing the monthly user shares of a dataset once per data version.
+
+    A computation that failed, for example because its worker died, is
+    started again on the next call instead of staying cached.
+
+    Parameters:
+    - df: The numerical dataset with the user share columns.
+    - key: A hashable version of the dataset, such as loader.data_version().
+
+    Returns:
+    - future: A Future of the mean_intervals() of 'casual_percentage' and 'registered_percentage' per month.
+    """
+    with _interval_lock:
+        future = _interval_cache.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = submit(
+                statistics_pool(),
+                mean_intervals,
+                df[["mnth", "casual_percentage", "registered_percentage"]],
+                "mnth",
+                ("casual_percentage", "registered_percentage"),
+            )
+            _interval_cache.put(key, future)
+
+    return future
@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from labels import (
+    MONTH_LABELS,
+    SEASON_LABELS,
+    WEATHERSIT_LABELS,
+    label_codes,
+    year_labels,
+)
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(DASHBOARD_DIR, "rentals")
+STORE_PATH = os.path.join(STORE_DIR, "day")
+HOURLY_STORE_PATH = os.path.join(STORE_DIR, "hour")
+MANIFEST_PATH = os.path.join(STORE_DIR, "manifest.json")
+
+# The labels of 'yr' are the years of the data, see labels.year_labels().
+CODE_LABELS = {
+    "season": SEASON_LABELS,
+    "yr": None,
+    "mnth": MONTH_LABELS,
+    "weathersit": WEATHERSIT_LABELS,
+}
+
+STORE_SCHEMA = pa.schema(
+    [
+        ("instant", pa.int32()),
+        ("dteday", pa.timestamp("ns")),
+        ("season", pa.int8()),
+        ("yr", pa.int8()),
+        ("mnth", pa.int8()),
+        ("holiday", pa.int8()),
+        ("weekday", pa.int8()),
+        ("workingday", pa.int8()),
+        ("weathersit", pa.int8()),
+        ("temp", pa.float32()),
+        ("atemp", pa.float32()),
+        ("hum", pa.float32()),
+        ("windspeed", pa.float32()),
+        ("casual", pa.int32()),
+        ("registered", pa.int32()),
+        ("cnt", pa.int32()),
+    ]
+)
+
+HOURLY_STORE_SCHEMA = STORE_SCHEMA.insert(
+    STORE_SCHEMA.get_field_index("mnth") + 1, pa.field("hr", pa.int8())
+)
+
+_partition_cache = {}
+_partition_lock = threading.Lock()
+
+
+def partition_path(path, partition):
+    """
+    Build the path of one partition of the store.
+
+    Parameters:
+    - path: The directory of the store, such as STORE_PATH.
+    - partition: The partition name, such as "2011-01".
+
+    Returns:
+    - path: The path of the partition file.
+    """
+    return os.path.join(path, f"{partition}.parquet")
+
+
+def write_partition(df, path, partition, schema=STORE_SCHEMA):
+    """
+    Write one partition of the store, replacing the previous version atomically.
+
+    The store keeps the categories as small integer codes. Both the
+    categorical and the numerical views of the dashboard are derived from it
+    when reading.
+
+    Parameters:
+    - df: A DataFrame with the columns of the schema, categories given as integer codes.
+    - path: The directory of the store.
+    - partition: The partition name.
+    - schema: The schema of the store, STORE_SCHEMA or HOURLY_STORE_SCHEMA.
+    """
+    os.makedirs(path, exist_ok=True)
+
+    table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+    target = partition_path(path, partition)
+    pq.write_table(table, target + ".tmp", compression="zstd")
+    os.replace(target + ".tmp", target)
+
+
+def remove_partition(path, partition):
+    """
+    Remove one partition of the store if it exists.
+
+    Parameters:
+    - path: The directory of the store.
+    - partition: The partition name.
+    """
+    target = partition_path(path, partition)
+    if os.path.exists(target):
+        os.remove(target)
+
+
+def list_partitions(path):
+    """
+    List the partitions of the store in chronological order.
+
+    Parameters:
+    - path: The directory of the store.
+
+    Returns:
+    - partitions: A sorted list of partition names.
+    """
+    if not os.path.isdir(path):
+        return []
+
+    return sorted(
+        name[: -len(".parquet")]
+        for name in os.listdir(path)
+        if name.endswith(".parquet")
+    )
+
+
+def read_partition(path, partition, columns=None):
+    """
+    Read one partition of the store, reusing the previous read when the file is unchanged.
+
+    Parameters:
+    - path: The directory of the store.
+    - partition: The partition name.
+    - columns: The columns to read, or None to read every column.
+
+    Returns:
+    - table: A pyarrow Table with the requested columns.
+    """
+    target = partition_path(path, partition)
+    stat = os.stat(target)
+    fingerprint = (stat.st_mtime_ns, stat.st_size)
+    key = (target, None if columns is None else tuple(columns))
+
+    with _partition_lock:
+        cached = _partition_cache.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    table = pq.read_table(target, columns=columns)
+    with _partition_lock:
+        _partition_cache[key] = (fingerprint, table)
+
+    return table
+
+
+def read_store(path=STORE_PATH, columns=None):
+    """
+    Read every partition of the store, optionally only a subset of its columns.
+
+    Partitions are cached in memory as Arrow tables, so after new rows are
+    appended only the partitions that changed are read from disk again.
+
+    Parameters:
+    - path: The directory of the store.
+    - columns: The columns to read, or None to read every column.
+
+    Returns:
+    - df: A DataFrame with the requested columns in chronological order.
+    """
+    if columns is not None:
+        names = HOURLY_STORE_SCHEMA.names
+        columns = [column for column in columns if column in names]
+
+    partitions = list_partitions(path)
+
+    with _partition_lock:
+        prefix = os.path.join(path, "")
+        live = {partition_path(path, partition) for partition in partitions}
+        for key in list(_partition_cache):
+            if key[0].startswith(prefix) and key[0] not in live:
+                del _partition_cache[key]
+
+    tables = [read_partition(path, partition, columns) for partition in partitions]
+
+    return pa.concat_tables(tables).to_pandas()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """
+    Read the manifest describing the source of every partition.
+
+    Parameters:
+    - path: Path of the manifest file.
+
+    Returns:
+    - manifest: A dictionary, empty when the manifest does not exist yet.
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """
+    Write the manifest describing the source of every partition.
+
+    Parameters:
+    - manifest: The dictionary to write.
+    - path: Path of the manifest file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def categorical_view(df):
+    """
+    Derive the categorical view of the store, with labelled categories.
+
+    Parameters:
+    - df: A DataFrame read from the store.
+
+    Returns:
+    - df: The DataFrame with every category code column replaced by a pandas Categorical of labels.
+    """
+    for column, labels in CODE_LABELS.items():
+        if column in df:
+            df[column] = label_codes(df[column], labels or year_labels(df[column]))
+
+    return df
+
+
+def numerical_view(df):
+    """
+    Derive the numerical view of the store, without the date column.
+
+    Parameters:
+    - df: A DataFrame read from the store.
+
+    Returns:
+    - df: The DataFrame without 'dteday'.
+    """
+    return df.drop(columns=["dteday"], errors="ignore")
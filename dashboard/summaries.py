@@ -0,0 +1,87 @@
+import os
+
+import pandas as pd
+
+from memo import LRUCache
+from store import MANIFEST_PATH, load_manifest
+
+SUMMARY_KEYS = ("season", "mnth")
+SUMMARY_MEASURES = ("cnt", "casual", "registered")
+
+_summary_cache = LRUCache(maxsize=16)
+
+
+def summarize_partition(df):
+    """
+    Summarize the rentals of one partition per season and per month.
+
+    The summaries only hold counts and sums, so the summaries of several
+    partitions add up to the summary of the whole dataset.
+
+    Parameters:
+    - df: The rows of a partition, with the categories as integer codes.
+
+    Returns:
+    - summary: A JSON-serializable dictionary mapping each key column to the row count and the rental sums of each of its codes.
+    """
+    summary = {}
+    for key in SUMMARY_KEYS:
+        grouped = df.groupby(key)[list(SUMMARY_MEASURES)].sum()
+        grouped.insert(0, "count", df.groupby(key).size())
+        summary[key] = {
+            str(code): {column: int(value) for column, value in row.items()}
+            for code, row in grouped.iterrows()
+        }
+
+    return summary
+
+
+def combine_summaries(summaries, key):
+    """
+    Add up the summaries of several partitions.
+
+    Parameters:
+    - summaries: An iterable of dictionaries returned by summarize_partition().
+    - key: The key column to combine, such as "mnth".
+
+    Returns:
+    - totals: A DataFrame indexed by category code with the row count and the rental sums.
+    """
+    frames = [
+        pd.DataFrame.from_dict(summary[key], orient="index") for summary in summaries
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["count", *SUMMARY_MEASURES])
+
+    totals = pd.concat(frames).groupby(level=0).sum()
+    totals.index = totals.index.astype(int)
+    totals.index.name = key
+
+    return totals.sort_index()
+
+
+def load_summary(key, granularity="day", path=MANIFEST_PATH):
+    """
+    Load the running totals of the store for one key column.
+
+    Parameters:
+    - key: The key column, "season" or "mnth".
+    - granularity: "day" or "hour".
+    - path: Path of the manifest file.
+
+    Returns:
+    - totals: A DataFrame indexed by category code with the row count and the rental sums, or None when the store has no summaries.
+    """
+    if not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+    fingerprint = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def compute():
+        summaries = load_manifest(path).get(granularity, {}).get("summaries")
+        if not summaries:
+            return None
+        return combine_summaries(summaries.values(), key)
+
+    return _summary_cache.get_or_compute((fingerprint, granularity, key), compute)
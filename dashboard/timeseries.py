@@ -0,0 +1,83 @@
+import numpy as np
+
+from memo import LRUCache
+
+CHART_COLUMNS = ("cnt", "casual", "registered", "temp", "hum", "windspeed")
+
+# Line charts are a few hundred to a couple thousand pixels wide, so more
+# points than this are not visible anyway.
+POINT_BUDGET = 2000
+
+_chart_cache = LRUCache(maxsize=64)
+
+
+def downsample_minmax(values, budget=POINT_BUDGET):
+    """
+    Pick the rows that preserve the shape of several series under a point budget.
+
+    The rows are split into equal buckets, and the minimum and maximum of
+    every series are kept in each bucket, along with the first and last row.
+
+    Parameters:
+    - values: A 2D array with one row per point and one column per series.
+    - budget: The number of points each series may keep.
+
+    Returns:
+    - positions: A sorted array of the row positions to keep.
+    """
+    n = len(values)
+    if n <= budget:
+        return np.arange(n)
+
+    buckets = max(1, budget // 2)
+    size = -(-n // buckets)
+    padded = np.full((buckets * size, values.shape[1]), np.nan)
+    padded[:n] = values
+
+    low = np.where(np.isnan(padded), np.inf, padded).reshape(buckets, size, -1)
+    high = np.where(np.isnan(padded), -np.inf, padded).reshape(buckets, size, -1)
+
+    offsets = np.arange(buckets)[:, None] * size
+    positions = np.concatenate(
+        [
+            (low.argmin(axis=1) + offsets).ravel(),
+            (high.argmax(axis=1) + offsets).ravel(),
+            [0, n - 1],
+        ]
+    )
+
+    return np.unique(positions[positions < n])
+
+
+def create_chart_data(
+    df, x="dteday", columns=CHART_COLUMNS, budget=POINT_BUDGET, key=None
+):
+    """
+    Create the data of the time series line charts.
+
+    Only the x column and the charted columns are kept, and the rows are
+    downsampled with downsample_minmax() when they exceed the point budget.
+    The same frame is shared by every line chart of the page.
+
+    Parameters:
+    - df: The input DataFrame containing rental data, sorted by x.
+    - x: The column on the horizontal axis.
+    - columns: The columns charted on the vertical axis.
+    - budget: The number of points each chart may show.
+    - key: Optional hashable description of the filter selection that produced 'df'. When given, the result is memoized on it.
+
+    Returns:
+    - chart_data: A DataFrame with the x column and the charted columns.
+    """
+    if key is not None:
+        return _chart_cache.get_or_compute(
+            (key, x, tuple(columns), budget),
+            lambda: create_chart_data(df, x, columns, budget),
+        )
+
+    chart_data = df[[x, *columns]]
+    positions = downsample_minmax(
+        chart_data[list(columns)].to_numpy(dtype=np.float64), budget
+    )
+
+    return chart_data.iloc[positions].reset_index(drop=True)
@@ -0,0 +1,293 @@
+from functools import cached_property
+
+from aggregations import create_daily_rentals
+from anomalies import ANOMALY_MEASURES, build_anomaly_index, unusual_days
+from correlations import build_correlation_stats, create_correlation_matrix
+from cube import build_aggregate_cube
+from filters import ALL, build_filter
+from fleet import build_fleet_planner
+from forecast import load_forecaster
+from hourly import build_hourly_cube, create_hourly_heatmap, create_hourly_profile
+from loader import (
+    data_version,
+    hourly_path,
+    load_categorical,
+    load_hourly,
+    load_numerical,
+)
+from metrics import summarize_measures
+from summaries import load_summary
+from timeseries import create_chart_data
+from windows import build_window_engine
+
+GRANULARITIES = ("Daily", "Hourly")
+
+CATEGORICAL_COLUMNS = [
+    "instant",
+    "dteday",
+    "season",
+    "mnth",
+    "weathersit",
+    "temp",
+    "atemp",
+    "hum",
+    "windspeed",
+    "casual",
+    "registered",
+    "cnt",
+]
+NUMERICAL_COLUMNS = [
+    "season",
+    "yr",
+    "mnth",
+    "workingday",
+    "weathersit",
+    "casual",
+    "registered",
+    "cnt",
+]
+# Figures drawn from the sidebar selection; the others show the whole dataset.
+SELECTION_FIGURES = ("hourly_heatmap",)
+
+ANOMALY_COLUMNS = [
+    "instant",
+    "dteday",
+    "season",
+    "yr",
+    "workingday",
+    "weathersit",
+    "casual",
+    "registered",
+    "cnt",
+]
+
+
+class DashboardData:
+    """
+    The datasets behind the dashboard, loaded on first access.
+
+    Every attribute is computed when a section first asks for it, so a rerun
+    only loads what the visible sections need. The loaders and builders
+    underneath are cached per data version and shared by all sessions.
+
+    Parameters:
+    - granularity: "Daily" or "Hourly".
+    """
+
+    def __init__(self, granularity="Daily"):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+
+        self.granularity = granularity
+        self.hourly = granularity == "Hourly"
+
+    @cached_property
+    def version(self):
+        return data_version()
+
+    @cached_property
+    def hourly_version(self):
+        return data_version(hourly_path())
+
+    @cached_property
+    def categorical_df(self):
+        return load_categorical(columns=CATEGORICAL_COLUMNS)
+
+    @cached_property
+    def numerical_df(self):
+        return load_numerical(columns=NUMERICAL_COLUMNS)
+
+    @cached_property
+    def hourly_df(self):
+        return load_hourly()
+
+    @cached_property
+    def rental_filter(self):
+        return build_filter(self.categorical_df, self.version)
+
+    @cached_property
+    def hourly_filter(self):
+        return build_filter(self.hourly_df, self.hourly_version)
+
+    @cached_property
+    def hourly_cube(self):
+        return build_hourly_cube(self.hourly_df, self.hourly_version)
+
+    @cached_property
+    def aggregate_cube(self):
+        return build_aggregate_cube(self.numerical_df, self.version)
+
+    @cached_property
+    def monthly_data(self):
+        monthly_summary = load_summary("mnth")
+        if monthly_summary is not None:
+            return monthly_summary["cnt"]
+
+        return self.numerical_df.groupby("mnth").sum()["cnt"]
+
+    @cached_property
+    def forecaster(self):
+        return load_forecaster(self.hourly_df, self.hourly_version)
+
+    @cached_property
+    def fleet_planner(self):
+        return build_fleet_planner(self.hourly_df, self.hourly_version)
+
+    @cached_property
+    def anomaly_index(self):
+        if self.hourly:
+            return build_anomaly_index(self.hourly_df, self.hourly_version, "hour")
+
+        return build_anomaly_index(
+            load_categorical(columns=ANOMALY_COLUMNS), self.version, "day"
+        )
+
+    @property
+    def active_filter(self):
+        return self.hourly_filter if self.hourly else self.rental_filter
+
+    @property
+    def active_version(self):
+        return self.hourly_version if self.hourly else self.version
+
+    @cached_property
+    def correlation_stats(self):
+        if self.hourly:
+            return build_correlation_stats(self.hourly_df, self.hourly_version)
+
+        return build_correlation_stats(self.categorical_df, self.version)
+
+    def date_range(self):
+        """
+        Find the first and the last day of the daily dataset.
+
+        Returns:
+        - dates: A tuple of the first and the last date.
+        """
+        dates = self.rental_filter.df["dteday"]
+
+        return dates.iloc[0], dates.iloc[-1]
+
+    def options(self, column):
+        """
+        List the sidebar options of a categorical column, "All" first.
+
+        Parameters:
+        - column: "season" or "weathersit".
+
+        Returns:
+        - options: A list of labels.
+        """
+        return [ALL] + self.active_filter.options(column)
+
+
+class DashboardView:
+    """
+    The data of one sidebar selection, computed on first access.
+
+    Parameters:
+    - data: The DashboardData of the selected granularity.
+    - start: The first date to keep.
+    - end: The last date to keep.
+    - season: The selected season label, or "All".
+    - weathersit: The selected weather label, or "All".
+    """
+
+    def __init__(self, data, start, end, season=ALL, weathersit=ALL):
+        self.data = data
+        self.start = start
+        self.end = end
+        self.season = season
+        self.weathersit = weathersit
+        self.filter_key = (data.active_version, start, end, season, weathersit)
+
+    @property
+    def selections(self):
+        return {"season": self.season, "weathersit": self.weathersit}
+
+    @cached_property
+    def main_df(self):
+        if self.data.hourly:
+            return self.data.hourly_cube.rollup_daily(
+                start=self.start, end=self.end, **self.selections
+            )
+
+        return self.data.rental_filter.select(
+            start=self.start, end=self.end, **self.selections
+        )
+
+    @cached_property
+    def daily_rentals(self):
+        return create_daily_rentals(self.main_df, key=self.filter_key)
+
+    @cached_property
+    def chart_df(self):
+        return create_chart_data(self.main_df, key=self.filter_key)
+
+    @cached_property
+    def measure_stats(self):
+        return summarize_measures(self.main_df, key=self.filter_key)
+
+    @cached_property
+    def correlation_matrix(self):
+        return create_correlation_matrix(
+            self.data.correlation_stats,
+            self.filter_key,
+            start=self.start,
+            end=self.end,
+            **self.selections,
+        )
+
+    @cached_property
+    def unusual_days(self):
+        days = {}
+        for measure in ANOMALY_MEASURES:
+            anomalies = self.data.anomaly_index.select(
+                self.start, self.end, measure, **self.selections
+            )
+            days[measure] = unusual_days(anomalies, measure).join(
+                self.main_df.set_index("dteday")[[measure]], how="inner"
+            )
+
+        return days
+
+    def figure_key(self, name):
+        """
+        Build the charts.render_figure() key of a figure of the view.
+
+        Parameters:
+        - name: One of the FIGURES of the snapshots, such as "seasonal_trends".
+
+        Returns:
+        - key: The key. Figures of the whole dataset only depend on its version, the others also on the selection.
+        """
+        if name in SELECTION_FIGURES:
+            return (name, self.filter_key)
+
+        return (name, self.data.version)
+
+    @cached_property
+    def window_engine(self):
+        def select():
+            if self.data.hourly:
+                return self.data.hourly_cube.rollup_daily(**self.selections)
+
+            return self.data.rental_filter.select(**self.selections)
+
+        return build_window_engine(
+            select, (self.data.active_version, self.season, self.weathersit)
+        )
+
+    @cached_property
+    def hourly_main_df(self):
+        return self.data.hourly_filter.select(
+            start=self.start, end=self.end, **self.selections
+        )
+
+    @cached_property
+    def hourly_profile(self):
+        return create_hourly_profile(self.hourly_main_df)
+
+    @cached_property
+    def hourly_heatmap(self):
+        return create_hourly_heatmap(self.hourly_main_df)
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+
+from memo import LRUCache
+
+WINDOW_MEASURES = ("cnt", "casual", "registered")
+WINDOWS = (7, 28, 90)
+
+# Comparisons a week and a year back. A year is 52 weeks, so both windows
+# cover the same weekdays.
+WEEK = 7
+YEAR = 364
+
+_engine_cache = LRUCache(maxsize=16)
+
+
+class WindowEngine:
+    """
+    Rolling-window sums and means of daily rentals, answered from prefix sums.
+
+    The rentals are summed per calendar day once, over a contiguous range of
+    days where days without rows count as zero, and their running totals are
+    stored. The sum over any window is then the difference of two running
+    totals, so every point of a rolling series or a period comparison costs
+    the same whatever the window length or the number of source rows.
+
+    Means are taken over the days of the window that have rows, so a window
+    partly outside a season or weather selection is not diluted by the days
+    the selection leaves out.
+
+    Parameters:
+    - df: A DataFrame of rental rows with a datetime 'dteday' column and the measures, at any granularity.
+    - measures: The rental columns to aggregate.
+    """
+
+    def __init__(self, df, measures=WINDOW_MEASURES):
+        self.measures = tuple(measures)
+
+        daily = df.groupby(df["dteday"].dt.normalize(), sort=True)[
+            list(self.measures)
+        ].sum()
+        if len(daily):
+            self.first = daily.index[0]
+            self.days = (daily.index[-1] - self.first).days + 1
+        else:
+            self.first = pd.Timestamp(0)
+            self.days = 0
+
+        positions = (daily.index - self.first).days.to_numpy()
+        totals = np.zeros((self.days, len(self.measures)), dtype=np.int64)
+        totals[positions] = daily.to_numpy(dtype=np.int64)
+        observed = np.zeros(self.days, dtype=np.int64)
+        observed[positions] = 1
+
+        self.prefix = np.concatenate(
+            [np.zeros((1, len(self.measures)), dtype=np.int64), totals.cumsum(axis=0)]
+        )
+        self.observed = np.concatenate([[0], observed.cumsum()])
+        self.dates = daily.index
+
+    def positions(self, dates):
+        """
+        Convert dates to day positions, the first day being 0.
+
+        Parameters:
+        - dates: A date, or an array-like of dates.
+
+        Returns:
+        - positions: An int64 array of day positions, which can lie outside the data.
+        """
+        dates = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(dates))).normalize()
+
+        return (dates - self.first).days.to_numpy(dtype=np.int64)
+
+    def last_day(self, end=None):
+        """
+        Find the last day with rows on or before a date.
+
+        Parameters:
+        - end: The date, or None for the last day of the data.
+
+        Returns:
+        - day: The Timestamp of that day, or None when no day qualifies.
+        """
+        if end is None:
+            index = len(self.dates)
+        else:
+            index = self.dates.searchsorted(pd.Timestamp(end).normalize(), "right")
+
+        return self.dates[index - 1] if index else None
+
+    def window_sums(self, ends, window):
+        """
+        Sum the rentals over the windows ending on the given days.
+
+        Parameters:
+        - ends: The last day of every window, as positions from positions().
+        - window: The number of days in a window.
+
+        Returns:
+        - sums: An int64 array with one row per window and one column per measure.
+        - days: An int64 array with the number of days of every window that have rows.
+        """
+        ends = np.asarray(ends) + 1
+        high = np.clip(ends, 0, self.days)
+        low = np.clip(ends - window, 0, self.days)
+
+        return (
+            self.prefix[high] - self.prefix[low],
+            self.observed[high] - self.observed[low],
+        )
+
+    def rolling(self, window, start=None, end=None, lag=0):
+        """
+        Compute the rolling mean of daily rentals for every day of a range.
+
+        Parameters:
+        - window: The number of days in a window.
+        - start: The first day of the range, or None for the first day of the data.
+        - end: The last day of the range, or None for the last day of the data.
+        - lag: Optional number of days to shift the windows back by, such as YEAR to get the matching days of the previous year.
+
+        Returns:
+        - means: A DataFrame indexed by 'dteday' with one column per measure. Days whose window has no rows are NaN.
+        """
+        first = 0 if start is None else max(int(self.positions(start)[0]), 0)
+        last = self.days - 1 if end is None else int(self.positions(end)[0])
+        last = min(last, self.days - 1)
+
+        ends = np.arange(first, last + 1)
+        sums, days = self.window_sums(ends - lag, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.where(days[:, None] > 0, sums / days[:, None], np.nan)
+
+        return pd.DataFrame(
+            means,
+            index=pd.DatetimeIndex(
+                self.first + pd.to_timedelta(ends, unit="D"), name="dteday"
+            ),
+            columns=list(self.measures),
+        )
+
+    def compare(self, end, window, lag):
+        """
+        Compare the rentals of a window with the window 'lag' days earlier.
+
+        Parameters:
+        - end: The last day of the current window.
+        - window: The number of days in a window.
+        - lag: The number of days between the two windows, such as WEEK or YEAR.
+
+        Returns:
+        - comparison: A DataFrame indexed by measure with the 'current' and 'previous' window sums, their 'delta' and the 'change' as a fraction of the previous sum. A window is NaN when it has no rows or starts before the data.
+        """
+        ends = int(self.positions(end)[0]) - np.array([0, lag])
+        sums, days = self.window_sums(ends, window)
+        complete = (days > 0) & (ends - window + 1 >= 0)
+        current, previous = np.where(complete[:, None], sums, np.nan)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(previous > 0, (current - previous) / previous, np.nan)
+
+        return pd.DataFrame(
+            {
+                "current": current,
+                "previous": previous,
+                "delta": current - previous,
+                "change": change,
+            },
+            index=pd.Index(self.measures, name="measure"),
+        )
+
+
+def build_window_engine(select, key):
+    """
+    Build the window engine of a selection once per data version.
+
+    Parameters:
+    - select: A function without arguments returning the rental rows of the selection, over every date.
+    - key: A hashable description of the data version and the category selection.
+
+    Returns:
+    - engine: The shared WindowEngine for that selection.
+    """
+    return _engine_cache.get_or_compute(key, lambda: WindowEngine(select()))
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The dashboard modules import each other by name, as when run from dashboard/.
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "dashboard")
+)
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from aggregations import create_daily_rentals
+from loader import load_categorical
+
+COLUMNS = [
+    "dteday",
+    "instant_nunique",
+    "count",
+    "cnt_sum",
+    "casual_sum",
+    "registered_sum",
+    "cnt_diff",
+    "casual_diff",
+    "registered_diff",
+]
+
+
+def test_daily_rentals():
+    df = load_categorical()
+    daily_rentals = create_daily_rentals(df)
+
+    assert list(daily_rentals.columns) == COLUMNS
+    assert len(daily_rentals) == len(df)
+    assert (daily_rentals["count"] == 1).all()
+    assert daily_rentals["cnt_sum"].sum() == df["cnt"].sum()
+
+
+def test_empty_selection():
+    df = load_categorical()
+    summer = df[(df["season"] == "Summer") & (df["dteday"] < "2011-02-01")]
+
+    daily_rentals = create_daily_rentals(summer)
+
+    assert daily_rentals.empty
+    assert list(daily_rentals.columns) == COLUMNS
+    assert pd.api.types.is_datetime64_dtype(daily_rentals["dteday"])
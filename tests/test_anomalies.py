@@ -0,0 +1,34 @@
+import pandas as pd
+
+from anomalies import AnomalyIndex
+from loader import load_categorical
+
+
+def test_replacement_with_appended_rows_is_rescored():
+    df = load_categorical()
+    index = AnomalyIndex(df.iloc[:-10], version=1)
+
+    # Instant 100 is corrected in the same version that appends ten days.
+    changed = df.copy()
+    row = changed["instant"] == 100
+    changed.loc[row, "casual"] = changed.loc[row, "casual"] * 20
+    changed.loc[row, "cnt"] = (
+        changed.loc[row, "casual"] + changed.loc[row, "registered"]
+    )
+
+    extended = index.extend(changed, version=2)
+
+    assert 100 in extended.select(measure="casual")["instant"].to_list()
+    pd.testing.assert_frame_equal(
+        extended.anomalies, AnomalyIndex(changed, version=2).anomalies
+    )
+
+
+def test_appended_rows_keep_the_baseline():
+    df = load_categorical()
+    index = AnomalyIndex(df.iloc[:-10], version=1)
+
+    extended = index.extend(df, version=2)
+
+    assert extended.detector is index.detector
+    assert extended.digest == AnomalyIndex(df, version=2).digest
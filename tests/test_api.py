@@ -0,0 +1,97 @@
+import asyncio
+
+import pyarrow as pa
+import pytest
+
+from api import QueryServer
+
+
+async def exchange(request, limit=2**16):
+    """
+    Send raw bytes to a QueryServer and read everything it answers.
+
+    Parameters:
+    - request: The bytes to send. The write side is closed after them.
+    - limit: The buffer limit of the server's StreamReader.
+
+    Returns:
+    - response: The bytes received until the server closed the connection.
+    """
+    server = await asyncio.start_server(
+        QueryServer().handle, "127.0.0.1", 0, limit=limit
+    )
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        writer.write_eof()
+        response = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+
+    return response
+
+
+@pytest.mark.parametrize(
+    "request_bytes",
+    [
+        b"GET /daily HTTP/1.1\r\nHost: x",
+        b"GET /daily?" + b"a" * 4096 + b" HTTP/1.1\r\n\r\n",
+        b"GET /daily HTTP/1.1\r\nContent-Length: 5\r\n\r\nhello",
+        b"POST /daily HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n0\r\n\r\n",
+    ],
+    ids=["truncated", "oversized", "content-length", "chunked"],
+)
+def test_unreadable_requests_get_400(request_bytes):
+    response = asyncio.run(exchange(request_bytes, limit=1024))
+
+    assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+    assert response.count(b"HTTP/1.1") == 1
+
+
+def test_closed_connection_gets_no_response():
+    assert asyncio.run(exchange(b"")) == b""
+
+
+def get(target):
+    """
+    Send a GET request to a QueryServer and split its response.
+
+    Parameters:
+    - target: The path and query string of the request.
+
+    Returns:
+    - status: The status line.
+    - body: The response body.
+    """
+    request = f"GET {target} HTTP/1.1\r\nConnection: close\r\n\r\n".encode()
+    response = asyncio.run(exchange(request))
+    head, _, body = response.partition(b"\r\n\r\n")
+
+    return head.split(b"\r\n")[0], body
+
+
+EMPTY_SELECTION = "/daily?start=2011-01-01&end=2011-01-31&season=Summer"
+
+
+def test_empty_selection_gets_empty_json():
+    status, body = get(EMPTY_SELECTION)
+
+    assert status == b"HTTP/1.1 200 OK"
+    assert body == b"[]"
+
+
+def test_empty_selection_gets_empty_arrow():
+    status, body = get(EMPTY_SELECTION + "&format=arrow")
+
+    assert status == b"HTTP/1.1 200 OK"
+    table = pa.ipc.open_stream(body).read_all()
+    assert table.num_rows == 0
+    assert "dteday" in table.column_names
+
+
+@pytest.mark.parametrize("params", ["start=", "end=", "start=NaT"])
+def test_missing_date_gets_400(params):
+    status, body = get(f"/daily?{params}")
+
+    assert status == b"HTTP/1.1 400 Bad Request"
+    assert b"Invalid date" in body
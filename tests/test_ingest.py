@@ -0,0 +1,175 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import ingest
+import pipeline
+import quality
+from anomalies import AnomalyIndex
+from store import categorical_view, load_manifest, read_store
+
+
+@pytest.fixture
+def day_store(tmp_path, monkeypatch):
+    """
+    Build a daily store from a copy of data/day.csv in a temporary directory.
+
+    Returns:
+    - paths: A tuple of the source CSV file and the store directory.
+    """
+    source = tmp_path / "day.csv"
+    shutil.copy(pipeline.DAY_SOURCE, source)
+    path = str(tmp_path / "rentals" / "day")
+    _, _, schema, clean = pipeline.GRANULARITIES["day"]
+
+    monkeypatch.setitem(
+        pipeline.GRANULARITIES, "day", (str(source), path, schema, clean)
+    )
+    monkeypatch.setattr(pipeline, "MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(ingest, "MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(quality, "QUARANTINE_DIR", str(tmp_path / "quarantine"))
+
+    pipeline.run_pipeline("day")
+
+    return str(source), path
+
+
+def corrected(source, instant, casual):
+    """
+    Build a corrected copy of a source row.
+
+    Parameters:
+    - source: Path to the source CSV file.
+    - instant: The instant of the row.
+    - casual: The new number of casual rentals.
+
+    Returns:
+    - row: A one-row DataFrame with 'casual' and 'cnt' updated.
+    """
+    rows = pd.read_csv(source)
+    row = rows[rows["instant"] == instant].copy()
+    row["casual"] = casual
+    row["cnt"] = row["casual"] + row["registered"]
+
+    return row
+
+
+def new_year_row(source, instant, day, weekday, holiday):
+    """
+    Build a row of January 2013, the year after the source file.
+
+    Parameters:
+    - source: Path to the source CSV file.
+    - instant: The instant of the row.
+    - day: The day of January.
+    - weekday: The weekday code of the day.
+    - holiday: 1 for a holiday, 0 otherwise.
+
+    Returns:
+    - row: A one-row DataFrame based on the last source row.
+    """
+    row = corrected(source, 731, casual=10)
+    row[["instant", "dteday", "yr", "mnth", "weekday", "holiday", "workingday"]] = [
+        instant,
+        f"2013-01-{day:02d}",
+        2,
+        1,
+        weekday,
+        holiday,
+        int(not holiday and weekday not in (0, 6)),
+    ]
+
+    return row
+
+
+@pytest.mark.parametrize("chunksize", [pipeline.CHUNKSIZE, 50])
+def test_replacement_survives_pipeline(day_store, chunksize):
+    source, path = day_store
+    ingest.append_rows(corrected(source, 41, casual=500), granularity="day")
+
+    pipeline.run_pipeline("day", chunksize=chunksize)
+
+    stored = read_store(path).set_index("instant")
+    assert stored.loc[41, "casual"] == 500
+    assert stored.index.is_unique
+
+    rows = pd.read_csv(source)
+    assert rows["instant"].is_unique
+    assert rows["dteday"].is_monotonic_increasing
+
+    report = load_manifest(pipeline.MANIFEST_PATH)["day"]["quality"]["2011-02"]
+    assert report["quarantined"] == 0
+    assert not os.path.exists(quality.quarantine_path("day", "2011-02"))
+
+
+def test_fixed_row_leaves_quarantine(day_store):
+    source, path = day_store
+    rows = pd.read_csv(source)
+    rows.loc[rows["instant"] == 41, "cnt"] += 1
+    rows.to_csv(source, index=False)
+    pipeline.run_pipeline("day")
+
+    quarantined = quality.read_quarantine("day", "2011-02")
+    assert quarantined["instant"].tolist() == [41]
+    assert 41 not in read_store(path)["instant"].to_numpy()
+
+    ingest.append_rows(corrected(source, 41, casual=500), granularity="day")
+    pipeline.run_pipeline("day")
+
+    stored = read_store(path).set_index("instant")
+    assert stored.loc[41, "casual"] == 500
+    assert not os.path.exists(quality.quarantine_path("day", "2011-02"))
+    assert (pd.read_csv(source)["instant"] == 41).sum() == 1
+
+
+def test_next_year_is_appended(day_store):
+    source, path = day_store
+    row = new_year_row(source, 732, day=1, weekday=2, holiday=1)
+
+    before = open(source).read()
+    assert ingest.append_rows(row, granularity="day") == ["2013-01"]
+    assert open(source).read().startswith(before)
+
+    pipeline.run_pipeline("day")
+
+    stored = categorical_view(read_store(path))
+    assert stored["instant"].iloc[-1] == 732
+    assert list(stored["yr"].cat.categories) == ["2011", "2012", "2013"]
+    assert stored["yr"].iloc[-1] == "2013"
+
+    index = AnomalyIndex(read_store(path), version=1)
+    assert index.detector.ranges["yr"] == (0, 2)
+
+
+def test_unordered_rows_are_appended_in_order(day_store):
+    source, path = day_store
+    rows = pd.concat(
+        [
+            new_year_row(source, 733, day=2, weekday=3, holiday=0),
+            new_year_row(source, 732, day=1, weekday=2, holiday=1),
+        ]
+    )
+
+    assert ingest.append_rows(rows, granularity="day") == ["2013-01"]
+    assert not os.path.exists(quality.quarantine_path("day", "2013-01"))
+    assert pd.read_csv(source)["instant"].tolist()[-2:] == [732, 733]
+
+    pipeline.run_pipeline("day")
+
+    assert read_store(path)["instant"].tolist()[-2:] == [732, 733]
+    report = load_manifest(pipeline.MANIFEST_PATH)["day"]["quality"]["2013-01"]
+    assert report["quarantined"] == 0
+
+
+def test_pipeline_rewrites_quarantine_of_unchanged_partitions(day_store):
+    source, _ = day_store
+    ingest.append_rows(corrected(source, 41, casual=-5), granularity="day")
+    assert quality.read_quarantine("day", "2011-02")["instant"].tolist() == [41]
+
+    pipeline.run_pipeline("day")
+
+    report = load_manifest(pipeline.MANIFEST_PATH)["day"]["quality"]["2011-02"]
+    assert report["quarantined"] == 0
+    assert not os.path.exists(quality.quarantine_path("day", "2011-02"))
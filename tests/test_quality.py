@@ -0,0 +1,50 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+from quality import QualityChecker
+
+
+def day_rows(start, stop):
+    """
+    Read rows of data/day.csv by position.
+
+    Parameters:
+    - start: The position of the first row.
+    - stop: The position after the last row.
+
+    Returns:
+    - rows: A DataFrame with a fresh index.
+    """
+    rows = pd.read_csv(pipeline.DAY_SOURCE)
+
+    return rows.iloc[start:stop].reset_index(drop=True)
+
+
+def test_repeated_instants_are_flagged_across_chunks():
+    checker = QualityChecker()
+    first = day_rows(0, 20)
+    second = day_rows(20, 40)
+    second.loc[[3, 4, 5], "instant"] = [5, 100, 100]
+
+    _, flags = checker.violations(first)
+    assert not flags["instant"].any()
+
+    _, flags = checker.violations(second)
+    assert flags["instant"].tolist() == [False] * 3 + [True, False, True] + [False] * 14
+
+
+def test_large_instants_do_not_decide_memory():
+    checker = QualityChecker()
+    rows = day_rows(0, 3)
+    rows["instant"] = [1, np.iinfo(np.int32).max, 2**40]
+
+    tracemalloc.start()
+    _, flags = checker.violations(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert flags["instant"].tolist() == [False, False, True]
+    assert peak < 1024 * 1024
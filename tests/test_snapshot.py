@@ -0,0 +1,31 @@
+import os
+
+import pandas as pd
+
+import snapshot
+import stats
+from view import DashboardData, DashboardView
+
+
+def test_snapshot_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(stats, "STATS_WORKERS", "0")
+    stats.statistics_pool.cache_clear()
+
+    data = DashboardData("Daily")
+    start, end = data.date_range()
+    path = snapshot.export_snapshot(
+        "Daily", start, end, "All", "All", directory=str(tmp_path)
+    )
+    assert not [name for name in os.listdir(path) if name.endswith(".pkl")]
+
+    view = DashboardView(data, start, end)
+    frames, figures = snapshot.read_snapshot(path, snapshot.snapshot_version(view))
+
+    assert set(figures) == set(snapshot.FIGURES)
+    assert frames["measure_stats"] == view.measure_stats
+    for name in ("daily_rentals", "chart_df", "correlation_matrix"):
+        pd.testing.assert_frame_equal(frames[name], getattr(view, name))
+    for measure, days in view.unusual_days.items():
+        pd.testing.assert_frame_equal(frames["unusual_days"][measure], days)
+
+    assert snapshot.read_snapshot(path, "another version") is None
@@ -0,0 +1,33 @@
+import pandas as pd
+
+import stats
+
+
+def test_failed_user_shares_are_retried(monkeypatch):
+    monkeypatch.setattr(stats, "STATS_WORKERS", "0")
+    stats.statistics_pool.cache_clear()
+
+    calls = []
+    compute = stats.mean_intervals
+
+    def flaky(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("worker died")
+        return compute(*args)
+
+    monkeypatch.setattr(stats, "mean_intervals", flaky)
+    df = pd.DataFrame(
+        {
+            "mnth": [1, 1, 2, 2],
+            "casual_percentage": [10.0, 20.0, 30.0, 40.0],
+            "registered_percentage": [90.0, 80.0, 70.0, 60.0],
+        }
+    )
+    key = ("test_failed_user_shares_are_retried",)
+
+    assert isinstance(stats.user_share_intervals(df, key).exception(), RuntimeError)
+    future = stats.user_share_intervals(df, key)
+    assert future.exception() is None
+    assert stats.user_share_intervals(df, key) is future
+    assert len(calls) == 2